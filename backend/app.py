@@ -1,22 +1,38 @@
 from __future__ import annotations
 
+import hmac
 import json
-import hashlib
 import os
 import shutil
+import socket
 import subprocess
+import threading
+import time
 import uuid
+import zipfile
+from contextlib import contextmanager
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import requests
 from dotenv import load_dotenv
-from fastapi import BackgroundTasks, FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse
 
+from encoding_profiles import PROFILES
+from file_hashes import file_hash
+from recipients import count_data_rows
+from render_manifest import manifest_summary
+from render_timing import LATENCY_BUCKETS
+
+from .clients import ClientTable
 from .jobs import JobStore
+from .metrics import Counter, DirSizeCache, Gauge, Histogram, Registry
+from .retention import RetentionPolicy, RetentionSweeper
+from .scheduler import JobScheduler, SchedulerPolicy
 from .storage import get_storage_backend
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -26,10 +42,12 @@ REPO_ROOT = BASE_DIR.parent
 load_dotenv(dotenv_path=BASE_DIR / ".env")
 DATA_DIR = Path(os.environ.get("VIDX_DATA_DIR", str(REPO_ROOT / "backend_data")))
 DATA_DIR.mkdir(parents=True, exist_ok=True)
-DB_PATH = DATA_DIR / "jobs.sqlite3"
+# Must be on the API host's local disk (SQLite WAL); see VIDX_WORKER_TOKEN for remote workers.
+DB_PATH = Path(os.environ.get("VIDX_DB_PATH", str(DATA_DIR / "jobs.sqlite3")))
 GLOBAL_NAME_AUDIO_DIR = DATA_DIR / "name_audio_cache"
+GLOBAL_FACE_BOX_DIR = DATA_DIR / "face_box_cache"
 
-storage = get_storage_backend()
+storage = get_storage_backend(DATA_DIR)
 job_store = JobStore(DB_PATH)
 
 app = FastAPI(title="VidX API", version="0.1.0")
@@ -44,28 +62,204 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-VOICE_CACHE_PATH = DATA_DIR / "elevenlabs_voice_cache.json"
+DOWNLOAD_URL_TTL_SECONDS = int(os.environ.get("VIDX_DOWNLOAD_URL_TTL_SECONDS", "3600"))
+
+VOICE_CACHE_PATH = DATA_DIR / "elevenlabs_voice_cache.json"  # legacy, imported into the job DB
+# A clone claim expires after this long, so a crashed job doesn't block the sample forever.
+VOICE_CLONE_LEASE_SECONDS = 300.0
+VOICE_CLONE_WAIT_SECONDS = 600.0
+VOICE_CLONE_POLL_SECONDS = 2.0
+
+METRICS = Registry()
+_data_dir_size = DirSizeCache(DATA_DIR)
+METRICS.register(
+    Gauge(
+        "vidx_jobs",
+        "Jobs in the database by status.",
+        ["status"],
+        collect=lambda: {(status,): n for status, n in job_store.count_by_status().items()},
+    )
+)
+METRICS.register(
+    Gauge(
+        "vidx_queue_depth",
+        "Jobs waiting to start.",
+        collect=lambda: {(): job_store.count_by_status().get("queued", 0)},
+    )
+)
+JOB_DURATION = METRICS.register(Histogram("vidx_job_duration_seconds", "Job run time from start to finish.", ["status"]))
+JOB_QUEUE_WAIT = METRICS.register(Histogram("vidx_job_queue_wait_seconds", "Time jobs spent queued before starting."))
+RECIPIENTS_RENDERED = METRICS.register(Counter("vidx_recipients_total", "Recipients rendered.", ["status"]))
+STAGE_LATENCY = METRICS.register(
+    Histogram(
+        "vidx_render_stage_seconds",
+        "Per-recipient wall time of each render stage.",
+        ["stage"],
+        buckets=LATENCY_BUCKETS,
+    )
+)
+TTS_LATENCY = METRICS.register(
+    Histogram("vidx_tts_request_seconds", "TTS request latency.", ["provider"], buckets=LATENCY_BUCKETS)
+)
+TTS_REQUESTS = METRICS.register(Counter("vidx_tts_requests_total", "TTS requests sent.", ["provider"]))
+TTS_ERRORS = METRICS.register(Counter("vidx_tts_errors_total", "TTS requests that failed.", ["provider"]))
+JOBS_EXPIRED = METRICS.register(Counter("vidx_jobs_expired_total", "Jobs whose artifacts retention deleted.", ["status"]))
+RETENTION_RECLAIMED = METRICS.register(
+    Counter("vidx_retention_reclaimed_bytes_total", "Bytes of job artifacts deleted by retention.")
+)
+NAME_CACHE_LOOKUPS = METRICS.register(
+    Counter("vidx_name_cache_lookups_total", "Name audio cache lookups.", ["result"])
+)
+
+
+def _name_cache_hit_ratio() -> dict[tuple[str, ...], float]:
+    samples = NAME_CACHE_LOOKUPS.snapshot()
+    hits = samples.get(("hit",), 0.0)
+    total = hits + samples.get(("miss",), 0.0)
+    return {(): hits / total if total else 0.0}
 
 
-def _load_voice_cache() -> dict:
+METRICS.register(
+    Gauge("vidx_name_cache_hit_ratio", "Name audio cache hit ratio since API start.", collect=_name_cache_hit_ratio)
+)
+METRICS.register(
+    Gauge("vidx_data_dir_bytes", "Bytes stored under VIDX_DATA_DIR.", collect=lambda: {(): _data_dir_size.get()})
+)
+METRICS.register(
+    Gauge(
+        "vidx_data_dir_free_bytes",
+        "Free bytes on the VIDX_DATA_DIR filesystem.",
+        collect=lambda: {(): shutil.disk_usage(DATA_DIR).free},
+    )
+)
+
+
+def _ingest_timing_report(path: Path) -> None:
+    # Folds a personalized_video.py --timing-report into the API metrics.
+    try:
+        report = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    for rec in report.get("recipients", []):
+        RECIPIENTS_RENDERED.inc(status=rec.get("status", "unknown"))
+        for stage, stats in rec.get("stages", {}).items():
+            STAGE_LATENCY.observe(float(stats.get("wall_s", 0.0)), stage=stage)
+    for key, value in report.get("counters", {}).items():
+        kind, _, provider = key.partition(":")
+        if kind == "tts_requests":
+            TTS_REQUESTS.inc(value, provider=provider)
+        elif kind == "tts_errors":
+            TTS_ERRORS.inc(value, provider=provider)
+        elif key == "name_cache_hits":
+            NAME_CACHE_LOOKUPS.inc(value, result="hit")
+        elif key == "name_cache_misses":
+            NAME_CACHE_LOOKUPS.inc(value, result="miss")
+    for key, hist in report.get("histograms", {}).items():
+        kind, _, provider = key.partition(":")
+        if kind == "tts_request_seconds":
+            TTS_LATENCY.merge(hist.get("counts", []), hist.get("sum", 0.0), hist.get("count", 0), provider=provider)
+
+
+def _record_expired(job, reclaimed_bytes: int) -> None:
+    JOBS_EXPIRED.inc(status=job.status)
+    RETENTION_RECLAIMED.inc(reclaimed_bytes)
+
+
+retention = RetentionSweeper(job_store, DATA_DIR, storage, RetentionPolicy.from_env(), on_expire=_record_expired)
+
+
+@app.on_event("startup")
+def _start_retention() -> None:
+    retention.start()
+
+
+@app.on_event("shutdown")
+def _stop_retention() -> None:
+    retention.stop()
+
+
+def _default_cpu_budget() -> int:
+    env_budget = os.environ.get("VIDX_CPU_BUDGET", "").strip()
+    if env_budget:
+        return max(1, int(env_budget))
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+CPU_BUDGET = _default_cpu_budget()
+RENDER_WORKERS = max(1, int(os.environ.get("VIDX_RENDER_WORKERS", "1")))
+# Recipients per shard; 0 renders each job as one shard. Smaller shards
+# interleave more finely with other jobs.
+SHARD_ROWS = max(0, int(os.environ.get("VIDX_SHARD_ROWS", "500") or 0))
+# Jobs with this many recipients are heavy; at most MAX_HEAVY_JOBS render at once (0: no cap).
+HEAVY_JOB_ROWS = max(0, int(os.environ.get("VIDX_HEAVY_JOB_ROWS", "1000") or 0))
+MAX_HEAVY_JOBS = max(0, int(os.environ.get("VIDX_MAX_HEAVY_JOBS", "1") or 0))
+SHARD_LEASE_SECONDS = float(os.environ.get("VIDX_SHARD_LEASE_SECONDS", "120") or 120)
+SHARD_MAX_ATTEMPTS = max(1, int(os.environ.get("VIDX_SHARD_MAX_ATTEMPTS", "3") or 3))
+# Lease on job-level steps (planning, merging shard ZIPs); another node takes over if it lapses.
+JOB_LEASE_SECONDS = float(os.environ.get("VIDX_JOB_LEASE_SECONDS", "120") or 120)
+WORKER_ID = os.environ.get("VIDX_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+# Shared secret for the /workers endpoints; unset disables remote workers.
+WORKER_TOKEN = os.environ.get("VIDX_WORKER_TOKEN", "")
+CLIENTS = ClientTable.from_env()
+SCHEDULER_POLICY = SchedulerPolicy.from_env()
+# Fixed CPU slice per render slot, so the slots together never exceed the
+# budget however their renders overlap. A worker renders one shard at a
+# time and passes the whole budget instead.
+RENDER_CPU_SHARE = max(1, CPU_BUDGET // max(1, SCHEDULER_POLICY.render_slots))
+
+
+def _import_legacy_voice_cache() -> None:
+    # Voices used to live in elevenlabs_voice_cache.json; move them into the job DB once.
     if not VOICE_CACHE_PATH.exists():
-        return {}
+        return
     try:
-        return json.loads(VOICE_CACHE_PATH.read_text(encoding="utf-8"))
+        entries = json.loads(VOICE_CACHE_PATH.read_text(encoding="utf-8"))
     except Exception:
-        return {}
+        return
+    job_store.import_voices(entries if isinstance(entries, dict) else {})
+    try:
+        VOICE_CACHE_PATH.rename(VOICE_CACHE_PATH.with_name(VOICE_CACHE_PATH.name + ".imported"))
+    except OSError:
+        pass  # another worker already moved it
 
 
-def _save_voice_cache(cache: dict) -> None:
-    VOICE_CACHE_PATH.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+_import_legacy_voice_cache()
 
 
-def _file_hash(path: Path) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+def _cloned_voice(
+    *, job_id: str, voice_sample_path: Path, api_key: str | None, model_id: str | None
+) -> tuple[str, Optional[str]]:
+    # Single flight across jobs and API workers: the job that claims the
+    # sample clones it, the others poll until the voice is ready.
+    sample_hash = file_hash(voice_sample_path)
+    deadline = time.monotonic() + VOICE_CLONE_WAIT_SECONDS
+    while True:
+        voice = job_store.get_voice(sample_hash)
+        if voice is not None and voice.status == "ready" and voice.voice_id:
+            return voice.voice_id, model_id or voice.model_id
+        if job_store.claim_voice_clone(sample_hash, job_id, VOICE_CLONE_LEASE_SECONDS):
+            try:
+                voice_id = elevenlabs_clone_voice(
+                    api_key=api_key,
+                    voice_name=f"vidx-{job_id}",
+                    voice_sample_path=voice_sample_path,
+                )
+            except BaseException:
+                job_store.release_voice_clone(sample_hash, job_id)
+                raise
+            job_store.complete_voice_clone(
+                sample_hash,
+                job_id,
+                voice_id,
+                model_id or "eleven_multilingual_v2",
+                str(voice_sample_path),
+            )
+            return voice_id, model_id
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Timed out waiting for another job to clone voice sample {sample_hash[:12]}")
+        time.sleep(VOICE_CLONE_POLL_SECONDS)
 
 
 def _new_job_id() -> str:
@@ -96,176 +290,438 @@ def elevenlabs_clone_voice(*, api_key: str | None, voice_name: str, voice_sample
     return str(voice_id)
 
 
-def run_pipeline(job_id: str) -> None:
-    job = job_store.get(job_id)
-    if not job:
-        return
-
+def _plan_job(job) -> None:
+    # Everything done once per job before rendering: validation, MOV
+    # conversion, voice cloning and the split into recipient shards.
+    job_id = job.id
     input_dir = Path(job.input_dir)
     output_dir = Path(job.output_dir)
     options = json.loads(job.options_json)
 
-    job_store.update_status(job_id, "running")
-    try:
-        requested_mode = options.get("insert_mode", "silver")
-        insert_mode = "gold" if requested_mode in ("diamond", "platinum") else requested_mode
-        if insert_mode not in ("silver", "gold"):
-            raise RuntimeError(f"insert_mode={insert_mode} is not implemented yet.")
-
-        base_video = Path(options.get("base_path", input_dir / "base_video"))
-        recipients = Path(options.get("recipients_path", input_dir / "recipients"))
-        voice_sample = options.get("voice_sample_path")
-        out_dir = output_dir / "videos"
-        out_dir.mkdir(parents=True, exist_ok=True)
-
-        if options.get("convert_mov", False):
-            if base_video.suffix.lower() == ".mov":
-                converted = input_dir / "base_video_converted.mp4"
-                convert_cmd = [
-                    "python3",
-                    str(REPO_ROOT / "backend" / "convert_video.py"),
-                    "--input",
-                    str(base_video),
-                    "--output",
-                    str(converted),
-                ]
-                subprocess.run(convert_cmd, check=True)
-                base_video = converted
-
-        name_audio_dir = output_dir / "name_audio"
-        names_master_out = output_dir / "names_master.wav"
-
-        tts_provider = options.get("tts_provider", "gtts")
-        eleven_api_key = options.get("elevenlabs_api_key", "") or None
-        eleven_voice_id = options.get("elevenlabs_voice_id", "") or None
-        eleven_model_id = options.get("elevenlabs_model_id", "") or None
-        eleven_speed = float(options.get("elevenlabs_speed", 1.0))
-        lip_sync_provider = options.get("lip_sync_provider", "none")
-        wav2lip_repo = options.get("wav2lip_repo", "")
-        wav2lip_checkpoint = options.get("wav2lip_checkpoint", "")
-        wav2lip_pads = options.get("wav2lip_pads", "0 10 0 0")
-        wav2lip_python = options.get("wav2lip_python", "python3")
-        batch_name_tts = bool(options.get("batch_name_tts", True))
-        batch_split_silence_db = float(options.get("batch_split_silence_db", -40.0))
-        batch_split_silence_dur = float(options.get("batch_split_silence_dur", 0.18))
-        batch_gap_hint = str(options.get("batch_gap_hint", "ठहराव"))
-        diamond_natural_name = bool(options.get("diamond_natural_name", False))
-        diamond_gap_seconds = float(options.get("diamond_gap_seconds", 0.12))
-        platinum_placeholders = str(options.get("platinum_placeholders", "NAME1,NAME2"))
-        if requested_mode not in ("diamond", "platinum"):
-            lip_sync_provider = "none"
-
-        if tts_provider == "elevenlabs":
-            if not voice_sample:
-                raise RuntimeError("ElevenLabs selected but no voice_sample was provided.")
-            voice_sample_path = Path(voice_sample)
-            sample_hash = _file_hash(voice_sample_path)
-            cache = _load_voice_cache()
-            cached = cache.get(sample_hash)
-            if cached and cached.get("voice_id"):
-                eleven_voice_id = cached["voice_id"]
-                if not eleven_model_id:
-                    eleven_model_id = cached.get("model_id") or None
-            else:
-                cloned_voice_id = elevenlabs_clone_voice(
-                    api_key=eleven_api_key,
-                    voice_name=f"vidx-{job_id}",
-                    voice_sample_path=voice_sample_path,
-                )
-                eleven_voice_id = cloned_voice_id
-                cache[sample_hash] = {
-                    "voice_id": cloned_voice_id,
-                    "model_id": eleven_model_id or "eleven_multilingual_v2",
-                    "voice_sample_path": str(voice_sample_path),
-                }
-                _save_voice_cache(cache)
-            (output_dir / "elevenlabs_voice_id.txt").write_text(str(eleven_voice_id), encoding="utf-8")
-
-        cmd = [
+    requested_mode = options.get("insert_mode", "silver")
+    insert_mode = "gold" if requested_mode in ("diamond", "platinum") else requested_mode
+    if insert_mode not in ("silver", "gold"):
+        raise RuntimeError(f"insert_mode={insert_mode} is not implemented yet.")
+
+    base_path = Path(options.get("base_path", input_dir / "base_video"))
+    if options.get("convert_mov", False) and base_path.suffix.lower() == ".mov":
+        converted = input_dir / "base_video_converted.mp4"
+        input_dir.mkdir(parents=True, exist_ok=True)
+        convert_cmd = [
             "python3",
-            str(REPO_ROOT / "personalized_video.py"),
-            "--video",
-            str(base_video),
-            "--recipients",
-            str(recipients),
-            "--outdir",
-            str(out_dir),
-            "--insert-mode",
-            insert_mode,
-            "--lip-sync-provider",
-            lip_sync_provider,
-            "--wav2lip-repo",
-            wav2lip_repo,
-            "--wav2lip-checkpoint",
-            wav2lip_checkpoint,
-            "--wav2lip-pads",
-            wav2lip_pads,
-            "--wav2lip-python",
-            wav2lip_python,
-            "--name-position",
-            options.get("name_position", "start"),
-            "--text",
-            options.get("text", "{name}"),
-            "--lang",
-            options.get("lang", "hi"),
-            "--tts-provider",
-            tts_provider,
-            "--tts-cmd",
-            options.get("tts_cmd", ""),
-            "--elevenlabs-api-key",
-            eleven_api_key or "",
-            "--elevenlabs-voice-id",
-            eleven_voice_id or "",
-            "--elevenlabs-model-id",
-            eleven_model_id or "",
-            "--elevenlabs-speed",
-            f"{eleven_speed:.3f}",
-            "--silence-db",
-            str(options.get("silence_db", -30.0)),
-            "--silence-dur",
-            str(options.get("silence_dur", 0.3)),
-            "--build-name-cache",
-            "--name-cache-dir",
-            str(GLOBAL_NAME_AUDIO_DIR),
-            "--names-master-out",
-            str(names_master_out),
-            "--batch-split-silence-db",
-            str(batch_split_silence_db),
-            "--batch-split-silence-dur",
-            str(batch_split_silence_dur),
-            "--batch-gap-hint",
-            batch_gap_hint,
-            "--diamond-gap-seconds",
-            str(diamond_gap_seconds),
-            "--platinum-placeholders",
-            platinum_placeholders,
+            str(REPO_ROOT / "backend" / "convert_video.py"),
+            "--input",
+            str(storage.local_path(base_path)),
+            "--output",
+            str(converted),
+            "--profile",
+            options.get("encoding_profile", "default"),
         ]
-        cmd.append("--batch-name-tts" if batch_name_tts else "--no-batch-name-tts")
-        cmd.append("--diamond-natural-name" if diamond_natural_name else "--no-diamond-natural-name")
-        cmd.append("--platinum-mode" if requested_mode == "platinum" else "--no-platinum-mode")
-        if voice_sample:
-            cmd += ["--voice-sample", str(voice_sample)]
+        subprocess.run(convert_cmd, check=True)
+        # Shards on other nodes read the converted video from storage.
+        storage.put(converted, converted)
+        options["base_path"] = str(converted)
+        options["convert_mov"] = False
+
+    voice_sample = options.get("voice_sample_path")
+    if options.get("tts_provider", "gtts") == "elevenlabs":
+        if not voice_sample:
+            raise RuntimeError("ElevenLabs selected but no voice_sample was provided.")
+        voice_id, model_id = _cloned_voice(
+            job_id=job_id,
+            voice_sample_path=storage.local_path(Path(voice_sample)),
+            api_key=options.get("elevenlabs_api_key", "") or None,
+            model_id=options.get("elevenlabs_model_id", "") or None,
+        )
+        options["elevenlabs_voice_id"] = voice_id
+        options["elevenlabs_model_id"] = model_id or ""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / "elevenlabs_voice_id.txt").write_text(str(voice_id), encoding="utf-8")
+
+    rows = count_data_rows(storage.local_path(Path(options.get("recipients_path", input_dir / "recipients"))))
+    shard_rows = SHARD_ROWS if SHARD_ROWS > 0 else max(1, rows)
+    ranges = [(start, min(rows, start + shard_rows)) for start in range(0, rows, shard_rows)] or [(0, 0)]
+    job_store.start_job(job_id, job.lease_owner, options, ranges, rows)
 
-        proc = subprocess.run(cmd, check=False, capture_output=True, text=True)
+
+def _shard_dir(output_dir: Path, shard_index: int, shard_count: int) -> Path:
+    # A single-shard job keeps the flat output layout.
+    return output_dir if shard_count == 1 else output_dir / "shards" / f"{shard_index:04d}"
+
+
+def _render_command(job, shard, shard_dir: Path, single: bool, cpu_share: int) -> list[str]:
+    output_dir = Path(job.output_dir)
+    input_dir = Path(job.input_dir)
+    options = json.loads(job.options_json)
+
+    requested_mode = options.get("insert_mode", "silver")
+    insert_mode = "gold" if requested_mode in ("diamond", "platinum") else requested_mode
+    # Inputs may live in object storage; the renderer needs them on local disk.
+    base_video = storage.local_path(Path(options.get("base_path", input_dir / "base_video")))
+    recipients = storage.local_path(Path(options.get("recipients_path", input_dir / "recipients")))
+    voice_sample = options.get("voice_sample_path")
+    if voice_sample:
+        voice_sample = str(storage.local_path(Path(voice_sample)))
+
+    tts_provider = options.get("tts_provider", "gtts")
+    eleven_speed = float(options.get("elevenlabs_speed", 1.0))
+    lip_sync_provider = options.get("lip_sync_provider", "none")
+    batch_name_tts = bool(options.get("batch_name_tts", True))
+    diamond_natural_name = bool(options.get("diamond_natural_name", False))
+    if requested_mode not in ("diamond", "platinum"):
+        lip_sync_provider = "none"
+
+    cmd = [
+        "python3",
+        str(REPO_ROOT / "personalized_video.py"),
+        "--video",
+        str(base_video),
+        "--recipients",
+        str(recipients),
+        "--row-range",
+        f"{shard.row_start}:{shard.row_end}",
+        "--outdir",
+        str(shard_dir / "videos"),
+        "--insert-mode",
+        insert_mode,
+        "--lip-sync-provider",
+        lip_sync_provider,
+        "--wav2lip-repo",
+        options.get("wav2lip_repo", ""),
+        "--wav2lip-checkpoint",
+        options.get("wav2lip_checkpoint", ""),
+        "--wav2lip-pads",
+        options.get("wav2lip_pads", "0 10 0 0"),
+        "--wav2lip-python",
+        options.get("wav2lip_python", "python3"),
+        "--face-box-cache-dir",
+        str(GLOBAL_FACE_BOX_DIR),
+        "--name-position",
+        options.get("name_position", "start"),
+        "--text",
+        options.get("text", "{name}"),
+        "--lang",
+        options.get("lang", "hi"),
+        "--tts-provider",
+        tts_provider,
+        "--tts-cmd",
+        options.get("tts_cmd", ""),
+        "--elevenlabs-api-key",
+        options.get("elevenlabs_api_key", ""),
+        "--elevenlabs-voice-id",
+        options.get("elevenlabs_voice_id", ""),
+        "--elevenlabs-model-id",
+        options.get("elevenlabs_model_id", ""),
+        "--elevenlabs-speed",
+        f"{eleven_speed:.3f}",
+        "--silence-db",
+        str(options.get("silence_db", -30.0)),
+        "--silence-dur",
+        str(options.get("silence_dur", 0.3)),
+        "--build-name-cache",
+        "--name-cache-dir",
+        str(GLOBAL_NAME_AUDIO_DIR),
+        "--batch-split-silence-db",
+        str(float(options.get("batch_split_silence_db", -40.0))),
+        "--batch-split-silence-dur",
+        str(float(options.get("batch_split_silence_dur", 0.18))),
+        "--batch-gap-hint",
+        str(options.get("batch_gap_hint", "ठहराव")),
+        "--diamond-gap-seconds",
+        str(float(options.get("diamond_gap_seconds", 0.12))),
+        "--platinum-placeholders",
+        str(options.get("platinum_placeholders", "NAME1,NAME2")),
+        "--encoding-profile",
+        options.get("encoding_profile", "default"),
+        # Shared by the job's shards on this node: the downscaled base is prepared once.
+        "--work-dir",
+        str(output_dir / "work"),
+        "--cpu-budget",
+        str(cpu_share),
+        "--render-workers",
+        str(min(RENDER_WORKERS, cpu_share)),
+        "--timing-report",
+        str(shard_dir / "timing.json"),
+        "--manifest",
+        str(shard_dir / "manifest.sqlite3"),
+        "--resume",
+    ]
+    if single:
+        # The names master only covers the names rendered in one process.
+        cmd += ["--names-master-out", str(output_dir / "names_master.wav")]
+    cmd.append("--batch-name-tts" if batch_name_tts else "--no-batch-name-tts")
+    cmd.append("--diamond-natural-name" if diamond_natural_name else "--no-diamond-natural-name")
+    cmd.append("--platinum-mode" if requested_mode == "platinum" else "--no-platinum-mode")
+    if voice_sample:
+        cmd += ["--voice-sample", str(voice_sample)]
+    return cmd
+
+
+def _renew_shard_lease(shard, proc: subprocess.Popen, done: threading.Event, store) -> None:
+    # Heartbeat while the renderer runs. If another worker took the shard
+    # over (this node stalled past its lease), stop rendering it here.
+    while not done.wait(SHARD_LEASE_SECONDS / 3):
+        try:
+            if not store.renew_shard_lease(shard, SHARD_LEASE_SECONDS):
+                proc.kill()
+                return
+        except Exception as exc:
+            print(f"Could not renew lease of {shard.job_id}/{shard.shard_index}: {exc}")
+
+
+def run_shard(job, shard, store=job_store, cpu_share: int = RENDER_CPU_SHARE) -> None:
+    # store is the JobStore, or a ShardClient on a worker that reaches the
+    # job database through the API.
+    output_dir = Path(job.output_dir)
+    shard_count = store.shard_count(job.id)
+    single = shard_count == 1
+    shard_dir = _shard_dir(output_dir, shard.shard_index, shard_count)
+    out_dir = shard_dir / "videos"
+    # Render scratch is always local, whatever the storage backend.
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    error = None
+    try:
+        cmd = _render_command(job, shard, shard_dir, single, cpu_share)
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        done = threading.Event()
+        heartbeat = threading.Thread(target=_renew_shard_lease, args=(shard, proc, done, store), daemon=True)
+        heartbeat.start()
+        try:
+            stdout, stderr = proc.communicate()
+        finally:
+            done.set()
+            heartbeat.join()
         if proc.returncode != 0:
-            stderr_tail = (proc.stderr or "").strip()[-4000:]
-            stdout_tail = (proc.stdout or "").strip()[-1500:]
+            stderr_tail = (stderr or "").strip()[-4000:]
+            stdout_tail = (stdout or "").strip()[-1500:]
             details = stderr_tail or stdout_tail or "No subprocess output."
             raise RuntimeError(f"personalized_video.py failed:\n{details}")
 
-        zip_path = output_dir / "videos.zip"
+        zip_path = shard_dir / "videos.zip"
         if zip_path.exists():
             zip_path.unlink()
         shutil.make_archive(str(zip_path.with_suffix("")), "zip", out_dir)
+        storage.put(zip_path, zip_path)
+        if not storage.is_local:
+            # The bucket has the ZIP now; the rendered files were local scratch.
+            shutil.rmtree(out_dir, ignore_errors=True)
+            zip_path.unlink(missing_ok=True)
+    except Exception as exc:
+        error = str(exc) or type(exc).__name__
+    finally:
+        _ingest_timing_report(shard_dir / "timing.json")
+        _publish_reports(shard_dir)
 
-        job_store.update_status(job_id, "done", zip_path=zip_path)
+    # A shard out of attempts fails its job in the same update.
+    status = store.finish_shard(shard, error, max_attempts=SHARD_MAX_ATTEMPTS)
+    if status == "failed":
+        JOB_DURATION.observe(time.time() - (job.started_at or job.created_at), status="failed")
+    elif status == "pending":
+        print(f"Shard {job.id}/{shard.shard_index} failed, will be retried: {error}")
+    elif status == "done" and store is job_store:
+        # Remote workers leave the merge to the API's scheduler.
+        _finalize_job(job.id, shard.worker)
+
+
+@contextmanager
+def _job_lease(job_id: str, owner: str) -> Iterator[None]:
+    # Heartbeat for a job-level lease while the body runs.
+    done = threading.Event()
+
+    def renew() -> None:
+        while not done.wait(JOB_LEASE_SECONDS / 3):
+            try:
+                job_store.renew_job_lease(job_id, owner, JOB_LEASE_SECONDS)
+            except Exception as exc:
+                print(f"Could not renew lease of job {job_id}: {exc}")
+
+    heartbeat = threading.Thread(target=renew, daemon=True)
+    heartbeat.start()
+    try:
+        yield
+    finally:
+        done.set()
+        heartbeat.join()
+
+
+def _finalize_job(job_id: str, worker_id: str) -> bool:
+    # Whichever worker finishes the last shard merges the shard ZIPs. If it
+    # dies mid-merge, the lease lapses and work_shards on any node redoes it.
+    if not job_store.begin_finalize(job_id, worker_id, JOB_LEASE_SECONDS):
+        return False
+    with _job_lease(job_id, worker_id):
+        _merge_shards(job_store.get(job_id), worker_id)
+    return True
+
+
+def _merge_shards(job, worker_id: str) -> None:
+    job_id = job.id
+    output_dir = Path(job.output_dir)
+    shards = job_store.list_shards(job_id)
+    zip_path = output_dir / "videos.zip"
+    try:
+        if len(shards) > 1:
+            written: set[str] = set()
+            with zipfile.ZipFile(zip_path, "w", allowZip64=True) as merged:
+                for shard in shards:
+                    shard_zip = _shard_dir(output_dir, shard.shard_index, len(shards)) / "videos.zip"
+                    with zipfile.ZipFile(storage.local_path(shard_zip)) as part:
+                        for info in part.infolist():
+                            # Outputs are named by name slug; a name repeated in
+                            # another shard keeps its first file, as a
+                            # single-process run would write one file per slug.
+                            if info.filename in written:
+                                continue
+                            written.add(info.filename)
+                            with part.open(info) as src, merged.open(info, "w") as dst:
+                                shutil.copyfileobj(src, dst, 1024 * 1024)
+            storage.put(zip_path, zip_path)
+            if not storage.is_local:
+                zip_path.unlink(missing_ok=True)
+        if not job_store.complete_job(job_id, worker_id, zip_path):
+            return  # lease lost; the node that took over finishes the job
+        JOB_DURATION.observe(time.time() - (job.started_at or job.created_at), status="done")
+        # Shard ZIPs go only once the job is done, so a takeover can still merge them.
+        if len(shards) > 1:
+            for shard in shards:
+                storage.delete(_shard_dir(output_dir, shard.shard_index, len(shards)) / "videos.zip")
     except Exception as exc:
-        job_store.update_status(job_id, "failed", error=str(exc))
+        job_store.fail_job(job_id, str(exc))
+        JOB_DURATION.observe(time.time() - (job.started_at or job.created_at), status="failed")
+
+
+def finalize_next(worker_id: str, job_id: Optional[str] = None) -> bool:
+    # Finalizes one job whose shards are all done, if any needs it.
+    finalizable = job_store.next_finalizable_job()
+    if finalizable is None or (job_id is not None and finalizable != job_id):
+        return False
+    return _finalize_job(finalizable, worker_id)
+
+
+def work_shards(
+    worker_id: str,
+    job_id: Optional[str] = None,
+    allow_heavy: bool = True,
+    store=None,
+    cpu_share: int = RENDER_CPU_SHARE,
+) -> int:
+    # Renders shards until none is claimable; returns how many it ran. Each
+    # claim picks the next shard in fair-share order across jobs and clients.
+    # With a ShardClient as store, nothing here touches the job database.
+    remote = store is not None
+    store = store or job_store
+    ran = 0
+    while True:
+        if not remote and finalize_next(worker_id, job_id):
+            ran += 1
+            continue
+        shard = store.claim_shard(
+            worker_id,
+            SHARD_LEASE_SECONDS,
+            SHARD_MAX_ATTEMPTS,
+            job_id=job_id,
+            heavy_rows=HEAVY_JOB_ROWS,
+            max_heavy_jobs=MAX_HEAVY_JOBS,
+            allow_heavy=allow_heavy,
+        )
+        if shard is None:
+            return ran
+        job = store.get(shard.job_id)
+        if job is None:
+            continue
+        run_shard(job, shard, store, cpu_share)
+        ran += 1
+
+
+def plan_job(job) -> None:
+    # Called by the scheduler once it has moved the job from queued to running
+    # with a planning lease. Planning can wait minutes on a voice clone, so
+    # the lease is renewed; if this process dies, another scheduler re-plans.
+    started = job.started_at or time.time()
+    JOB_QUEUE_WAIT.observe(max(0.0, started - job.created_at))
+    try:
+        with _job_lease(job.id, job.lease_owner):
+            _plan_job(job)
+    except Exception as exc:
+        job_store.fail_job(job.id, str(exc))
+        JOB_DURATION.observe(time.time() - started, status="failed")
+    finally:
+        _publish_reports(Path(job.output_dir))
+
+
+scheduler = JobScheduler(
+    job_store,
+    SCHEDULER_POLICY,
+    owner=WORKER_ID,
+    lease_seconds=JOB_LEASE_SECONDS,
+    plan=plan_job,
+    work=lambda allow_heavy: work_shards(WORKER_ID, allow_heavy=allow_heavy),
+    finalize=lambda: finalize_next(WORKER_ID),
+)
+
+
+@app.on_event("startup")
+def _start_scheduler() -> None:
+    scheduler.start()
+
+
+@app.on_event("shutdown")
+def _stop_scheduler() -> None:
+    scheduler.stop()
+
+
+def _publish_reports(output_dir: Path) -> None:
+    # Status endpoints on other API nodes read these from storage.
+    for name in ("timing.json", "manifest.sqlite3", "elevenlabs_voice_id.txt"):
+        path = output_dir / name
+        if not path.exists():
+            continue
+        try:
+            storage.put(path, path)
+        except Exception as exc:
+            print(f"Could not store {path}: {exc}")
+
+
+def _artifact_path(path: Path) -> Path:
+    # Local file if this node has it, else a cached copy from storage.
+    if path.exists() or storage.is_local or not storage.exists(path):
+        return path
+    return storage.local_path(path)
+
+
+def _resolve_client(api_key: str):
+    client = CLIENTS.resolve(api_key)
+    if client is None:
+        raise HTTPException(status_code=401, detail="missing or unknown X-Api-Key")
+    return client
+
+
+def _visible_client_id(api_key: str) -> Optional[str]:
+    # The client_id a caller may read jobs of; None (every job) for the admin key.
+    if CLIENTS.is_admin(api_key):
+        return None
+    return _resolve_client(api_key).client_id
+
+
+def _check_admin_key(api_key: str) -> None:
+    if not CLIENTS.admin_key:
+        raise HTTPException(status_code=403, detail="maintenance endpoints are disabled; set VIDX_ADMIN_KEY")
+    if not CLIENTS.is_admin(api_key):
+        raise HTTPException(status_code=401, detail="invalid admin key")
+
+
+def _get_visible_job(job_id: str, api_key: str):
+    # Another client's job is reported as missing, not forbidden.
+    client_id = _visible_client_id(api_key)
+    job = job_store.get(job_id)
+    if not job or (client_id is not None and job.client_id != client_id):
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
 
 
 @app.post("/jobs")
 def create_job(
-    background_tasks: BackgroundTasks,
     base_video: UploadFile = File(...),
     recipients: UploadFile = File(...),
     voice_sample: UploadFile | None = File(None),
@@ -294,7 +750,15 @@ def create_job(
     silence_db: float = Form(-30.0),
     silence_dur: float = Form(0.3),
     convert_mov: bool = Form(False),
+    encoding_profile: str = Form("default"),
+    priority: int = Form(0),
+    x_api_key: str = Header(""),
 ):
+    client = _resolve_client(x_api_key)
+    # Callers can't raise their own share: client and priority cap come from the server's client table.
+    priority = client.clamp_priority(priority)
+    if encoding_profile not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown encoding_profile: {encoding_profile}")
     job_id = _new_job_id()
     job_dir = DATA_DIR / job_id
     input_dir = job_dir / "input"
@@ -361,20 +825,21 @@ def create_job(
         "silence_db": silence_db,
         "silence_dur": silence_dur,
         "convert_mov": convert_mov,
+        "encoding_profile": encoding_profile,
     }
     options["base_path"] = str(base_path)
     options["recipients_path"] = str(rec_path)
     if voice_path is not None:
         options["voice_sample_path"] = str(voice_path)
-    job_store.create(job_id, input_dir, output_dir, options)
-
-    background_tasks.add_task(run_pipeline, job_id)
+    job_store.create(job_id, input_dir, output_dir, options, client_id=client.client_id, priority=priority)
+    scheduler.wake()
 
     return {"job_id": job_id, "status": "queued"}
 
 
 @app.post("/cache/name-audio/clear")
-def clear_name_audio_cache():
+def clear_name_audio_cache(x_api_key: str = Header("")):
+    _check_admin_key(x_api_key)
     removed_files = 0
     removed_dirs = 0
     if GLOBAL_NAME_AUDIO_DIR.exists():
@@ -393,43 +858,176 @@ def clear_name_audio_cache():
     }
 
 
-@app.get("/jobs/{job_id}")
-def get_job(job_id: str):
-    job = job_store.get(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="job not found")
+@app.post("/retention/sweep")
+def sweep_retention(x_api_key: str = Header("")):
+    _check_admin_key(x_api_key)
+    result = retention.sweep()
+    return {"status": "ok", "expired": result.expired, "reclaimed_bytes": result.reclaimed_bytes}
+
+
+def _check_worker_token(token: str) -> None:
+    if not WORKER_TOKEN:
+        raise HTTPException(status_code=403, detail="remote workers are disabled; set VIDX_WORKER_TOKEN")
+    if not hmac.compare_digest(token, WORKER_TOKEN):
+        raise HTTPException(status_code=401, detail="invalid worker token")
+
+
+# Shard coordination for workers on other machines (backend.worker --api-url).
+# Only this process opens the job database; lease and scheduling limits are
+# the API's settings.
+@app.post("/workers/shards/claim")
+def worker_claim_shard(
+    worker: str = Form(...),
+    job_id: str = Form(""),
+    allow_heavy: bool = Form(True),
+    x_worker_token: str = Header(""),
+):
+    _check_worker_token(x_worker_token)
+    shard = job_store.claim_shard(
+        worker,
+        SHARD_LEASE_SECONDS,
+        SHARD_MAX_ATTEMPTS,
+        job_id=job_id or None,
+        heavy_rows=HEAVY_JOB_ROWS,
+        max_heavy_jobs=MAX_HEAVY_JOBS,
+        allow_heavy=allow_heavy,
+    )
+    if shard is None:
+        return {"shard": None}
+    job = job_store.get(shard.job_id)
+    return {"shard": asdict(shard), "job": asdict(job), "shard_count": job_store.shard_count(shard.job_id)}
+
+
+@app.post("/workers/shards/{job_id}/{shard_index}/renew")
+def worker_renew_shard(job_id: str, shard_index: int, worker: str = Form(...), x_worker_token: str = Header("")):
+    _check_worker_token(x_worker_token)
+    shard = job_store.get_shard(job_id, shard_index)
+    if shard is None:
+        raise HTTPException(status_code=404, detail="shard not found")
+    shard.worker = worker
+    return {"ok": job_store.renew_shard_lease(shard, SHARD_LEASE_SECONDS)}
+
+
+@app.post("/workers/shards/{job_id}/{shard_index}/finish")
+def worker_finish_shard(
+    job_id: str,
+    shard_index: int,
+    worker: str = Form(...),
+    error: str = Form(""),
+    x_worker_token: str = Header(""),
+):
+    _check_worker_token(x_worker_token)
+    shard = job_store.get_shard(job_id, shard_index)
+    if shard is None:
+        raise HTTPException(status_code=404, detail="shard not found")
+    shard.worker = worker  # finish_shard only accepts the current owner
+    status = job_store.finish_shard(shard, error or None, max_attempts=SHARD_MAX_ATTEMPTS)
+    if status == "done":
+        scheduler.wake()  # the last shard makes the job finalizable
+    return {"status": status}
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+def _job_response(job) -> dict:
     response = {
         "job_id": job.id,
         "status": job.status,
         "created_at": job.created_at,
         "updated_at": job.updated_at,
         "error": job.error,
+        "client_id": job.client_id,
+        "priority": job.priority,
     }
     if job.status == "done" and job.zip_path:
         response["download_url"] = f"/jobs/{job.id}/download"
+    if job.status == "expired":
+        response["reclaimed_bytes"] = job.reclaimed_bytes
+    return response
+
+
+@app.get("/jobs")
+def list_jobs(
+    status: Optional[str] = None,
+    since: Optional[float] = None,
+    before: Optional[float] = None,
+    before_id: Optional[str] = None,
+    limit: int = 50,
+    x_api_key: str = Header(""),
+):
+    # Newest first; pass next_before/next_before_id as ?before=&before_id=
+    # for the next page. Manifest summaries are left to GET /jobs/{id} to
+    # keep this cheap to poll. Clients only see their own jobs.
+    client_id = _visible_client_id(x_api_key)
+    limit = max(1, min(limit, 200))
+    jobs = job_store.list_jobs(
+        status=status, since=since, before=before, before_id=before_id, limit=limit, client_id=client_id
+    )
+    full = len(jobs) == limit
+    return {
+        "jobs": [_job_response(job) for job in jobs],
+        "next_before": jobs[-1].created_at if full else None,
+        "next_before_id": jobs[-1].id if full else None,
+    }
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, x_api_key: str = Header("")):
+    job = _get_visible_job(job_id, x_api_key)
+    response = _job_response(job)
+    shards = job_store.list_shards(job_id)
+    output_dir = Path(job.output_dir)
+    merged: Optional[dict] = None
+    for index in range(max(1, len(shards))):
+        summary = manifest_summary(_artifact_path(_shard_dir(output_dir, index, len(shards)) / "manifest.sqlite3"))
+        if summary is None:
+            continue
+        if merged is None:
+            merged = {"recipients": {}, "dead_letter": []}
+        for status, n in summary["recipients"].items():
+            merged["recipients"][status] = merged["recipients"].get(status, 0) + n
+        merged["dead_letter"] += summary["dead_letter"]
+    if merged is not None:
+        merged["dead_letter"] = sorted(merged["dead_letter"], key=lambda e: e["row_index"])[:100]
+        response.update(merged)
+    if len(shards) > 1:
+        counts: dict[str, int] = {}
+        for shard in shards:
+            counts[shard.status] = counts.get(shard.status, 0) + 1
+        response["shards"] = counts
     return response
 
 
 @app.get("/jobs/{job_id}/download")
-def download(job_id: str):
-    job = job_store.get(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="job not found")
+def download(job_id: str, x_api_key: str = Header("")):
+    job = _get_visible_job(job_id, x_api_key)
+    if job.status == "expired":
+        raise HTTPException(status_code=410, detail="job output expired")
     if job.status != "done" or not job.zip_path:
         raise HTTPException(status_code=400, detail="job not ready")
     zip_path = Path(job.zip_path)
-    if not zip_path.exists():
+    if storage.stat(zip_path) is None:
         raise HTTPException(status_code=404, detail="output not found")
+    # Object storage serves the ZIP directly; only local storage streams through the API.
+    url = storage.presigned_url(zip_path, expires=DOWNLOAD_URL_TTL_SECONDS, filename=f"{job_id}.zip")
+    if url:
+        return RedirectResponse(url, status_code=307)
     return FileResponse(zip_path, filename=f"{job_id}.zip")
 
 
 @app.post("/convert")
 def convert_video(
     base_video: UploadFile = File(...),
-    crf: int = Form(20),
-    preset: str = Form("medium"),
-    audio_bitrate: str = Form("160k"),
+    profile: str = Form("default"),
+    crf: Optional[int] = Form(None),
+    preset: Optional[str] = Form(None),
+    audio_bitrate: Optional[str] = Form(None),
 ):
+    if profile not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown profile: {profile}")
     job_id = uuid.uuid4().hex
     job_dir = DATA_DIR / f"convert_{job_id}"
     input_dir = job_dir / "input"
@@ -442,26 +1040,33 @@ def convert_video(
     input_path = input_dir / f"input_video{input_suffix}"
     output_path = output_dir / "converted.mp4"
     storage.save_upload(base_video.file, input_path)
+    output_dir.mkdir(parents=True, exist_ok=True)  # local scratch for ffmpeg
 
     try:
         convert_cmd = [
             "python3",
             str(REPO_ROOT / "backend" / "convert_video.py"),
             "--input",
-            str(input_path),
+            str(storage.local_path(input_path)),
             "--output",
             str(output_path),
-            "--crf",
-            str(crf),
-            "--preset",
-            preset,
-            "--audio-bitrate",
-            audio_bitrate,
+            "--profile",
+            profile,
         ]
+        if crf is not None:
+            convert_cmd += ["--crf", str(crf)]
+        if preset:
+            convert_cmd += ["--preset", preset]
+        if audio_bitrate:
+            convert_cmd += ["--audio-bitrate", audio_bitrate]
         subprocess.run(convert_cmd, check=True)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
     if not output_path.exists():
         raise HTTPException(status_code=500, detail="conversion failed")
+    storage.put(output_path, output_path)
+    url = storage.presigned_url(output_path, expires=DOWNLOAD_URL_TTL_SECONDS, filename="converted.mp4")
+    if url:
+        return RedirectResponse(url, status_code=303)
     return FileResponse(output_path, filename="converted.mp4")
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hmac
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# API clients for fair-share scheduling. With VIDX_CLIENTS_FILE set, every
+# POST /jobs must present one of its keys (X-Api-Key). The key, not anything
+# the caller sends, decides the client a job is fair-shared under and the
+# highest priority it may ask for:
+#
+#   {"<api key>": {"client_id": "acme", "max_priority": 5}}
+#
+# Without the file, all jobs share one client and priority is clamped to
+# VIDX_MAX_PRIORITY. The same key scopes the read endpoints to the client's
+# own jobs. VIDX_ADMIN_KEY, if set, sees every job and is the only key that
+# may call the maintenance endpoints.
+
+MIN_PRIORITY = -10
+
+
+@dataclass(frozen=True)
+class Client:
+    client_id: str
+    max_priority: int = 0
+
+    def clamp_priority(self, priority: int) -> int:
+        return max(MIN_PRIORITY, min(priority, self.max_priority))
+
+
+class ClientTable:
+    def __init__(self, clients: dict[str, Client], default: Client, admin_key: str = "") -> None:
+        self.clients = clients
+        self.default = default
+        self.admin_key = admin_key
+
+    @classmethod
+    def from_env(cls) -> "ClientTable":
+        default = Client("", max_priority=int(os.environ.get("VIDX_MAX_PRIORITY", "5") or 0))
+        admin_key = os.environ.get("VIDX_ADMIN_KEY", "")
+        path = os.environ.get("VIDX_CLIENTS_FILE", "").strip()
+        if not path:
+            return cls({}, default, admin_key)
+        entries = json.loads(Path(path).read_text(encoding="utf-8"))
+        clients = {
+            str(key): Client(str(entry["client_id"]), int(entry.get("max_priority", 0)))
+            for key, entry in entries.items()
+        }
+        if not clients:
+            raise ValueError(f"No clients in {path}")
+        return cls(clients, default, admin_key)
+
+    def resolve(self, api_key: str) -> Optional[Client]:
+        # None for a missing or unknown key when a client file is configured.
+        if not self.clients:
+            return self.default
+        return self.clients.get(api_key) if api_key else None
+
+    def is_admin(self, api_key: str) -> bool:
+        return bool(self.admin_key) and hmac.compare_digest(api_key, self.admin_key)
@@ -5,6 +5,16 @@ import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from encoding_profiles import (  # noqa: E402
+    PROFILES,
+    audio_encode_args,
+    get_profile,
+    scale_filter,
+    video_encode_args,
+)
+
 
 def die(msg: str, code: int = 1) -> None:
     print(f"Error: {msg}", file=sys.stderr)
@@ -21,9 +31,15 @@ def main() -> int:
     parser = argparse.ArgumentParser(description="Convert MOV to Android-friendly MP4")
     parser.add_argument("--input", required=True, help="Input video path (.MOV or other)")
     parser.add_argument("--output", required=True, help="Output MP4 path")
-    parser.add_argument("--crf", type=int, default=20, help="CRF quality (lower = better)")
-    parser.add_argument("--preset", default="medium", help="x264 preset")
-    parser.add_argument("--audio-bitrate", default="160k", help="Audio bitrate")
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        default="default",
+        help="Named encoding profile; --crf/--preset/--audio-bitrate override its values",
+    )
+    parser.add_argument("--crf", type=int, default=None, help="CRF quality (lower = better)")
+    parser.add_argument("--preset", default=None, help="x264 preset")
+    parser.add_argument("--audio-bitrate", default=None, help="Audio bitrate")
 
     args = parser.parse_args()
 
@@ -40,21 +56,18 @@ def main() -> int:
     if in_path.resolve() == out_path.resolve():
         die("Input and output paths must be different.")
 
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-i",
-        str(in_path),
-        "-c:v",
-        "libx264",
-        "-preset",
-        args.preset,
-        "-crf",
-        str(args.crf),
-        "-c:a",
-        "aac",
-        "-b:a",
-        args.audio_bitrate,
+    profile = get_profile(
+        args.profile,
+        crf=args.crf,
+        preset=args.preset,
+        audio_bitrate=args.audio_bitrate,
+    )
+    cmd = ["ffmpeg", "-y", "-i", str(in_path)]
+    if scale_filter(profile):
+        cmd += ["-vf", scale_filter(profile)]
+    cmd += [
+        *video_encode_args(profile),
+        *audio_encode_args(profile),
         "-movflags",
         "+faststart",
         str(out_path),
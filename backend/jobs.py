@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
@@ -19,18 +20,107 @@ class Job:
     output_dir: str
     zip_path: Optional[str]
     options_json: str
+    reclaimed_bytes: int = 0  # artifact bytes deleted when the job expired
+    started_at: Optional[float] = None
+    client_id: str = ""  # API client/tenant the job is scheduled under
+    priority: int = 0  # higher runs first
+    row_count: int = 0  # recipient rows, known once the job is planned
+    # Holder of the job-level step in progress (planning, finalizing) and its lease.
+    lease_owner: Optional[str] = None
+    lease_until: float = 0.0
+
+
+@dataclass
+class Shard:
+    job_id: str
+    shard_index: int
+    row_start: int
+    row_end: int  # exclusive
+    status: str  # pending, running, done, failed
+    worker: Optional[str]
+    lease_until: float
+    attempts: int
+    error: Optional[str]
+    updated_at: float
+
+
+@dataclass
+class Voice:
+    sample_hash: str
+    status: str  # "cloning" while a job holds the lease, then "ready"
+    voice_id: Optional[str]
+    model_id: Optional[str]
+    voice_sample_path: Optional[str]
+    owner: Optional[str]
+    lease_until: float
+    updated_at: float
+
+
+_JOB_COLUMNS = (
+    "id, status, created_at, updated_at, error, input_dir, output_dir, zip_path, options_json, reclaimed_bytes, "
+    "started_at, client_id, priority, row_count, lease_owner, lease_until"
+)
+_SHARD_COLUMNS = "job_id, shard_index, row_start, row_end, status, worker, lease_until, attempts, error, updated_at"
+_VOICE_COLUMNS = "sample_hash, status, voice_id, model_id, voice_sample_path, owner, lease_until, updated_at"
+
+# SQLite's WAL needs shared memory on one host and network filesystems don't
+# lock reliably: the job database belongs on the API host's local disk, and
+# workers elsewhere reach it through the API.
+_NETWORK_FS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "ceph", "glusterfs", "fuse.sshfs", "fuse.s3fs"}
+
+
+def _on_network_fs(path: Path) -> bool:
+    try:
+        with open("/proc/self/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return False  # not Linux; assume local
+    target = str(path.resolve().parent)
+    best, fstype = "", ""
+    for mount_point, kind in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        prefix = mount_point.rstrip("/") + "/"
+        if (target == mount_point or target.startswith(prefix)) and len(mount_point) > len(best):
+            best, fstype = mount_point, kind
+    return fstype in _NETWORK_FS
 
 
 class JobStore:
-    def __init__(self, db_path: Path) -> None:
+    def __init__(self, db_path: Path, busy_timeout: float = 30.0) -> None:
         self.db_path = db_path
-        self._init_db()
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        # The schema is created on first use, so importing the app (as a
+        # remote worker does) never opens the database.
+        self._init_lock = threading.Lock()
+        self._initialized = False
 
     def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
+        # One connection per thread, kept open. Used as a context manager it
+        # commits or rolls back the transaction but does not close.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # timeout= is SQLite's busy timeout: writers wait instead of failing with "database is locked".
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._init_lock:
+                if not self._initialized:
+                    self._init_db(conn)
+                    self._initialized = True
+        return conn
 
-    def _init_db(self) -> None:
-        with self._connect() as conn:
+    def _init_db(self, conn: sqlite3.Connection) -> None:
+        with conn:
+            if _on_network_fs(self.db_path):
+                print(
+                    f"Job database {self.db_path} is on a network filesystem; not using WAL. "
+                    "Set VIDX_DB_PATH to a local disk."
+                )
+                conn.execute("PRAGMA journal_mode=DELETE")
+            else:
+                # WAL lets status polling read while a job is being written.
+                conn.execute("PRAGMA journal_mode=WAL")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS jobs (
@@ -46,17 +136,90 @@ class JobStore:
                 )
                 """
             )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "reclaimed_bytes" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN reclaimed_bytes INTEGER NOT NULL DEFAULT 0")
+            if "started_at" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN started_at REAL")
+            if "client_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN client_id TEXT NOT NULL DEFAULT ''")
+            if "priority" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+            if "row_count" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN row_count INTEGER NOT NULL DEFAULT 0")
+            if "lease_owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_owner TEXT")
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL NOT NULL DEFAULT 0")
+            # Keyset paging in list_jobs orders by (created_at, id).
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created_id ON jobs (status, created_at, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_id ON jobs (created_at, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_client_created_id ON jobs (client_id, created_at, id)")
+            # Recipient row ranges of a job, claimed and rendered by any worker.
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS shards (
+                    job_id TEXT NOT NULL,
+                    shard_index INTEGER NOT NULL,
+                    row_start INTEGER NOT NULL,
+                    row_end INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    lease_until REAL NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, shard_index)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_shards_status ON shards (status, lease_until)")
+            # Cloned ElevenLabs voices, one per voice sample across all jobs and workers.
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS voices (
+                    sample_hash TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    voice_id TEXT,
+                    model_id TEXT,
+                    voice_sample_path TEXT,
+                    owner TEXT,
+                    lease_until REAL NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
             conn.commit()
 
-    def create(self, job_id: str, input_dir: Path, output_dir: Path, options: dict[str, Any]) -> None:
+    def create(
+        self,
+        job_id: str,
+        input_dir: Path,
+        output_dir: Path,
+        options: dict[str, Any],
+        client_id: str = "",
+        priority: int = 0,
+    ) -> None:
         now = time.time()
         with self._connect() as conn:
             conn.execute(
                 """
-                INSERT INTO jobs (id, status, created_at, updated_at, error, input_dir, output_dir, zip_path, options_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO jobs (id, status, created_at, updated_at, error, input_dir, output_dir, zip_path, options_json,
+                    client_id, priority)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (job_id, "queued", now, now, None, str(input_dir), str(output_dir), None, json.dumps(options)),
+                (
+                    job_id,
+                    "queued",
+                    now,
+                    now,
+                    None,
+                    str(input_dir),
+                    str(output_dir),
+                    None,
+                    json.dumps(options),
+                    client_id,
+                    priority,
+                ),
             )
             conn.commit()
 
@@ -71,25 +234,445 @@ class JobStore:
             )
             conn.commit()
 
-    def get(self, job_id: str) -> Optional[Job]:
+    def claim_queued_job(self, owner: str, lease_seconds: float) -> Optional[Job]:
+        # queued -> running for the highest-priority, oldest queued job, with
+        # a planning lease for owner; the caller plans it. A running job with
+        # no shards whose planning lease lapsed (its planner died) is taken
+        # over the same way. BEGIN IMMEDIATE keeps two schedulers from taking
+        # the same job.
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT id FROM jobs
+                WHERE status = 'queued'
+                   OR (status = 'running' AND lease_until < ?
+                       AND NOT EXISTS (SELECT 1 FROM shards WHERE job_id = jobs.id))
+                ORDER BY priority DESC, created_at LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = 'running', updated_at = ?, started_at = COALESCE(started_at, ?),
+                        lease_owner = ?, lease_until = ?
+                    WHERE id = ?
+                    """,
+                    (now, now, owner, now + lease_seconds, row[0]),
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return self.get(row[0]) if row is not None else None
+
+    def start_job(
+        self, job_id: str, owner: str, options: dict[str, Any], ranges: list[tuple[int, int]], row_count: int
+    ) -> bool:
+        # Stores the resolved options and the job's shards in one transaction
+        # and releases the planning lease; workers can claim the shards from
+        # then on. False if owner lost the lease and another planner took over.
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                UPDATE jobs SET updated_at = ?, options_json = ?, row_count = ?, lease_owner = NULL, lease_until = 0
+                WHERE id = ? AND status = 'running' AND lease_owner = ?
+                """,
+                (now, json.dumps(options), row_count, job_id, owner),
+            )
+            if cur.rowcount != 1:
+                conn.commit()
+                return False
+            conn.execute("DELETE FROM shards WHERE job_id = ?", (job_id,))
+            conn.executemany(
+                """
+                INSERT INTO shards (job_id, shard_index, row_start, row_end, status, updated_at)
+                VALUES (?, ?, ?, ?, 'pending', ?)
+                """,
+                [(job_id, i, start, end, now) for i, (start, end) in enumerate(ranges)],
+            )
+            conn.commit()
+        return True
+
+    def claim_shard(
+        self,
+        worker: str,
+        lease_seconds: float,
+        max_attempts: int,
+        job_id: Optional[str] = None,
+        heavy_rows: int = 0,
+        max_heavy_jobs: int = 0,
+        allow_heavy: bool = True,
+    ) -> Optional[Shard]:
+        # Next pending shard of a running job, or one whose worker stopped
+        # renewing its lease. BEGIN IMMEDIATE takes the write lock up front,
+        # so two workers can't claim the same shard.
+        #
+        # Fair share: higher priority first, then the client with the fewest
+        # live shards, then that client's job with the fewest live shards, so
+        # shards of concurrent jobs interleave instead of running job by job.
+        # Jobs of heavy_rows recipients or more are heavy: at most
+        # max_heavy_jobs of them render at once, and allow_heavy=False (a
+        # slot kept free for small jobs) never takes one.
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Shards that keep losing their worker (OOM-killed node) fail their job instead of looping.
+            conn.execute(
+                """
+                UPDATE shards SET status = 'failed', error = 'worker lease expired', updated_at = ?
+                WHERE status = 'running' AND lease_until < ? AND attempts >= ?
+                """,
+                (now, now, max_attempts),
+            )
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', updated_at = ?, error = 'a shard ran out of attempts'
+                WHERE status = 'running' AND id IN (SELECT job_id FROM shards WHERE status = 'failed')
+                """,
+                (now,),
+            )
+            live = "r.status = 'running' AND r.lease_until >= :now"
+            query = f"""
+                SELECT {", ".join("s." + c.strip() for c in _SHARD_COLUMNS.split(","))}
+                FROM shards s JOIN jobs j ON j.id = s.job_id
+                WHERE j.status = 'running'
+                  AND (s.status = 'pending' OR (s.status = 'running' AND s.lease_until < :now))
+            """
+            params: dict[str, Any] = {"now": now}
+            if job_id is not None:
+                query += " AND s.job_id = :job_id"
+                params["job_id"] = job_id
+            if heavy_rows > 0:
+                query += f"""
+                  AND (j.row_count < :heavy_rows OR (:allow_heavy AND (
+                      EXISTS (SELECT 1 FROM shards r WHERE r.job_id = j.id AND {live})
+                      OR (SELECT COUNT(DISTINCT r.job_id) FROM shards r JOIN jobs rj ON rj.id = r.job_id
+                          WHERE {live} AND rj.row_count >= :heavy_rows) < :max_heavy
+                  )))
+                """
+                params.update(
+                    heavy_rows=heavy_rows,
+                    allow_heavy=int(allow_heavy),
+                    max_heavy=max_heavy_jobs if max_heavy_jobs > 0 else 1 << 30,
+                )
+            query += f"""
+                ORDER BY j.priority DESC,
+                    (SELECT COUNT(*) FROM shards r JOIN jobs rj ON rj.id = r.job_id
+                     WHERE {live} AND rj.client_id = j.client_id),
+                    (SELECT COUNT(*) FROM shards r WHERE r.job_id = j.id AND {live}),
+                    j.created_at, s.shard_index
+                LIMIT 1
+            """
+            row = conn.execute(query, params).fetchone()
+            if row is None:
+                conn.commit()
+                return None
+            shard = Shard(*row)
+            conn.execute(
+                """
+                UPDATE shards SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1,
+                    error = NULL, updated_at = ?
+                WHERE job_id = ? AND shard_index = ?
+                """,
+                (worker, now + lease_seconds, now, shard.job_id, shard.shard_index),
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        shard.status = "running"
+        shard.worker = worker
+        shard.lease_until = now + lease_seconds
+        shard.attempts += 1
+        return shard
+
+    def renew_shard_lease(self, shard: Shard, lease_seconds: float) -> bool:
+        # False once another worker has taken the shard over.
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                UPDATE shards SET lease_until = ?, updated_at = ?
+                WHERE job_id = ? AND shard_index = ? AND worker = ? AND status = 'running'
+                """,
+                (now + lease_seconds, now, shard.job_id, shard.shard_index, shard.worker),
+            )
+            conn.commit()
+            return cur.rowcount == 1
+
+    def finish_shard(self, shard: Shard, error: Optional[str] = None, max_attempts: int = 1) -> str:
+        # Records the outcome and returns the shard's new status: done, or on
+        # error pending (retried by the next claim) until attempts run out,
+        # then failed, which fails the job too.
+        if error is None:
+            status = "done"
+        else:
+            status = "failed" if shard.attempts >= max_attempts else "pending"
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                UPDATE shards SET status = ?, error = ?, lease_until = 0, updated_at = ?
+                WHERE job_id = ? AND shard_index = ? AND worker = ? AND status = 'running'
+                """,
+                (status, error[-2000:] if error else None, now, shard.job_id, shard.shard_index, shard.worker),
+            )
+            if cur.rowcount != 1:
+                conn.commit()
+                return "lost"  # lease expired and another worker owns it now
+            if status == "failed":
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = 'failed', updated_at = ?, error = ?, zip_path = NULL
+                    WHERE id = ? AND status IN ('running', 'finalizing')
+                    """,
+                    (now, error, shard.job_id),
+                )
+            conn.commit()
+        return status
+
+    def get_shard(self, job_id: str, shard_index: int) -> Optional[Shard]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {_SHARD_COLUMNS} FROM shards WHERE job_id = ? AND shard_index = ?",
+                (job_id, shard_index),
+            ).fetchone()
+        return Shard(*row) if row else None
+
+    def shard_count(self, job_id: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT COUNT(*) FROM shards WHERE job_id = ?", (job_id,)).fetchone()
+        return int(row[0])
+
+    # Jobs whose shards are all done but that nobody is finalizing: the
+    # worker that finished the last shard died before or during the merge.
+    _FINALIZABLE = """
+        ((status = 'running'
+          AND EXISTS (SELECT 1 FROM shards WHERE job_id = jobs.id)
+          AND NOT EXISTS (SELECT 1 FROM shards WHERE job_id = jobs.id AND status != 'done'))
+         OR (status = 'finalizing' AND lease_until < ?))
+    """
+
+    def begin_finalize(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        # running -> finalizing once every shard is done, or takes over a
+        # finalize whose lease lapsed; exactly one caller wins.
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                f"""
+                UPDATE jobs SET status = 'finalizing', updated_at = ?, lease_owner = ?, lease_until = ?
+                WHERE id = ? AND {self._FINALIZABLE}
+                """,
+                (now, owner, now + lease_seconds, job_id, now),
+            )
+            conn.commit()
+            return cur.rowcount == 1
+
+    def next_finalizable_job(self) -> Optional[str]:
         with self._connect() as conn:
             row = conn.execute(
+                f"SELECT id FROM jobs WHERE status IN ('running', 'finalizing') AND {self._FINALIZABLE} "
+                "ORDER BY created_at LIMIT 1",
+                (time.time(),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def renew_job_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, owner),
+            )
+            conn.commit()
+            return cur.rowcount == 1
+
+    def complete_job(self, job_id: str, owner: str, zip_path: Path) -> bool:
+        # finalizing -> done, only for the finalizer still holding the lease.
+        with self._connect() as conn:
+            cur = conn.execute(
                 """
-                SELECT id, status, created_at, updated_at, error, input_dir, output_dir, zip_path, options_json
-                FROM jobs WHERE id = ?
+                UPDATE jobs SET status = 'done', updated_at = ?, error = NULL, zip_path = ?,
+                    lease_owner = NULL, lease_until = 0
+                WHERE id = ? AND status = 'finalizing' AND lease_owner = ?
                 """,
+                (time.time(), str(zip_path), job_id, owner),
+            )
+            conn.commit()
+            return cur.rowcount == 1
+
+    def list_shards(self, job_id: str) -> list[Shard]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_SHARD_COLUMNS} FROM shards WHERE job_id = ? ORDER BY shard_index",
                 (job_id,),
+            ).fetchall()
+        return [Shard(*row) for row in rows]
+
+    def count_by_status(self) -> dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: int(row[1]) for row in rows}
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(*row) if row else None
+
+    def list_jobs(
+        self,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        before: Optional[float] = None,
+        before_id: Optional[str] = None,
+        limit: int = 50,
+        client_id: Optional[str] = None,
+    ) -> list[Job]:
+        # Newest first. Page with before/before_id = created_at/id of the last
+        # job returned; the id breaks ties between jobs created at the same time.
+        clauses = []
+        params: list[Any] = []
+        if client_id is not None:
+            clauses.append("client_id = ?")
+            params.append(client_id)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if before is not None and before_id is not None:
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params += [before, before, before_id]
+        elif before is not None:
+            clauses.append("created_at < ?")
+            params.append(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(max(1, limit))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                params,
+            ).fetchall()
+        return [Job(*row) for row in rows]
+
+    def finished_jobs(self, statuses: tuple[str, ...]) -> list[Job]:
+        # Oldest finish first: the order retention deletes in.
+        marks = ", ".join("?" for _ in statuses)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE status IN ({marks}) ORDER BY updated_at",
+                statuses,
+            ).fetchall()
+        return [Job(*row) for row in rows]
+
+    def mark_expired(self, job_id: str, reclaimed_bytes: int) -> bool:
+        # Only finished jobs expire; False if the job changed status meanwhile.
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                UPDATE jobs SET status = 'expired', updated_at = ?, zip_path = NULL, reclaimed_bytes = ?
+                WHERE id = ? AND status IN ('done', 'failed')
+                """,
+                (time.time(), int(reclaimed_bytes), job_id),
+            )
+            conn.commit()
+            return cur.rowcount == 1
+
+    def live_shard_count(self, job_id: str) -> int:
+        # Shards still rendering under a current lease, e.g. siblings of a
+        # shard that already failed the job.
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM shards WHERE job_id = ? AND status = 'running' AND lease_until >= ?",
+                (job_id, time.time()),
             ).fetchone()
-        if not row:
-            return None
-        return Job(
-            id=row[0],
-            status=row[1],
-            created_at=row[2],
-            updated_at=row[3],
-            error=row[4],
-            input_dir=row[5],
-            output_dir=row[6],
-            zip_path=row[7],
-            options_json=row[8],
-        )
+        return int(row[0])
+
+    def fail_job(self, job_id: str, error: str) -> bool:
+        # Fails a job that is still in flight; a late report from a shard
+        # never overwrites done or expired.
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', updated_at = ?, error = ?, zip_path = NULL
+                WHERE id = ? AND status IN ('queued', 'running', 'finalizing')
+                """,
+                (time.time(), error, job_id),
+            )
+            conn.commit()
+            return cur.rowcount == 1
+
+    def get_voice(self, sample_hash: str) -> Optional[Voice]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {_VOICE_COLUMNS} FROM voices WHERE sample_hash = ?", (sample_hash,)).fetchone()
+        return Voice(*row) if row else None
+
+    def claim_voice_clone(self, sample_hash: str, owner: str, lease_seconds: float) -> bool:
+        # True if owner may clone this sample now: no row yet, or the previous
+        # claimant's lease ran out without the voice becoming ready. One
+        # statement, so concurrent claimants can't both win.
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                INSERT INTO voices (sample_hash, status, owner, lease_until, updated_at)
+                VALUES (?, 'cloning', ?, ?, ?)
+                ON CONFLICT(sample_hash) DO UPDATE SET
+                    owner = excluded.owner,
+                    lease_until = excluded.lease_until,
+                    updated_at = excluded.updated_at
+                WHERE voices.status != 'ready' AND voices.lease_until < ?
+                """,
+                (sample_hash, owner, now + lease_seconds, now, now),
+            )
+            conn.commit()
+            return cur.rowcount == 1
+
+    def complete_voice_clone(
+        self, sample_hash: str, owner: str, voice_id: str, model_id: Optional[str], voice_sample_path: str
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE voices SET status = 'ready', voice_id = ?, model_id = ?, voice_sample_path = ?,
+                    lease_until = 0, updated_at = ?
+                WHERE sample_hash = ? AND owner = ?
+                """,
+                (voice_id, model_id, voice_sample_path, time.time(), sample_hash, owner),
+            )
+            conn.commit()
+
+    def release_voice_clone(self, sample_hash: str, owner: str) -> None:
+        # Failed clone: drop the claim so the next job can try straight away.
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM voices WHERE sample_hash = ? AND owner = ? AND status = 'cloning'",
+                (sample_hash, owner),
+            )
+            conn.commit()
+
+    def import_voices(self, entries: dict[str, dict[str, Any]]) -> int:
+        # One-off import of the old elevenlabs_voice_cache.json; existing rows win.
+        now = time.time()
+        rows = [
+            (sample_hash, e["voice_id"], e.get("model_id"), e.get("voice_sample_path"), now)
+            for sample_hash, e in entries.items()
+            if isinstance(e, dict) and e.get("voice_id")
+        ]
+        with self._connect() as conn:
+            cur = conn.executemany(
+                """
+                INSERT OR IGNORE INTO voices (sample_hash, status, voice_id, model_id, voice_sample_path, updated_at)
+                VALUES (?, 'ready', ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+            return cur.rowcount
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+# Minimal Prometheus text-format (0.0.4) registry; metrics live in the API
+# process, so run a single uvicorn worker per host or scrape each worker.
+
+DEFAULT_BUCKETS = (0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0, 21600.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += self.samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, value: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def snapshot(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, collect: Optional[Callable[[], dict[tuple[str, ...], float]]] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> list[str]:
+        if self._collect is not None:
+            values = self._collect()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def _entry(self, key: tuple[str, ...]) -> list:
+        if key not in self._values:
+            self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        return self._values[key]
+
+    def observe(self, value: float, **labels: str) -> None:
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        with self._lock:
+            entry = self._entry(self._key(labels))
+            entry[0][idx] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def merge(self, counts: list[int], total: float, count: int, **labels: str) -> None:
+        # Adds pre-bucketed observations; bucket bounds must match.
+        if len(counts) != len(self.buckets) + 1:
+            return
+        with self._lock:
+            entry = self._entry(self._key(labels))
+            for i, c in enumerate(counts):
+                entry[0][i] += int(c)
+            entry[1] += float(total)
+            entry[2] += int(count)
+
+    def samples(self) -> list[str]:
+        lines: list[str] = []
+        with self._lock:
+            items = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(list(self.buckets) + [float("inf")], counts):
+                cumulative += c
+                le = f'le="{_fmt(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+class DirSizeCache:
+    # Walking DATA_DIR on every scrape is expensive; refresh at most every ttl seconds.
+    def __init__(self, path: Path, ttl: float = 60.0) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._value = 0
+        self._at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> int:
+        with self._lock:
+            if time.monotonic() - self._at < self.ttl and self._at:
+                return self._value
+        total = 0
+        for root, _dirs, files in os.walk(self.path):
+            for fname in files:
+                try:
+                    total += os.lstat(os.path.join(root, fname)).st_size
+                except OSError:
+                    continue
+        with self._lock:
+            self._value = total
+            self._at = time.monotonic()
+        return total
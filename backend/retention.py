@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .jobs import Job, JobStore
+from .storage import StorageBackend
+
+# Deletes finished jobs' artifacts (their DATA_DIR/<job_id> tree in the
+# storage backend): first every job past its status TTL, then the oldest
+# remaining finished jobs until job artifacts fit under max_bytes. Queued,
+# running and finalizing jobs are never touched. Expired jobs stay in the
+# database with status "expired" and the bytes reclaimed.
+
+SWEPT_STATUSES = ("done", "failed")
+
+
+def _env_hours(name: str, default: float) -> float:
+    raw = os.environ.get(name, "").strip()
+    return float(raw) * 3600.0 if raw else default * 3600.0
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    # status -> seconds after the job finished; 0 keeps that status forever.
+    ttl_seconds: dict[str, float] = field(default_factory=dict)
+    # Cap on the bytes of all job folders; 0 disables it.
+    max_bytes: int = 0
+    interval_seconds: float = 3600.0
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        return cls(
+            ttl_seconds={
+                "done": _env_hours("VIDX_RETENTION_DONE_HOURS", 168.0),
+                "failed": _env_hours("VIDX_RETENTION_FAILED_HOURS", 72.0),
+            },
+            max_bytes=int(os.environ.get("VIDX_RETENTION_MAX_BYTES", "0") or 0),
+            interval_seconds=float(os.environ.get("VIDX_RETENTION_SWEEP_SECONDS", "3600") or 3600),
+        )
+
+
+@dataclass
+class SweepResult:
+    expired: list[str] = field(default_factory=list)
+    reclaimed_bytes: int = 0
+
+
+class RetentionSweeper:
+    def __init__(
+        self,
+        job_store: JobStore,
+        data_dir: Path,
+        storage: StorageBackend,
+        policy: RetentionPolicy,
+        on_expire: Optional[Callable[[Job, int], None]] = None,
+    ) -> None:
+        self.job_store = job_store
+        self.data_dir = data_dir.resolve()
+        self.storage = storage
+        self.policy = policy
+        self.on_expire = on_expire
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._sweep_lock = threading.Lock()
+
+    def _job_dir(self, job: Job) -> Optional[Path]:
+        # DATA_DIR/<job_id>/{input,output}; anything else is left alone.
+        job_dir = Path(job.input_dir).resolve().parent
+        if job_dir.parent != self.data_dir or job_dir.name != job.id:
+            return None
+        return job_dir
+
+    def _job_bytes(self, job_dir: Optional[Path]) -> int:
+        return sum(s.size for s in self.storage.list(job_dir)) if job_dir is not None else 0
+
+    def _expire(self, job: Job, job_dir: Optional[Path]) -> int:
+        size = 0
+        if job_dir is not None:
+            size = self.storage.delete(job_dir)
+            if not self.storage.is_local:
+                # Render scratch left on this node.
+                shutil.rmtree(job_dir, ignore_errors=True)
+        if not self.job_store.mark_expired(job.id, size):
+            return size
+        if self.on_expire is not None:
+            self.on_expire(job, size)
+        return size
+
+    def sweep(self, now: Optional[float] = None) -> SweepResult:
+        now = time.time() if now is None else now
+        result = SweepResult()
+        with self._sweep_lock:
+            remaining: list[tuple[Job, Optional[Path], int]] = []
+            for job in self.job_store.finished_jobs(SWEPT_STATUSES):
+                if self.job_store.live_shard_count(job.id):
+                    # A failed job's sibling shards may still be rendering into its folder.
+                    continue
+                job_dir = self._job_dir(job)
+                ttl = self.policy.ttl_seconds.get(job.status, 0.0)
+                if ttl > 0 and now - job.updated_at > ttl:
+                    result.reclaimed_bytes += self._expire(job, job_dir)
+                    result.expired.append(job.id)
+                elif self.policy.max_bytes > 0:
+                    remaining.append((job, job_dir, self._job_bytes(job_dir)))
+
+            if self.policy.max_bytes > 0:
+                active = self.job_store.list_jobs(status="running", limit=10_000)
+                active += self.job_store.list_jobs(status="finalizing", limit=10_000)
+                active += self.job_store.list_jobs(status="queued", limit=10_000)
+                total = sum(size for _, _, size in remaining)
+                total += sum(self._job_bytes(self._job_dir(job)) for job in active)
+                # remaining is oldest first.
+                for job, job_dir, _size in remaining:
+                    if total <= self.policy.max_bytes:
+                        break
+                    reclaimed = self._expire(job, job_dir)
+                    total -= reclaimed
+                    result.reclaimed_bytes += reclaimed
+                    result.expired.append(job.id)
+        return result
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                result = self.sweep()
+                if result.expired:
+                    print(f"Retention: expired {len(result.expired)} jobs, reclaimed {result.reclaimed_bytes} bytes")
+            except Exception as exc:
+                print(f"Retention sweep failed: {exc}")
+            self._stop.wait(self.policy.interval_seconds)
+
+    def start(self) -> None:
+        if self._thread is not None or self.policy.interval_seconds <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="retention-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
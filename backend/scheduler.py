@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+from .jobs import Job, JobStore
+
+# Runs queued jobs inside the API process instead of starting each one as it
+# arrives. Planner threads take queued jobs by priority and split them into
+# shards. Render slots then claim shards one at a time through the job
+# database's fair-share order (see JobStore.claim_shard), so a small job's
+# shards run between a large campaign's instead of behind it. With more than
+# one slot, the first slot only takes light jobs, so previews never wait for
+# a campaign shard to finish. Remote backend.worker processes claim from
+# the same queue.
+
+
+@dataclass(frozen=True)
+class SchedulerPolicy:
+    plan_workers: int = 2
+    # Shards rendered at once by this process; 0 leaves rendering to workers.
+    render_slots: int = 2
+    poll_seconds: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "SchedulerPolicy":
+        return cls(
+            plan_workers=max(1, int(os.environ.get("VIDX_PLAN_WORKERS", "2") or 2)),
+            render_slots=max(0, int(os.environ.get("VIDX_RENDER_SLOTS", "2") or 0)),
+            poll_seconds=float(os.environ.get("VIDX_SCHEDULER_POLL_SECONDS", "1") or 1),
+        )
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        job_store: JobStore,
+        policy: SchedulerPolicy,
+        owner: str,
+        lease_seconds: float,
+        plan: Callable[[Job], None],
+        work: Callable[[bool], int],
+        finalize: Callable[[], bool],
+    ) -> None:
+        # owner and lease_seconds are the planning lease taken on each job;
+        # plan(job) splits a claimed job into shards; work(allow_heavy)
+        # renders claimable shards and returns how many it ran; finalize()
+        # merges one job whose shards are all done (rendered by remote
+        # workers, or by a node that died before merging).
+        self.job_store = job_store
+        self.policy = policy
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.plan = plan
+        self.work = work
+        self.finalize = finalize
+        self._stop = threading.Event()
+        # wake() bumps the counter and notifies every idle thread; each loop
+        # remembers the count it started from, so a wake() that lands while
+        # it is busy still cuts its next wait short.
+        self._wake = threading.Condition()
+        self._wakeups = 0
+        self._threads: list[threading.Thread] = []
+
+    def wake(self) -> None:
+        # New work (a job was queued or planned): skip the rest of the poll wait.
+        with self._wake:
+            self._wakeups += 1
+            self._wake.notify_all()
+
+    def _seen(self) -> int:
+        with self._wake:
+            return self._wakeups
+
+    def _idle(self, seen: int) -> None:
+        with self._wake:
+            self._wake.wait_for(
+                lambda: self._wakeups != seen or self._stop.is_set(), self.policy.poll_seconds
+            )
+
+    def _plan_loop(self) -> None:
+        while not self._stop.is_set():
+            seen = self._seen()
+            try:
+                job = self.job_store.claim_queued_job(self.owner, self.lease_seconds)
+                if job is not None:
+                    self.plan(job)
+                    self.wake()
+                elif not self.finalize():
+                    self._idle(seen)
+            except Exception as exc:
+                print(f"Job planning failed: {exc}")
+                self._stop.wait(self.policy.poll_seconds)
+
+    def _render_loop(self, allow_heavy: bool) -> None:
+        while not self._stop.is_set():
+            seen = self._seen()
+            try:
+                if not self.work(allow_heavy):
+                    self._idle(seen)
+            except Exception as exc:
+                print(f"Shard rendering failed: {exc}")
+                self._stop.wait(self.policy.poll_seconds)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        # Planner threads also finalize, so an API without render slots still completes jobs.
+        for i in range(self.policy.plan_workers):
+            self._threads.append(threading.Thread(target=self._plan_loop, name=f"job-planner-{i}", daemon=True))
+        for i in range(self.policy.render_slots):
+            allow_heavy = i > 0 or self.policy.render_slots == 1
+            self._threads.append(
+                threading.Thread(target=self._render_loop, args=(allow_heavy,), name=f"render-slot-{i}", daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.wake()
+        threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=5)
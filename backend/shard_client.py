@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import requests
+
+from .jobs import Job, Shard
+
+# The slice of JobStore that rendering shards needs, over HTTP. Workers on
+# other machines use it instead of opening the job database: SQLite (in WAL
+# mode) is only safe from processes on the API host.
+
+
+class ShardClient:
+    def __init__(self, api_url: str, token: str, timeout: float = 30.0) -> None:
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers["X-Worker-Token"] = token
+        # Jobs and shard counts arrive with each claim.
+        self._jobs: dict[str, Job] = {}
+        self._shard_counts: dict[str, int] = {}
+
+    def _post(self, path: str, data: dict) -> dict:
+        resp = self._session.post(f"{self.api_url}{path}", data=data, timeout=self.timeout)
+        if resp.status_code >= 300:
+            raise RuntimeError(f"VidX API {path} failed ({resp.status_code}): {resp.text[:400]}")
+        return resp.json()
+
+    def claim_shard(
+        self,
+        worker: str,
+        lease_seconds: float,
+        max_attempts: int,
+        job_id: Optional[str] = None,
+        heavy_rows: int = 0,
+        max_heavy_jobs: int = 0,
+        allow_heavy: bool = True,
+    ) -> Optional[Shard]:
+        # Leases, attempts and heavy-job limits are the API's settings; only
+        # the worker's own choices are sent.
+        payload = self._post(
+            "/workers/shards/claim",
+            {"worker": worker, "job_id": job_id or "", "allow_heavy": str(allow_heavy).lower()},
+        )
+        if payload.get("shard") is None:
+            return None
+        job = Job(**payload["job"])
+        self._jobs[job.id] = job
+        self._shard_counts[job.id] = int(payload["shard_count"])
+        return Shard(**payload["shard"])
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def shard_count(self, job_id: str) -> int:
+        return self._shard_counts.get(job_id, 1)
+
+    def renew_shard_lease(self, shard: Shard, lease_seconds: float) -> bool:
+        path = f"/workers/shards/{shard.job_id}/{shard.shard_index}/renew"
+        return bool(self._post(path, {"worker": shard.worker})["ok"])
+
+    def finish_shard(self, shard: Shard, error: Optional[str] = None, max_attempts: int = 1) -> str:
+        path = f"/workers/shards/{shard.job_id}/{shard.shard_index}/finish"
+        status = str(self._post(path, {"worker": shard.worker, "error": error or ""})["status"])
+        self._jobs.pop(shard.job_id, None)
+        self._shard_counts.pop(shard.job_id, None)
+        return status
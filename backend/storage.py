@@ -1,19 +1,61 @@
 from __future__ import annotations
 
+import io
 import os
 import shutil
+from dataclasses import dataclass
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Optional
+
+from cache_lock import cache_lock, temp_path
+
+MULTIPART_CHUNK_BYTES = 8 * 1024 * 1024  # S3 minimum part size is 5 MiB
+RANGE_READ_BYTES = 1024 * 1024
 
 
 class StorageError(RuntimeError):
     pass
 
 
+@dataclass(frozen=True)
+class StorageStat:
+    path: Path
+    size: int
+    mtime: float
+    etag: Optional[str] = None
+
+
 class StorageBackend:
+    # Paths are DATA_DIR-relative locations on every backend; local_path()
+    # gives tools that need a real file (ffmpeg, sqlite) a copy on disk.
+    is_local = True
+
     def save_upload(self, file_obj: BinaryIO, dest_path: Path) -> Path:
         raise NotImplementedError
 
+    def put(self, src: Path, dest_path: Path) -> Path:
+        # Stores a local file at dest_path.
+        raise NotImplementedError
+
+    def get(self, path: Path, dest: Path) -> Path:
+        # Copies the stored file to a local dest.
+        raise NotImplementedError
+
+    def stat(self, path: Path) -> Optional[StorageStat]:
+        raise NotImplementedError
+
+    def list(self, prefix: Path) -> list[StorageStat]:
+        # Every file under prefix, recursively.
+        raise NotImplementedError
+
+    def delete(self, path: Path) -> int:
+        # Removes a file or everything under a prefix; returns bytes removed.
+        raise NotImplementedError
+
+    def presigned_url(self, path: Path, expires: int = 3600, filename: Optional[str] = None) -> Optional[str]:
+        # A time-limited direct download URL, or None if clients must go through the API.
+        return None
+
     def open(self, path: Path, mode: str = "rb"):
         raise NotImplementedError
 
@@ -23,6 +65,10 @@ class StorageBackend:
     def mkdir(self, path: Path) -> None:
         raise NotImplementedError
 
+    def local_path(self, path: Path) -> Path:
+        # A local file with path's content, for tools that need a real file (ffmpeg).
+        raise NotImplementedError
+
 
 class LocalStorage(StorageBackend):
     def save_upload(self, file_obj: BinaryIO, dest_path: Path) -> Path:
@@ -40,27 +86,319 @@ class LocalStorage(StorageBackend):
     def mkdir(self, path: Path) -> None:
         path.mkdir(parents=True, exist_ok=True)
 
+    def local_path(self, path: Path) -> Path:
+        return path
+
+    def put(self, src: Path, dest_path: Path) -> Path:
+        if src.resolve() == dest_path.resolve():
+            return dest_path
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temp_path(dest_path)
+        try:
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dest_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return dest_path
+
+    def get(self, path: Path, dest: Path) -> Path:
+        return self.put(path, dest)
+
+    def stat(self, path: Path) -> Optional[StorageStat]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return StorageStat(path=path, size=st.st_size, mtime=st.st_mtime)
+
+    def list(self, prefix: Path) -> list[StorageStat]:
+        if prefix.is_file():
+            stat = self.stat(prefix)
+            return [stat] if stat else []
+        out = []
+        for root, _dirs, files in os.walk(prefix):
+            for fname in files:
+                try:
+                    st = os.lstat(os.path.join(root, fname))
+                except OSError:
+                    continue
+                out.append(StorageStat(path=Path(root) / fname, size=st.st_size, mtime=st.st_mtime))
+        return out
+
+    def delete(self, path: Path) -> int:
+        removed = sum(s.size for s in self.list(path))
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        # Whatever survived (open files, permissions) is not reclaimed.
+        return removed - sum(s.size for s in self.list(path)) if path.exists() else removed
+
+
+class _S3RangeReader(io.RawIOBase):
+    # Seekable read-only view of one object; each read is a ranged GET, so
+    # reading the tail of a large file doesn't download the whole thing.
+    def __init__(self, client, bucket: str, key: str, size: int) -> None:
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buf) -> int:
+        if self._pos >= self._size or len(buf) == 0:
+            return 0
+        end = min(self._size, self._pos + len(buf)) - 1
+        resp = self._client.get_object(Bucket=self._bucket, Key=self._key, Range=f"bytes={self._pos}-{end}")
+        data = resp["Body"].read()
+        n = len(data)
+        buf[:n] = data
+        self._pos += n
+        return n
+
+    def readall(self) -> bytes:
+        # One GET for the rest instead of RawIOBase's 8 KiB loop.
+        if self._pos >= self._size:
+            return b""
+        resp = self._client.get_object(Bucket=self._bucket, Key=self._key, Range=f"bytes={self._pos}-")
+        data = resp["Body"].read()
+        self._pos += len(data)
+        return data
+
 
 class S3Storage(StorageBackend):
-    def __init__(self, bucket: str):
-        raise StorageError(
-            "S3 backend not configured yet. Set STORAGE_BACKEND=local or implement S3Storage."
-        )
+    # Paths stay local-looking (DATA_DIR/<job>/input/...) and map to keys
+    # relative to root, so callers don't care which backend is configured.
+    # local_path() is a read-through disk cache: a render node downloads each
+    # object once, and concurrent jobs on the host wait for that download.
+    is_local = False
+
+    def __init__(
+        self,
+        bucket: str,
+        *,
+        root: Path,
+        cache_dir: Path,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        cache_max_bytes: int = 0,
+        chunk_bytes: int = MULTIPART_CHUNK_BYTES,
+    ) -> None:
+        try:
+            import boto3
+        except ImportError as exc:
+            raise StorageError("boto3 is not installed. Run: pip install boto3") from exc
+        self.bucket = bucket
+        self.root = root.resolve()
+        self.cache_dir = cache_dir
+        self.prefix = prefix.strip("/")
+        self.cache_max_bytes = cache_max_bytes
+        self.chunk_bytes = max(5 * 1024 * 1024, chunk_bytes)
+        self._client = boto3.client("s3", endpoint_url=endpoint_url or None, region_name=region or None)
+
+    def key(self, path: Path) -> str:
+        try:
+            rel = Path(path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            raise StorageError(f"{path} is outside the storage root {self.root}") from None
+        return f"{self.prefix}/{rel}" if self.prefix else rel
+
+    def path_for(self, key: str) -> Path:
+        rel = key[len(self.prefix) + 1 :] if self.prefix else key
+        return self.root / rel
+
+    def _head(self, key: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self._client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
 
     def save_upload(self, file_obj: BinaryIO, dest_path: Path) -> Path:
-        raise StorageError("S3 backend not implemented")
+        # Streams in chunk_bytes parts; small files go up in one PUT.
+        key = self.key(dest_path)
+        first = file_obj.read(self.chunk_bytes)
+        if len(first) < self.chunk_bytes:
+            self._client.put_object(Bucket=self.bucket, Key=key, Body=first)
+            return dest_path
+        upload_id = self._client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+        parts = []
+        try:
+            chunk = first
+            while chunk:
+                number = len(parts) + 1
+                resp = self._client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=chunk
+                )
+                parts.append({"ETag": resp["ETag"], "PartNumber": number})
+                chunk = file_obj.read(self.chunk_bytes)
+            self._client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            # Otherwise the uploaded parts linger (and are billed) until a lifecycle rule clears them.
+            self._client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+        return dest_path
+
+    def put(self, src: Path, dest_path: Path) -> Path:
+        with open(src, "rb") as f:
+            return self.save_upload(f, dest_path)
+
+    def get(self, path: Path, dest: Path) -> Path:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temp_path(dest)
+        try:
+            with open(tmp, "wb") as f:
+                self._client.download_fileobj(self.bucket, self.key(path), f)
+            os.replace(tmp, dest)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return dest
+
+    def stat(self, path: Path) -> Optional[StorageStat]:
+        head = self._head(self.key(path))
+        if head is None:
+            return None
+        return StorageStat(
+            path=path,
+            size=int(head["ContentLength"]),
+            mtime=head["LastModified"].timestamp(),
+            etag=str(head.get("ETag", "")).strip('"'),
+        )
+
+    def _list_objects(self, prefix: Path) -> list[dict]:
+        key = self.key(prefix)
+        objects = []
+        paginator = self._client.get_paginator("list_objects_v2")
+        # The exact key (a file) plus everything below it (a "directory").
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=key):
+            for obj in page.get("Contents", []):
+                if obj["Key"] == key or obj["Key"].startswith(key + "/"):
+                    objects.append(obj)
+        return objects
+
+    def list(self, prefix: Path) -> list[StorageStat]:
+        return [
+            StorageStat(
+                path=self.path_for(obj["Key"]),
+                size=int(obj["Size"]),
+                mtime=obj["LastModified"].timestamp(),
+                etag=str(obj.get("ETag", "")).strip('"'),
+            )
+            for obj in self._list_objects(prefix)
+        ]
+
+    def delete(self, path: Path) -> int:
+        objects = self._list_objects(path)
+        for i in range(0, len(objects), 1000):  # DeleteObjects takes at most 1000 keys
+            batch = objects[i : i + 1000]
+            self._client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": obj["Key"]} for obj in batch], "Quiet": True},
+            )
+        return sum(int(obj["Size"]) for obj in objects)
+
+    def presigned_url(self, path: Path, expires: int = 3600, filename: Optional[str] = None) -> Optional[str]:
+        params = {"Bucket": self.bucket, "Key": self.key(path)}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        return self._client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires)
 
     def open(self, path: Path, mode: str = "rb"):
-        raise StorageError("S3 backend not implemented")
+        if mode != "rb":
+            raise StorageError(f"S3Storage.open supports mode 'rb' only, got {mode!r}")
+        key = self.key(path)
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(f"s3://{self.bucket}/{key}")
+        reader = _S3RangeReader(self._client, self.bucket, key, int(head["ContentLength"]))
+        return io.BufferedReader(reader, buffer_size=RANGE_READ_BYTES)
 
     def exists(self, path: Path) -> bool:
-        raise StorageError("S3 backend not implemented")
+        return self._head(self.key(path)) is not None
 
     def mkdir(self, path: Path) -> None:
-        raise StorageError("S3 backend not implemented")
+        # Prefixes are implicit in S3.
+        return None
 
+    def local_path(self, path: Path) -> Path:
+        key = self.key(path)
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(f"s3://{self.bucket}/{key}")
+        etag = str(head.get("ETag", "")).strip('"')
+        cached = self.cache_dir / key
+        stamp = cached.with_name(cached.name + ".etag")
+        with cache_lock(cached):
+            if cached.exists() and stamp.exists() and stamp.read_text(encoding="utf-8") == etag:
+                os.utime(cached)  # recency for cache trimming
+                return cached
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = temp_path(cached)
+            try:
+                with open(tmp, "wb") as f:
+                    self._client.download_fileobj(self.bucket, key, f)
+                os.replace(tmp, cached)
+            finally:
+                tmp.unlink(missing_ok=True)
+            stamp.write_text(etag, encoding="utf-8")
+        self._trim_cache(keep=cached)
+        return cached
 
-def get_storage_backend() -> StorageBackend:
+    def _trim_cache(self, keep: Path) -> None:
+        # Least recently used first; keep is the file just handed out.
+        if self.cache_max_bytes <= 0:
+            return
+        files = []
+        total = 0
+        for p in self.cache_dir.rglob("*"):
+            if not p.is_file() or p.name.endswith((".etag", ".lock", ".tmp")):
+                continue
+            st = p.stat()
+            files.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        for _, size, p in sorted(files):
+            if total <= self.cache_max_bytes:
+                break
+            if p == keep:
+                continue
+            with cache_lock(p, blocking=False) as locked:
+                if not locked:
+                    continue
+                p.unlink(missing_ok=True)
+                p.with_name(p.name + ".etag").unlink(missing_ok=True)
+            total -= size
+
+
+def get_storage_backend(root: Path) -> StorageBackend:
     backend = os.environ.get("STORAGE_BACKEND", "local").lower()
     if backend == "local":
         return LocalStorage()
@@ -68,5 +406,14 @@ def get_storage_backend() -> StorageBackend:
         bucket = os.environ.get("S3_BUCKET")
         if not bucket:
             raise StorageError("S3_BUCKET is required when STORAGE_BACKEND=s3")
-        return S3Storage(bucket=bucket)
+        return S3Storage(
+            bucket=bucket,
+            root=root,
+            cache_dir=Path(os.environ.get("VIDX_S3_CACHE_DIR", str(root / "s3_cache"))),
+            prefix=os.environ.get("S3_PREFIX", ""),
+            endpoint_url=os.environ.get("S3_ENDPOINT_URL"),
+            region=os.environ.get("AWS_REGION"),
+            cache_max_bytes=int(os.environ.get("VIDX_S3_CACHE_MAX_BYTES", "0") or 0),
+            chunk_bytes=int(os.environ.get("S3_MULTIPART_CHUNK_MB", "8") or 8) * 1024 * 1024,
+        )
     raise StorageError(f"Unsupported STORAGE_BACKEND: {backend}")
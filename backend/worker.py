@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import time
+
+from .app import CPU_BUDGET, WORKER_ID, work_shards
+from .shard_client import ShardClient
+
+# Render worker for distributed jobs. On another machine, point it at the API;
+# it needs the same VIDX_DATA_DIR path (render scratch, name audio and face
+# box caches) and storage backend settings as the API, and the API's
+# VIDX_WORKER_TOKEN in its environment:
+#
+#   VIDX_WORKER_TOKEN=... python -m backend.worker --api-url http://api:8000 --worker-id render-01
+#
+# Without --api-url it opens the job database directly, which is only safe
+# on the API host itself.
+#
+# It claims recipient shards of running jobs in the same fair-share order as
+# the API's render slots, renders them and reports back. Jobs are planned
+# (split into shards) and remote workers' shards merged by the API.
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Render recipient shards of queued VidX jobs")
+    parser.add_argument("--worker-id", default=WORKER_ID, help="Name recorded on claimed shards (default host-pid)")
+    parser.add_argument(
+        "--api-url",
+        default=os.environ.get("VIDX_API_URL", ""),
+        help="Coordinate through this API (default VIDX_API_URL); required off the API host",
+    )
+    parser.add_argument("--job", default=None, help="Only render shards of this job id")
+    parser.add_argument(
+        "--light-only",
+        action="store_true",
+        help="Only render jobs below VIDX_HEAVY_JOB_ROWS recipients (keeps this worker free for previews)",
+    )
+    parser.add_argument("--once", action="store_true", help="Exit when no shard is claimable instead of polling")
+    parser.add_argument("--poll-seconds", type=float, default=5.0, help="Wait between polls when idle")
+    args = parser.parse_args()
+
+    store = None
+    if args.api_url:
+        token = os.environ.get("VIDX_WORKER_TOKEN", "")
+        if not token:
+            parser.error("--api-url needs VIDX_WORKER_TOKEN in the environment")
+        store = ShardClient(args.api_url, token)
+
+    while True:
+        try:
+            ran = work_shards(
+                args.worker_id,
+                job_id=args.job,
+                allow_heavy=not args.light_only,
+                store=store,
+                cpu_share=CPU_BUDGET,
+            )
+        except Exception as exc:
+            # API unreachable: the shard's lease lapses and it is claimed again.
+            print(f"Worker error: {exc}")
+            ran = 0
+        if args.once:
+            return 0
+        if not ran:
+            time.sleep(max(0.5, args.poll_seconds))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
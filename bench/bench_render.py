@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# Render pipeline benchmark. Generates a synthetic base video (lavfi testsrc2 +
+# voice-like audio with deterministic silences) and name clips from the offline
+# TTS stub, then times each insert mode at several list sizes. Per-stage times,
+# spawn counts and bytes written come from personalized_video.TIMINGS.
+#
+#   python3 bench/bench_render.py --sizes 1,10,50 --modes silver,gold
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import personalized_video as pv  # noqa: E402
+
+STUB = Path(__file__).resolve().parent / "tts_stub.py"
+MODES = ("silver", "gold", "diamond-natural", "platinum")
+
+# (start, end) of each voiced region in the synthetic base. The first short
+# region is the "generic name" for Silver/Gold/Diamond; the two short regions
+# are the NAME1/NAME2 markers for Platinum. Everything else is long speech.
+SPEECH_REGIONS = [
+    (0.30, 0.70),
+    (1.10, 3.40),
+    (3.90, 4.40),
+    (4.90, 7.20),
+]
+
+
+def make_base_video(out: Path, *, duration: float, size: str, fps: int) -> Path:
+    gates = "+".join(f"between(t,{s:.2f},{e:.2f})" for s, e in SPEECH_REGIONS if s < duration)
+    voice = f"0.4*sin(2*PI*160*t)*(0.6+0.4*sin(2*PI*4*t))*({gates})"
+    pv.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={size}:rate={fps}:duration={duration:.3f}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"aevalsrc='{voice}':s=48000:d={duration:.3f}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            "aac",
+            "-shortest",
+            str(out),
+        ],
+        stage="encode",
+    )
+    return out
+
+
+def mode_kwargs(mode: str) -> dict:
+    if mode == "silver":
+        return {"insert_mode": "silver"}
+    if mode == "gold":
+        return {"insert_mode": "gold"}
+    if mode == "diamond-natural":
+        return {"insert_mode": "gold", "diamond_natural_name": True}
+    if mode == "platinum":
+        return {"insert_mode": "gold", "platinum_mode": True}
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def dir_bytes(path: Path) -> int:
+    if not path.exists():
+        return 0
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def synthesize_names(names: list[str], *, cache_dir: Path, tts_cmd: str) -> dict[str, Path]:
+    tts_kwargs = dict(
+        text_template="{name}",
+        lang="hi",
+        tts_provider="command",
+        tts_cmd=tts_cmd,
+        cache_dir=cache_dir,
+        voice_sample=None,
+        elevenlabs_api_key=None,
+        elevenlabs_voice_id=None,
+        elevenlabs_model_id=None,
+        elevenlabs_speed=None,
+    )
+    try:
+        name_to_wav = pv.ensure_name_clips_batch_tts(
+            names=names,
+            split_silence_db=-40.0,
+            split_silence_dur=0.18,
+            batch_gap_hint="...",
+            **tts_kwargs,
+        )
+    except RuntimeError as exc:
+        print(f"  batch TTS failed ({exc}); falling back to per-name synthesis")
+        name_to_wav = {}
+    for name in names:
+        if name not in name_to_wav:
+            name_to_wav[name] = pv.ensure_name_clip_wav(name=name, **tts_kwargs)
+    return name_to_wav
+
+
+def stage_row(wall: float, size: int) -> dict:
+    # Summarize the pipeline timing collected since the last TIMINGS.reset().
+    report = pv.TIMINGS.report()
+    return {
+        "wall_s": round(wall, 3),
+        "per_recipient_s": round(wall / max(1, size), 3),
+        "spawns": report["totals"]["spawns"],
+        "ffmpeg_spawns": report["counters"].get("spawn:ffmpeg", 0),
+        "bytes_written": report["totals"]["bytes_written"],
+        "pipeline_stages": report["stages"],
+    }
+
+
+def bench_size(
+    *,
+    size: int,
+    modes: list[str],
+    base_video: Path,
+    work: Path,
+    tts_cmd: str,
+    encoding_profile: str,
+) -> dict:
+    names = [f"Bench{i:05d}" for i in range(size)]
+    result: dict = {"size": size, "stages": {}}
+
+    pv.TIMINGS.reset()
+    start = time.perf_counter()
+    name_to_wav = synthesize_names(names, cache_dir=work / f"n{size}" / "name_audio", tts_cmd=tts_cmd)
+    result["stages"]["tts"] = stage_row(time.perf_counter() - start, size)
+
+    profile = pv.get_profile(encoding_profile)
+    for mode in modes:
+        out_dir = work / f"n{size}" / mode
+        failures = 0
+        pv.TIMINGS.reset()
+        start = time.perf_counter()
+        for name in names:
+            try:
+                with pv.TIMINGS.recipient(name):
+                    pv.build_personalized_video(
+                        base_video=base_video,
+                        out_dir=out_dir,
+                        person_name=name,
+                        text_template="{name}",
+                        lang="hi",
+                        tts_provider="command",
+                        tts_cmd=tts_cmd,
+                        dry_run=False,
+                        silence_db=-30.0,
+                        silence_dur=0.3,
+                        name_position="start",
+                        name_audio_wav=name_to_wav[name],
+                        encoding_profile=profile,
+                        **mode_kwargs(mode),
+                    )
+            except (RuntimeError, SystemExit) as exc:
+                failures += 1
+                print(f"  {mode} failed for {name}: {exc}")
+        row = stage_row(time.perf_counter() - start, size)
+        row["output_bytes"] = dir_bytes(out_dir)
+        row["failures"] = failures
+        result["stages"][f"render:{mode}"] = row
+    return result
+
+
+def print_summary(results: list[dict]) -> None:
+    print()
+    print(f"{'size':>6}  {'stage':<24} {'wall s':>9} {'s/rcpt':>8} {'spawns':>7} {'ffmpeg':>7} {'MB written':>11}")
+    for res in results:
+        for stage, row in res["stages"].items():
+            print(
+                f"{res['size']:>6}  {stage:<24} {row['wall_s']:>9.3f} {row['per_recipient_s']:>8.3f} "
+                f"{row['spawns']:>7} {row['ffmpeg_spawns']:>7} {row['bytes_written'] / 1e6:>11.2f}"
+            )
+            breakdown = ", ".join(
+                f"{name} {stats['wall_s']:.2f}s" for name, stats in row["pipeline_stages"].items()
+            )
+            print(f"{'':>8}{'':<24} {breakdown}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the personalized video render pipeline")
+    parser.add_argument("--sizes", default="1,5,20", help="Comma-separated recipient list sizes")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated modes: {', '.join(MODES)}")
+    parser.add_argument("--duration", type=float, default=8.0, help="Synthetic base video duration (seconds)")
+    parser.add_argument("--resolution", default="1280x720", help="Synthetic base video size, WxH")
+    parser.add_argument("--fps", type=int, default=25, help="Synthetic base video frame rate")
+    parser.add_argument("--encoding-profile", default="default", help="Encoding profile used for outputs")
+    parser.add_argument(
+        "--tts-cmd",
+        default="",
+        help="TTS command template (provider 'command'). Default: the offline stub in bench/tts_stub.py",
+    )
+    parser.add_argument("--workdir", default="", help="Keep artifacts here instead of a temp dir")
+    parser.add_argument("--json", default="", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None:
+        pv.die("ffmpeg/ffprobe not found. Install ffmpeg first.")
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            pv.die(f"Unknown mode '{mode}'. Choose from: {', '.join(MODES)}")
+    tts_cmd = args.tts_cmd or f'"{sys.executable}" "{STUB}" --text "{{text}}" --out "{{out}}"'
+
+    tmp_ctx = tempfile.TemporaryDirectory(prefix="vidx_bench_") if not args.workdir else None
+    work = Path(args.workdir) if args.workdir else Path(tmp_ctx.name)
+    work.mkdir(parents=True, exist_ok=True)
+    try:
+        start = time.perf_counter()
+        base_video = make_base_video(
+            work / "base.mp4", duration=args.duration, size=args.resolution, fps=args.fps
+        )
+        print(f"Synthetic base video: {base_video} ({time.perf_counter() - start:.2f}s)")
+
+        results = []
+        for size in sizes:
+            print(f"Benchmarking {size} recipients: {', '.join(modes)}")
+            results.append(
+                bench_size(
+                    size=size,
+                    modes=modes,
+                    base_video=base_video,
+                    work=work,
+                    tts_cmd=tts_cmd,
+                    encoding_profile=args.encoding_profile,
+                )
+            )
+        print_summary(results)
+        if args.json:
+            Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+            print(f"Wrote {args.json}")
+    finally:
+        if tmp_ctx is not None:
+            tmp_ctx.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# CLI startup benchmark. Times fresh interpreters importing personalized_video
+# and running `--help`, and fails if a heavy optional dependency is imported
+# at module load or the median exceeds --max-seconds.
+#
+#   python3 bench/bench_startup.py --runs 10 --max-seconds 0.5
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / "personalized_video.py"
+# Must only be imported by the code paths that need them.
+HEAVY_MODULES = ("pandas", "openpyxl", "gtts", "requests", "numpy")
+
+IMPORT_PROBE = (
+    "import sys; sys.path.insert(0, {root!r}); import personalized_video; "
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def time_command(cmd: list[str], runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=REPO_ROOT)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def loaded_heavy_modules() -> list[str]:
+    probe = IMPORT_PROBE.format(root=str(REPO_ROOT), heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True)
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def slowest_imports(top: int) -> list[tuple[float, str]]:
+    # -X importtime writes "import time: self [us] | cumulative | imported package" to stderr.
+    probe = f"import sys; sys.path.insert(0, {str(REPO_ROOT)!r}); import personalized_video"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not line.startswith("import time:"):
+            continue
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:  # personalized_video and its direct imports
+            rows.append((cumulative_us / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark personalized_video.py startup time")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports to list")
+    parser.add_argument("--max-seconds", type=float, default=0.0, help="Fail if median --help time exceeds this")
+    parser.add_argument("--json", default="", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+    help_times = time_command([sys.executable, str(CLI), "--help"], args.runs)
+    heavy = loaded_heavy_modules()
+    imports = slowest_imports(args.top)
+
+    result = {
+        "runs": args.runs,
+        "interpreter_median_s": round(statistics.median(baseline), 4),
+        "help_median_s": round(statistics.median(help_times), 4),
+        "help_min_s": round(min(help_times), 4),
+        "heavy_modules_at_import": heavy,
+        "slowest_imports": [{"module": name, "cumulative_s": round(sec, 4)} for sec, name in imports],
+    }
+
+    print(f"python -c pass:          {result['interpreter_median_s']:.3f}s median")
+    print(f"personalized_video --help: {result['help_median_s']:.3f}s median, {result['help_min_s']:.3f}s min")
+    print(f"heavy modules at import: {', '.join(heavy) or 'none'}")
+    print("slowest direct imports:")
+    for sec, name in imports:
+        print(f"  {sec:>7.3f}s  {name}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"Wrote {args.json}")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: imported at module load: {', '.join(heavy)}")
+        failed = True
+    if args.max_seconds and result["help_median_s"] > args.max_seconds:
+        print(f"FAIL: median startup {result['help_median_s']:.3f}s > {args.max_seconds:.3f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Offline TTS stand-in for benchmarks: renders each sentence of --text as a
+# voice-like tone whose length follows the text length, separated by silence.
+# Usage with the renderer:
+#   --tts-provider command --tts-cmd "python3 bench/tts_stub.py --text \"{text}\" --out \"{out}\""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SECONDS_PER_CHAR = 0.06
+MIN_SEGMENT = 0.25
+MAX_SEGMENT = 1.6
+GAP_SECONDS = 0.35
+
+
+def segment_durations(text: str) -> list[float]:
+    parts = [p.strip() for p in re.split(r"[.\n]+", text) if p.strip()]
+    if not parts:
+        parts = [text.strip() or "x"]
+    return [max(MIN_SEGMENT, min(MAX_SEGMENT, len(p) * SECONDS_PER_CHAR)) for p in parts]
+
+
+def tone_expression(durations: list[float], gap: float) -> tuple[str, float]:
+    gates: list[str] = []
+    cursor = 0.0
+    for dur in durations:
+        gates.append(f"between(t,{cursor:.3f},{cursor + dur:.3f})")
+        cursor += dur + gap
+    total = max(0.1, cursor - gap)
+    expr = f"0.5*sin(2*PI*190*t)*(0.6+0.4*sin(2*PI*5*t))*({'+'.join(gates)})"
+    return expr, total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline TTS stub for benchmarks")
+    parser.add_argument("--text", required=True, help="Text to 'speak'")
+    parser.add_argument("--out", required=True, help="Output audio path")
+    parser.add_argument("--gap", type=float, default=GAP_SECONDS, help="Silence between sentences")
+    args = parser.parse_args()
+
+    expr, total = tone_expression(segment_durations(args.text), args.gap)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"aevalsrc='{expr}':s=48000:d={total:.3f}",
+        "-ac",
+        "2",
+        str(out),
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only cover threads of this process.
+    fcntl = None
+
+# Single-flight guard for caches shared by concurrent jobs (the backend's
+# global name audio cache). Each entry has an advisory flock in
+# <dir>/.locks/<file>.lock: whoever holds it produces the entry, everyone
+# else waits and then reuses it. The kernel drops the lock if the holder
+# dies, so a crashed job never wedges the cache. Lock files are left in
+# place; unlinking a lock file while others may open it is racy.
+
+_LOCAL_LOCKS: dict[str, threading.Lock] = {}
+_LOCAL_GUARD = threading.Lock()
+
+
+def lock_path(target: Path) -> Path:
+    return target.parent / ".locks" / f"{target.name}.lock"
+
+
+def temp_path(target: Path) -> Path:
+    # Sibling temp name for write-then-rename; unique per process and thread.
+    return target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+@contextmanager
+def cache_lock(target: Path, blocking: bool = True) -> Iterator[bool]:
+    # Yields True while the lock for target is held. With blocking=False it
+    # yields False instead of waiting when someone else holds it.
+    path = lock_path(target)
+    if fcntl is None:
+        with _LOCAL_GUARD:
+            lock = _LOCAL_LOCKS.setdefault(str(path), threading.Lock())
+        acquired = lock.acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # flock locks belong to the open file description, so threads of one
+    # process exclude each other too as long as each opens its own fd.
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
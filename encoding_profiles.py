@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    name: str
+    video_codec: str
+    preset: str
+    crf: int
+    max_height: int | None
+    audio_codec: str
+    audio_bitrate: str
+    mp3_quality: int | None
+    threads: int = 0
+
+
+# Software encoders only, so every profile produces the same output on any host.
+PROFILES: dict[str, EncodingProfile] = {
+    "default": EncodingProfile(
+        name="default",
+        video_codec="libx264",
+        preset="medium",
+        crf=20,
+        max_height=None,
+        audio_codec="aac",
+        audio_bitrate="160k",
+        mp3_quality=2,
+    ),
+    "fast-preview": EncodingProfile(
+        name="fast-preview",
+        video_codec="libx264",
+        preset="ultrafast",
+        crf=28,
+        max_height=480,
+        audio_codec="aac",
+        audio_bitrate="96k",
+        mp3_quality=6,
+    ),
+    "whatsapp-720p": EncodingProfile(
+        name="whatsapp-720p",
+        video_codec="libx264",
+        preset="veryfast",
+        crf=23,
+        max_height=720,
+        audio_codec="aac",
+        audio_bitrate="128k",
+        mp3_quality=4,
+    ),
+    "archive": EncodingProfile(
+        name="archive",
+        video_codec="libx264",
+        preset="slow",
+        crf=18,
+        max_height=None,
+        audio_codec="aac",
+        audio_bitrate="192k",
+        mp3_quality=0,
+    ),
+}
+
+DEFAULT_PROFILE = "default"
+
+
+def get_profile(
+    name: str | None,
+    *,
+    crf: int | None = None,
+    preset: str | None = None,
+    audio_bitrate: str | None = None,
+    threads: int | None = None,
+) -> EncodingProfile:
+    key = (name or DEFAULT_PROFILE).strip().lower()
+    if key not in PROFILES:
+        raise ValueError(f"Unknown encoding profile '{name}'. Choose from: {', '.join(PROFILES)}")
+    profile = PROFILES[key]
+    overrides: dict = {}
+    if crf is not None:
+        overrides["crf"] = int(crf)
+    if preset:
+        overrides["preset"] = preset
+    if audio_bitrate:
+        overrides["audio_bitrate"] = audio_bitrate
+    if threads is not None:
+        overrides["threads"] = max(0, int(threads))
+    return replace(profile, **overrides) if overrides else profile
+
+
+def scale_filter(profile: EncodingProfile) -> str | None:
+    # Downscale only; never upscale. Width stays even for yuv420p.
+    if not profile.max_height:
+        return None
+    return f"scale=-2:'min({profile.max_height},ih)'"
+
+
+def video_encode_args(profile: EncodingProfile) -> list[str]:
+    args = [
+        "-c:v",
+        profile.video_codec,
+        "-preset",
+        profile.preset,
+        "-crf",
+        str(profile.crf),
+    ]
+    if profile.threads > 0:
+        args += ["-threads", str(profile.threads)]
+    return args
+
+
+def audio_encode_args(profile: EncodingProfile) -> list[str]:
+    return ["-c:a", profile.audio_codec, "-b:a", profile.audio_bitrate]
+
+
+def mp3_encode_args(profile: EncodingProfile) -> list[str]:
+    if profile.mp3_quality is not None:
+        return ["-codec:a", "libmp3lame", "-q:a", str(profile.mp3_quality)]
+    return ["-codec:a", "libmp3lame", "-b:a", profile.audio_bitrate]
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+# SHA-256 of input files (voice samples, base videos), memoized per process on
+# (path, size, mtime) so a file is read once per run however often its hash
+# is needed, and rehashed as soon as it changes.
+
+_MEMO: dict[tuple[str, int, int], str] = {}
+_LOCK = threading.Lock()
+
+
+def file_hash(path: Path) -> str:
+    st = os.stat(path)
+    key = (str(Path(path).resolve()), st.st_size, st.st_mtime_ns)
+    with _LOCK:
+        digest = _MEMO.get(key)
+    if digest is not None:
+        return digest
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _LOCK:
+        _MEMO[key] = digest
+    return digest
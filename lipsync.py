@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import selectors
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "wav2lip_worker.py"
+
+# A worker that doesn't answer within its deadline (CUDA deadlock, stuck
+# ffmpeg) is killed and restarted, so it can't hold the session lock forever.
+START_TIMEOUT = 300.0  # model load
+REQUEST_TIMEOUT = 900.0
+
+
+class Wav2LipSession:
+    # Client for one wav2lip_worker.py process. The model is loaded once and
+    # reused for every recipient; requests are serialized. A worker that dies
+    # mid-run or hangs is restarted and the request retried once.
+    def __init__(
+        self,
+        *,
+        python: str,
+        repo: Path,
+        checkpoint: Path,
+        request_timeout: float = REQUEST_TIMEOUT,
+        start_timeout: float = START_TIMEOUT,
+    ) -> None:
+        self.python = python
+        self.repo = repo
+        self.checkpoint = checkpoint
+        self.request_timeout = request_timeout
+        self.start_timeout = start_timeout
+        self._proc: subprocess.Popen | None = None
+        self._stdout_buf = b""
+        self._timed_out = False
+        self._stderr_tail: deque[str] = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        self._proc = subprocess.Popen(
+            [self.python, str(WORKER_SCRIPT), "--repo", str(self.repo), "--checkpoint", str(self.checkpoint)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._stdout_buf = b""
+        proc = self._proc
+        threading.Thread(target=self._drain_stderr, args=(proc,), daemon=True).start()
+        ready = self._read_reply(self.start_timeout)
+        if not ready or not ready.get("ready"):
+            if self._timed_out:
+                self.close()
+                raise TimeoutError(f"Wav2Lip worker not ready after {self.start_timeout:.0f}s:\n{self._tail()}")
+            detail = (ready or {}).get("error") or self._tail()
+            self.close()
+            raise RuntimeError(f"Wav2Lip worker failed to start: {detail}")
+
+    def _drain_stderr(self, proc: subprocess.Popen) -> None:
+        for line in proc.stderr:
+            self._stderr_tail.append(line.decode("utf-8", "replace").rstrip())
+
+    def _tail(self) -> str:
+        return "\n".join(list(self._stderr_tail)[-20:]) or "no worker output"
+
+    def _read_line(self, timeout: float) -> bytes:
+        # One stdout line, read with a deadline (readline() would block
+        # forever on a hung worker). b"" on EOF; sets _timed_out on expiry.
+        self._timed_out = False
+        fd = self._proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b"\n" not in self._stdout_buf:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    self._timed_out = True
+                    return b""
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    return b""
+                self._stdout_buf += chunk
+        line, _, self._stdout_buf = self._stdout_buf.partition(b"\n")
+        return line
+
+    def _read_reply(self, timeout: float) -> dict | None:
+        line = self._read_line(timeout) if self._proc else b""
+        if not line:
+            return None
+        return json.loads(line)
+
+    def _request(self, payload: dict) -> dict | None:
+        if self._proc is None or self._proc.poll() is not None:
+            self._start()
+        try:
+            self._proc.stdin.write((json.dumps(payload) + "\n").encode("utf-8"))
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return None
+        return self._read_reply(self.request_timeout)
+
+    def sync(
+        self,
+        *,
+        face: Path,
+        audio: Path,
+        outfile: Path,
+        pads: list[int],
+        key: str | None,
+        windows: list[tuple[float, float]] | None,
+        video_args: list[str],
+        box_cache_dir: Path | None = None,
+        frame_offset: int = 0,
+        mux_audio: bool = True,
+        frame_rate: str = "",
+        timescale: int | None = None,
+    ) -> dict:
+        # frame_rate ("30000/1001") and timescale are the source stream's, so
+        # the re-encode keeps its exact timing; empty uses the decoder's fps.
+        payload = {
+            "face": str(face),
+            "audio": str(audio),
+            "outfile": str(outfile),
+            "pads": pads,
+            "key": key or "",
+            "frame_offset": frame_offset,
+            "windows": [[float(s), float(e)] for s, e in windows] if windows is not None else None,
+            "video_args": video_args,
+            "box_cache_dir": str(box_cache_dir) if box_cache_dir else "",
+            "mux_audio": mux_audio,
+            "frame_rate": frame_rate,
+            "timescale": timescale or 0,
+        }
+        with self._lock:
+            reply = self._request(payload)
+            if reply is None:
+                # Worker died (OOM, crash) or hung: restart with a fresh model and retry once.
+                self.close()
+                reply = self._request(payload)
+            if reply is None:
+                if self._timed_out:
+                    self.close()
+                    # Transient under retry_policy, so the recipient is retried.
+                    raise TimeoutError(f"Wav2Lip worker did not answer within {self.request_timeout:.0f}s for {face}")
+                raise RuntimeError(f"Wav2Lip worker exited unexpectedly:\n{self._tail()}")
+        if not reply.get("ok"):
+            raise RuntimeError(f"Wav2Lip failed for {face}: {reply.get('error')}")
+        return reply
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        if self._timed_out:
+            # A hung worker won't notice stdin closing.
+            proc.kill()
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+_SESSIONS: dict[tuple[str, str, str], Wav2LipSession] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+_REQUEST_TIMEOUT = REQUEST_TIMEOUT
+
+
+def set_wav2lip_timeout(request_timeout: float) -> None:
+    # Reply deadline for sessions, set once from --wav2lip-timeout.
+    global _REQUEST_TIMEOUT
+    with _SESSIONS_LOCK:
+        _REQUEST_TIMEOUT = request_timeout
+        for session in _SESSIONS.values():
+            session.request_timeout = request_timeout
+
+
+def get_wav2lip_session(*, python: str, repo: Path, checkpoint: Path) -> Wav2LipSession:
+    key = (python, str(repo.resolve()), str(checkpoint.resolve()))
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = Wav2LipSession(python=python, repo=repo, checkpoint=checkpoint, request_timeout=_REQUEST_TIMEOUT)
+            _SESSIONS[key] = session
+        return session
+
+
+def close_wav2lip_sessions() -> None:
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
+
+
+atexit.register(close_wav2lip_sessions)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import wave
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from cache_lock import temp_path
+
+# Cuts many clips out of one decoded 16-bit PCM WAV without re-decoding:
+# the file is memory-mapped and each clip is written straight from a view of
+# its samples, with short linear fades so cuts inside speech don't click.
+
+DEFAULT_FADE_SECONDS = 0.005
+
+
+@dataclass(frozen=True)
+class WavLayout:
+    channels: int
+    sample_width: int
+    rate: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.frame_size
+
+
+def read_wav_layout(path: Path) -> WavLayout:
+    # Walks the RIFF chunks: ffmpeg may put LIST/fact chunks before "data".
+    file_size = path.stat().st_size
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"Not a RIFF/WAVE file: {path}")
+        fmt: tuple[int, int, int, int] | None = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in {path}")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                audio_format, channels, rate, _, _, bits = struct.unpack("<HHIIHH", f.read(16))
+                fmt = (audio_format, channels, rate, bits)
+                f.seek(size - 16 + (size & 1), os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"data chunk before fmt chunk in {path}")
+                audio_format, channels, rate, bits = fmt
+                # 0xFFFE = WAVE_FORMAT_EXTENSIBLE, used by ffmpeg for some layouts.
+                if audio_format not in (1, 0xFFFE) or bits != 16:
+                    raise ValueError(f"Expected 16-bit PCM in {path}, got format {audio_format}/{bits} bits")
+                offset = f.tell()
+                # Streamed WAVs may carry a placeholder size.
+                size = min(size, file_size - offset)
+                return WavLayout(channels=channels, sample_width=2, rate=rate, data_offset=offset, data_size=size)
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def _faded(raw: memoryview, channels: int, fade_in: bool) -> bytes:
+    samples = array("h")
+    samples.frombytes(raw)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    frames = len(samples) // channels
+    for i in range(len(samples)):
+        pos = i // channels
+        gain = pos / frames if fade_in else (frames - 1 - pos) / frames
+        samples[i] = int(samples[i] * gain)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def write_wav_slices(
+    src: Path,
+    slices: list[tuple[float, float, Path]],
+    fade_seconds: float = DEFAULT_FADE_SECONDS,
+) -> None:
+    # slices: (start_s, end_s, out_path). Outputs are written to a temp name
+    # and renamed, so a crash never leaves a truncated clip in the cache.
+    layout = read_wav_layout(src)
+    frame = layout.frame_size
+    with open(src, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            data = view[layout.data_offset : layout.data_offset + layout.frames * frame]
+            try:
+                for start_s, end_s, out in slices:
+                    start = max(0, min(layout.frames, int(round(start_s * layout.rate))))
+                    end = max(start, min(layout.frames, int(round(end_s * layout.rate))))
+                    fade = min(int(round(fade_seconds * layout.rate)), (end - start) // 2)
+                    _write_clip(
+                        out,
+                        layout,
+                        head=data[start * frame : (start + fade) * frame],
+                        body=data[(start + fade) * frame : (end - fade) * frame],
+                        tail=data[(end - fade) * frame : end * frame],
+                    )
+            finally:
+                data.release()
+
+
+def _write_clip(out: Path, layout: WavLayout, *, head: memoryview, body: memoryview, tail: memoryview) -> None:
+    try:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temp_path(out)
+        try:
+            with wave.open(str(tmp), "wb") as w:
+                w.setnchannels(layout.channels)
+                w.setsampwidth(layout.sample_width)
+                w.setframerate(layout.rate)
+                w.writeframes(_faded(head, layout.channels, fade_in=True))
+                w.writeframes(body)
+                w.writeframes(_faded(tail, layout.channels, fade_in=False))
+            os.replace(tmp, out)
+        finally:
+            tmp.unlink(missing_ok=True)
+    finally:
+        head.release()
+        body.release()
+        tail.release()
@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 import argparse
+import csv
 import hashlib
+import itertools
+import json
+import math
 import os
 import re
 import shlex
@@ -8,15 +12,35 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
 
-import pandas as pd
-import requests
 
-try:
-    from gtts import gTTS
-except Exception:
-    gTTS = None
+from encoding_profiles import (
+    PROFILES,
+    EncodingProfile,
+    audio_encode_args,
+    get_profile,
+    mp3_encode_args,
+    scale_filter,
+    video_encode_args,
+)
+from cache_lock import cache_lock, temp_path
+from file_hashes import file_hash
+from lipsync import close_wav2lip_sessions, get_wav2lip_session, set_wav2lip_timeout
+from pcm_slices import write_wav_slices
+from recipients import DEFAULT_CHUNK_SIZE, Recipient, iter_recipient_chunks
+from render_manifest import RenderManifest, options_hash
+from render_timing import RenderTimings
+from retry_policy import CommandError, RetryPolicy, TransientError, classify, http_status_error
+from tts_daemon import close_tts_daemons, start_tts_daemons, tts_daemon_pool
+
+# gTTS, requests, openpyxl and pandas are imported where they are used:
+# most runs need at most one of them, and each job launch pays for every
+# module-level import (see bench/bench_startup.py).
 
 
 def die(msg: str, code: int = 1) -> None:
@@ -24,10 +48,86 @@ def die(msg: str, code: int = 1) -> None:
     sys.exit(code)
 
 
-def run(cmd: list[str]) -> None:
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+class ThreadBudget:
+    # Splits a global CPU budget across concurrent renders so parallel ffmpeg
+    # processes don't each spawn one thread per core and oversubscribe the host.
+    def __init__(self) -> None:
+        self.cpu_budget = 0
+        self.concurrent_renders = 1
+
+    def configure(self, *, cpu_budget: int, concurrent_renders: int) -> None:
+        self.cpu_budget = max(0, int(cpu_budget))
+        self.concurrent_renders = max(1, int(concurrent_renders))
+
+    def ffmpeg_threads(self) -> int:
+        # 0 means "not configured": leave thread selection to ffmpeg.
+        if self.cpu_budget <= 0:
+            return 0
+        return max(1, self.cpu_budget // self.concurrent_renders)
+
+    def apply(self, cmd: list[str]) -> list[str]:
+        threads = self.ffmpeg_threads()
+        if threads <= 0 or not cmd or Path(cmd[0]).name != "ffmpeg":
+            return cmd
+        t = str(threads)
+        out = [cmd[0], "-filter_threads", t, "-filter_complex_threads", t]
+        has_output_threads = "-threads" in cmd
+        for arg in cmd[1:-1]:
+            if arg == "-i":
+                # Decoder threads (input option).
+                out += ["-threads", t]
+            out.append(arg)
+        if not has_output_threads:
+            # Encoder threads (output option, right before the output path).
+            out += ["-threads", t]
+        out.append(cmd[-1])
+        return out
+
+
+THREAD_BUDGET = ThreadBudget()
+
+
+def default_cpu_budget() -> int:
+    env_budget = os.environ.get("VIDX_CPU_BUDGET", "").strip()
+    if env_budget:
+        try:
+            return max(1, int(env_budget))
+        except ValueError:
+            pass
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+TIMINGS = RenderTimings()
+
+# Batch name TTS: names per request, and how far a split segment's duration
+# may stray from the name's expected share before the batch is rejected.
+BATCH_TTS_SIZE = 25
+BATCH_TTS_MIN_RATIO = 0.45
+BATCH_TTS_MAX_RATIO = 1.9
+BATCH_TTS_MAX_PIECES_PER_NAME = 4
+BATCH_TTS_MIN_RESPLIT = 4
+
+# (default, max) concurrent per-name syntheses. Network providers are rate
+# limited; the command provider is sized from the CPU budget instead.
+TTS_PROVIDER_CONCURRENCY = {"gtts": (4, 8), "elevenlabs": (2, 4)}
+
+# Lip sync re-synthesizes this much video around each name window.
+LIP_SYNC_MARGIN_SECONDS = 0.3
+# base key -> keyframe timestamps of the base video stream
+KEYFRAME_CACHE: dict[str, list[float]] = {}
+
+
+def run_capture(cmd: list[str], stage: str | None = None) -> subprocess.CompletedProcess:
+    # Single spawn point: applies the thread budget and records per-stage timing.
+    return TIMINGS.run(THREAD_BUDGET.apply(cmd), stage=stage)
+
+
+def run(cmd: list[str], stage: str | None = None) -> None:
+    result = run_capture(cmd, stage=stage)
     if result.returncode != 0:
-        raise RuntimeError(f"Command failed: {' '.join(cmd)}\n{result.stderr}")
+        raise CommandError(f"Command failed: {' '.join(cmd)}\n{result.stderr}", result.returncode)
 
 
 def apply_lip_sync(
@@ -38,7 +138,16 @@ def apply_lip_sync(
     wav2lip_checkpoint: str,
     wav2lip_pads: str,
     wav2lip_python: str,
+    windows: list[tuple[float, float]] | None = None,
+    base_key: str | None = None,
+    face_box_cache_dir: Path | None = None,
+    encoding_profile: EncodingProfile | None = None,
 ) -> Path:
+    # windows: name time ranges (seconds) in video_path; only those frames are
+    # re-synthesized. None re-synthesizes the whole video.
+    # base_key: set when video_path's frames are the base video's frames, so
+    # face boxes detected for one recipient are reused for all others (and,
+    # with face_box_cache_dir, by later jobs on the same base).
     if provider == "none":
         return video_path
     if provider == "sync_api":
@@ -56,27 +165,218 @@ def apply_lip_sync(
     pads = [p for p in wav2lip_pads.split() if p.strip()]
     if len(pads) != 4:
         raise RuntimeError("Wav2Lip pads must contain 4 integers, e.g. '0 10 0 0'.")
+    try:
+        pad_values = [int(p) for p in pads]
+    except ValueError as exc:
+        raise RuntimeError("Wav2Lip pads must contain 4 integers, e.g. '0 10 0 0'.") from exc
 
+    profile = encoding_profile or get_profile(None)
+    session = get_wav2lip_session(python=wav2lip_python, repo=repo_dir, checkpoint=checkpoint)
     synced_tmp = video_path.with_name(video_path.stem + "_lipsynced.mp4")
-    cmd = [
-        wav2lip_python,
-        str(repo_dir / "inference.py"),
-        "--checkpoint_path",
-        str(checkpoint),
-        "--face",
-        str(video_path),
-        "--audio",
-        str(video_path),
-        "--outfile",
-        str(synced_tmp),
-        "--pads",
-        *pads,
-    ]
-    run(cmd)
+    with TIMINGS.stage("lipsync"):
+        spliced = bool(windows) and splice_lip_sync_windows(
+            session=session,
+            video_path=video_path,
+            outfile=synced_tmp,
+            windows=windows,
+            pads=pad_values,
+            base_key=base_key,
+            box_cache_dir=face_box_cache_dir,
+            profile=profile,
+        )
+        if not spliced:
+            stream = ffprobe_video_stream(video_path)
+            reply = session.sync(
+                face=video_path,
+                audio=video_path,
+                outfile=synced_tmp,
+                pads=pad_values,
+                key=base_key,
+                windows=windows,
+                video_args=video_encode_args(profile),
+                box_cache_dir=face_box_cache_dir,
+                frame_rate=str(stream.get("r_frame_rate", "")),
+                timescale=stream_timescale(stream),
+            )
+            count_lip_sync_frames(reply)
     shutil.move(str(synced_tmp), str(video_path))
     return video_path
 
 
+def count_lip_sync_frames(reply: dict) -> None:
+    TIMINGS.incr("face_boxes_detected", int(reply.get("detected", 0)))
+    TIMINGS.incr("lipsync_frames_synced", int(reply.get("synced", 0)))
+
+
+def plan_lip_sync_spans(
+    windows: list[tuple[float, float]],
+    keyframes: list[float],
+    duration: float,
+    margin: float,
+) -> list[tuple[float, float]]:
+    # Widens each name window by margin and out to the surrounding keyframes,
+    # so everything outside the spans can be stream-copied. Overlaps merge.
+    spans: list[tuple[float, float]] = []
+    for start, end in sorted(windows):
+        lo = max(0.0, start - margin)
+        hi = min(duration, end + margin)
+        if hi <= lo:
+            continue
+        lo = max((k for k in keyframes if k <= lo + 1e-3), default=0.0)
+        hi = min((k for k in keyframes if k >= hi), default=duration)
+        if spans and lo <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], hi))
+        else:
+            spans.append((lo, hi))
+    return spans
+
+
+def h264_compat_args(stream: dict) -> list[str]:
+    # Re-encoded pieces must decode with the copied ones' parameters.
+    args: list[str] = []
+    profile = str(stream.get("profile", "")).lower()
+    if profile in ("baseline", "constrained baseline"):
+        args += ["-profile:v", "baseline"]
+    elif profile in ("main", "high"):
+        args += ["-profile:v", profile]
+    level = stream.get("level")
+    if isinstance(level, int) and level > 0:
+        args += ["-level", f"{level / 10:.1f}"]
+    return args
+
+
+def splice_lip_sync_windows(
+    *,
+    session,
+    video_path: Path,
+    outfile: Path,
+    windows: list[tuple[float, float]],
+    pads: list[int],
+    base_key: str | None,
+    box_cache_dir: Path | None,
+    profile: EncodingProfile,
+) -> bool:
+    # Lip-syncs only the keyframe-aligned pieces around the name windows and
+    # stream-copies the rest, so work scales with the number of names rather
+    # than the clip length. Returns False when the video can't be stitched
+    # losslessly; the caller then syncs the whole clip.
+    stream = ffprobe_video_stream(video_path)
+    if stream.get("codec_name") != "h264" or stream.get("pix_fmt") != "yuv420p":
+        return False
+    fps = parse_frame_rate(str(stream.get("avg_frame_rate", "")))
+    # Re-encoded pieces take the source's exact rational rate, so their
+    # timestamps line up with the stream-copied ones they are joined to.
+    frame_rate = str(stream.get("r_frame_rate", ""))
+    timescale = stream_timescale(stream)
+    duration = ffprobe_duration(video_path)
+    keyframes = ffprobe_keyframe_times(video_path, cache_key=base_key)
+    spans = plan_lip_sync_spans(windows, keyframes, duration, LIP_SYNC_MARGIN_SECONDS)
+    if fps <= 0 or not spans or sum(e - s for s, e in spans) >= 0.8 * duration:
+        return False
+    cut_times = sorted({t for span in spans for t in span if 0.0 < t < duration})
+
+    with tempfile.TemporaryDirectory(dir=str(video_path.parent)) as tmpdir:
+        tmp = Path(tmpdir)
+        seg_list = tmp / "segments.csv"
+        cmd = ["ffmpeg", "-y", "-i", str(video_path), "-map", "0:v:0", "-c", "copy", "-f", "segment"]
+        if cut_times:
+            # The segment muxer cuts at the first keyframe at or after each time.
+            cmd += ["-segment_times", ",".join(f"{max(0.0, t - 0.001):.6f}" for t in cut_times)]
+        cmd += [
+            "-segment_format",
+            "mpegts",
+            "-reset_timestamps",
+            "1",
+            "-segment_list",
+            str(seg_list),
+            "-segment_list_type",
+            "csv",
+            str(tmp / "seg_%04d.ts"),
+        ]
+        run(cmd, stage="lipsync")
+
+        pieces: list[Path] = []
+        with open(seg_list, newline="", encoding="utf-8") as f:
+            rows = [row for row in csv.reader(f) if len(row) >= 3]
+        for filename, seg_start_raw, seg_end_raw in (row[:3] for row in rows):
+            piece = tmp / filename
+            seg_start, seg_end = float(seg_start_raw), float(seg_end_raw)
+            hot = [
+                (max(s, seg_start) - seg_start, min(e, seg_end) - seg_start)
+                for s, e in windows
+                if s < seg_end and e > seg_start
+            ]
+            if hot:
+                piece_audio = tmp / f"{piece.stem}.wav"
+                run(
+                    [
+                        "ffmpeg",
+                        "-y",
+                        "-ss",
+                        f"{seg_start:.6f}",
+                        "-t",
+                        f"{seg_end - seg_start:.6f}",
+                        "-i",
+                        str(video_path),
+                        "-vn",
+                        "-ac",
+                        "1",
+                        "-ar",
+                        "16000",
+                        "-c:a",
+                        "pcm_s16le",
+                        str(piece_audio),
+                    ],
+                    stage="extract",
+                )
+                synced = tmp / f"{piece.stem}_synced.ts"
+                reply = session.sync(
+                    face=piece,
+                    audio=piece_audio,
+                    outfile=synced,
+                    pads=pads,
+                    key=base_key,
+                    windows=hot,
+                    video_args=[*video_encode_args(profile), *h264_compat_args(stream)],
+                    box_cache_dir=box_cache_dir,
+                    frame_offset=round(seg_start * fps),
+                    mux_audio=False,
+                    frame_rate=frame_rate,
+                )
+                count_lip_sync_frames(reply)
+                piece = synced
+            pieces.append(piece)
+
+        concat_list = tmp / "pieces.txt"
+        concat_list.write_text("".join(f"file '{p.name}'\n" for p in pieces), encoding="utf-8")
+        run(
+            [
+                "ffmpeg",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(concat_list),
+                "-i",
+                str(video_path),
+                "-map",
+                "0:v:0",
+                "-map",
+                "1:a:0?",
+                "-c",
+                "copy",
+                *(["-video_track_timescale", str(timescale)] if timescale else []),
+                "-movflags",
+                "+faststart",
+                str(outfile),
+            ],
+            stage="mux",
+        )
+    return True
+
+
 def build_atempo_filter(speed: float) -> str:
     # ffmpeg atempo supports [0.5, 2.0] per stage, so chain if needed.
     if speed <= 0:
@@ -104,7 +404,7 @@ def ffprobe_duration(path: Path) -> float:
         "default=noprint_wrappers=1:nokey=1",
         str(path),
     ]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    result = run_capture(cmd, stage="probe")
     if result.returncode != 0:
         raise RuntimeError(f"ffprobe failed for {path}: {result.stderr}")
     try:
@@ -113,6 +413,146 @@ def ffprobe_duration(path: Path) -> float:
         raise RuntimeError(f"Could not parse duration for {path}") from exc
 
 
+def ffprobe_video_stream(path: Path) -> dict:
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=codec_name,profile,level,pix_fmt,width,height,avg_frame_rate,r_frame_rate,time_base",
+        "-of",
+        "json",
+        str(path),
+    ]
+    result = run_capture(cmd, stage="probe")
+    if result.returncode != 0:
+        return {}
+    try:
+        streams = json.loads(result.stdout).get("streams") or []
+    except ValueError:
+        return {}
+    return streams[0] if streams else {}
+
+
+def parse_frame_rate(rate: str) -> float:
+    num, _, den = rate.partition("/")
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def stream_timescale(stream: dict) -> int | None:
+    # Ticks per second of the stream's time base ("1/30000" -> 30000).
+    num, _, den = str(stream.get("time_base", "")).partition("/")
+    if num.strip() != "1" or not den.strip().isdigit() or int(den) <= 0:
+        return None
+    return int(den)
+
+
+def ffprobe_keyframe_times(path: Path, cache_key: str | None = None) -> list[float]:
+    # Reads packet flags only (no decoding). Every render copies the base
+    # video stream, so keyframes are cached per base key.
+    if cache_key and cache_key in KEYFRAME_CACHE:
+        return KEYFRAME_CACHE[cache_key]
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=p=0",
+        str(path),
+    ]
+    result = run_capture(cmd, stage="probe")
+    if result.returncode != 0:
+        return []
+    times: list[float] = []
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" not in flags:
+            continue
+        try:
+            times.append(float(pts))
+        except ValueError:
+            continue
+    times.sort()
+    if cache_key:
+        KEYFRAME_CACHE[cache_key] = times
+    return times
+
+
+def ffprobe_video_height(path: Path) -> int | None:
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=height",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        str(path),
+    ]
+    result = run_capture(cmd, stage="probe")
+    if result.returncode != 0:
+        return None
+    try:
+        return int(result.stdout.strip().splitlines()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def prepare_base_video(base_video: Path, profile: EncodingProfile, work_dir: Path) -> Path:
+    # Stream-copy muxes cannot rescale, so downscale the base once per run instead
+    # of per recipient. Returns the original path when no rescale is needed.
+    if not profile.max_height:
+        return base_video
+    height = ffprobe_video_height(base_video)
+    if height is None or height <= profile.max_height:
+        return base_video
+
+    work_dir.mkdir(parents=True, exist_ok=True)
+    st = base_video.stat()
+    out = work_dir / f"_base_{profile.name}_{st.st_size}_{int(st.st_mtime)}.mp4"
+    if out.exists():
+        return out
+    # Shards of one job on the same host share work_dir: one downscales, the rest wait.
+    with cache_lock(out):
+        if out.exists():
+            return out
+        tmp_out = temp_path(out)
+        try:
+            run(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    str(base_video),
+                    "-vf",
+                    scale_filter(profile),
+                    *video_encode_args(profile),
+                    *audio_encode_args(profile),
+                    "-movflags",
+                    "+faststart",
+                    "-f",
+                    "mp4",
+                    str(tmp_out),
+                ],
+                stage="encode",
+            )
+            os.replace(tmp_out, out)
+        finally:
+            tmp_out.unlink(missing_ok=True)
+    return out
+
+
 def mean_volume_db(path: Path, start: float | None = None, duration: float | None = None) -> float | None:
     cmd = ["ffmpeg", "-hide_banner", "-y"]
     if start is not None and start > 0:
@@ -121,7 +561,7 @@ def mean_volume_db(path: Path, start: float | None = None, duration: float | Non
     if duration is not None and duration > 0:
         cmd += ["-t", f"{duration:.3f}"]
     cmd += ["-vn", "-af", "volumedetect", "-f", "null", "-"]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    result = run_capture(cmd, stage="loudness")
     if result.returncode != 0:
         return None
     m = re.search(r"mean_volume:\s*(-?\d+(?:\.\d+)?)\s*dB", result.stderr)
@@ -166,7 +606,8 @@ def match_audio_loudness(
             "-ac",
             "2",
             str(out_wav),
-        ]
+        ],
+        stage="loudness",
     )
     return out_wav
 
@@ -184,7 +625,7 @@ def detect_speech_end(video_path: Path, noise_db: float, min_silence: float) ->
         "null",
         "-",
     ]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    result = run_capture(cmd, stage="detect")
     if result.returncode != 0:
         raise RuntimeError(f"silencedetect failed for {video_path}: {result.stderr}")
 
@@ -215,7 +656,7 @@ def detect_first_speech_segment(
         "null",
         "-",
     ]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    result = run_capture(cmd, stage="detect")
     if result.returncode != 0:
         raise RuntimeError(f"silencedetect failed for {video_path}: {result.stderr}")
 
@@ -271,24 +712,38 @@ def safe_slug(name: str) -> str:
     return slug.strip("_") or "person"
 
 
-def read_recipients(path: Path, name_col: str, phone_col: str) -> pd.DataFrame:
-    if path.suffix.lower() == ".csv":
-        df = pd.read_csv(path)
-    else:
-        df = pd.read_excel(path)
-    if name_col not in df.columns:
-        die(f"Missing column '{name_col}' in {path}")
-    if phone_col not in df.columns:
-        die(f"Missing column '{phone_col}' in {path}")
-    df = df[[name_col, phone_col]].dropna()
-    return df
+@contextmanager
+def tts_request(provider: str):
+    # Times one synthesis request and counts failures for the timing report.
+    start = time.perf_counter()
+    TIMINGS.incr(f"tts_requests:{provider}")
+    try:
+        with TIMINGS.stage("tts"):
+            yield
+    except BaseException:
+        TIMINGS.incr(f"tts_errors:{provider}")
+        raise
+    finally:
+        TIMINGS.observe(f"tts_request_seconds:{provider}", time.perf_counter() - start)
 
 
 def tts_gtts(text: str, lang: str, out_mp3: Path) -> None:
-    if gTTS is None:
+    try:
+        from gtts import gTTS
+    except Exception:
         die("gTTS is not installed. Run: pip install gTTS")
-    tts = gTTS(text=text, lang=lang)
-    tts.save(str(out_mp3))
+    from gtts.tts import gTTSError
+
+    with tts_request("gtts"):
+        tts = gTTS(text=text, lang=lang)
+        try:
+            tts.save(str(out_mp3))
+        except gTTSError as exc:
+            # gTTS wraps rate limits and upstream 5xx; surface them as retryable.
+            status = getattr(getattr(exc, "rsp", None), "status_code", None)
+            if status is not None and (status == 429 or status >= 500):
+                raise TransientError(f"gTTS failed ({status}): {exc}") from exc
+            raise
 
 def tts_elevenlabs(
     *,
@@ -320,28 +775,36 @@ def tts_elevenlabs(
     }
     if speed is not None:
         payload["voice_settings"] = {"speed": max(0.7, min(1.2, float(speed)))}
-    resp = requests.post(url, headers=headers, json=payload, timeout=60)
-    if resp.status_code >= 300:
-        raise RuntimeError(f"ElevenLabs TTS failed ({resp.status_code}): {resp.text[:400]}")
+    import requests
+
+    with tts_request("elevenlabs"):
+        resp = requests.post(url, headers=headers, json=payload, timeout=60)
+        if resp.status_code >= 300:
+            raise http_status_error("ElevenLabs TTS", resp.status_code, resp.text)
     out_mp3.parent.mkdir(parents=True, exist_ok=True)
     out_mp3.write_bytes(resp.content)
 
 
-def tts_command(cmd_template: str, text: str, out_mp3: Path, voice_sample: Path | None) -> None:
+def tts_command(cmd_template: str, text: str, out_mp3: Path, voice_sample: Path | None, lang: str = "") -> None:
     if not cmd_template:
         die("TTS command template is empty. Provide --tts-cmd.")
+    pool = tts_daemon_pool(cmd_template)
+    if pool is not None:
+        # --tts-daemon: the command is a long-lived engine, not a per-call template.
+        with tts_request("command"):
+            pool.synthesize(text=text, out=out_mp3, voice=voice_sample, lang=lang)
+        return
     cmd = cmd_template.format(text=text, out=str(out_mp3), voice=str(voice_sample or ""))
     args = shlex.split(cmd)
     if not args:
         die("TTS command template produced an empty command.")
-    run(args)
+    with tts_request("command"):
+        run(args, stage="tts")
 
-def file_hash(path: Path) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+def lip_sync_base_key(base_video: Path, profile: EncodingProfile | None = None) -> str:
+    # Face boxes depend on the base content and the frame size it is rendered at.
+    height = profile.max_height if profile and profile.max_height else "src"
+    return f"{file_hash(base_video)[:32]}_{height}"
 
 
 def name_cache_filename(name: str, cache_key: str) -> str:
@@ -377,6 +840,36 @@ def name_audio_cache_key(
     )
 
 
+def synthesize_tts_mp3(
+    *,
+    text: str,
+    out_mp3: Path,
+    lang: str,
+    tts_provider: str,
+    tts_cmd: str,
+    voice_sample: Path | None,
+    elevenlabs_api_key: str | None,
+    elevenlabs_voice_id: str | None,
+    elevenlabs_model_id: str | None,
+    elevenlabs_speed: float | None,
+) -> None:
+    if tts_provider == "gtts":
+        tts_gtts(text=text, lang=lang, out_mp3=out_mp3)
+    elif tts_provider == "elevenlabs":
+        tts_elevenlabs(
+            text=text,
+            out_mp3=out_mp3,
+            api_key=elevenlabs_api_key,
+            voice_id=elevenlabs_voice_id,
+            model_id=elevenlabs_model_id,
+            speed=elevenlabs_speed,
+        )
+    elif tts_provider == "command":
+        tts_command(cmd_template=tts_cmd, text=text, out_mp3=out_mp3, voice_sample=voice_sample, lang=lang)
+    else:
+        die(f"Unsupported TTS provider: {tts_provider}")
+
+
 def ensure_name_clip_wav(
     *,
     name: str,
@@ -390,61 +883,111 @@ def ensure_name_clip_wav(
     elevenlabs_voice_id: str | None,
     elevenlabs_model_id: str | None,
     elevenlabs_speed: float | None,
+    cache_key: str | None = None,
 ) -> Path:
+    # cache_key: name_audio_cache_key() for these settings, computed once per
+    # run by callers; derived here (hashing the voice sample) when omitted.
     cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_key = name_audio_cache_key(
-        text_template=text_template,
-        lang=lang,
-        tts_provider=tts_provider,
-        tts_cmd=tts_cmd,
-        voice_sample=voice_sample,
-        elevenlabs_voice_id=elevenlabs_voice_id,
-        elevenlabs_model_id=elevenlabs_model_id,
-        elevenlabs_speed=elevenlabs_speed,
-    )
+    if cache_key is None:
+        cache_key = name_audio_cache_key(
+            text_template=text_template,
+            lang=lang,
+            tts_provider=tts_provider,
+            tts_cmd=tts_cmd,
+            voice_sample=voice_sample,
+            elevenlabs_voice_id=elevenlabs_voice_id,
+            elevenlabs_model_id=elevenlabs_model_id,
+            elevenlabs_speed=elevenlabs_speed,
+        )
     out_wav = cache_dir / name_cache_filename(name, cache_key)
     if out_wav.exists():
+        TIMINGS.incr("name_cache_hits")
         return out_wav
 
     if tts_provider == "none":
         die("TTS provider is 'none'. Cannot build name audio cache.")
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp = Path(tmpdir)
-        tts_mp3 = tmp / "tts.mp3"
-        wav_tmp = tmp / "tts.wav"
-
-        text = text_template.format(name=name)
-        if tts_provider == "gtts":
-            tts_gtts(text=text, lang=lang, out_mp3=tts_mp3)
-        elif tts_provider == "elevenlabs":
-            tts_elevenlabs(
-                text=text,
-                out_mp3=tts_mp3,
-                api_key=elevenlabs_api_key,
-                voice_id=elevenlabs_voice_id,
-                model_id=elevenlabs_model_id,
-                speed=elevenlabs_speed,
+    # Single flight: a job (or thread) already synthesizing this name holds
+    # the lock; wait for it and reuse its clip.
+    with cache_lock(out_wav):
+        if out_wav.exists():
+            TIMINGS.incr("name_cache_waits")
+            return out_wav
+        TIMINGS.incr("name_cache_misses")
+        synthesize_name_clip_wav(
+            text=text_template.format(name=name),
+            out_wav=out_wav,
+            lang=lang,
+            tts_provider=tts_provider,
+            tts_cmd=tts_cmd,
+            voice_sample=voice_sample,
+            elevenlabs_api_key=elevenlabs_api_key,
+            elevenlabs_voice_id=elevenlabs_voice_id,
+            elevenlabs_model_id=elevenlabs_model_id,
+            elevenlabs_speed=elevenlabs_speed,
+        )
+    return out_wav
+
+
+def synthesize_name_clip_wav(*, text: str, out_wav: Path, **tts_kwargs) -> None:
+    # Converted next to its final path and renamed into place, so readers
+    # never see a half-written clip.
+    wav_tmp = temp_path(out_wav)
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tts_mp3 = Path(tmpdir) / "tts.mp3"
+            synthesize_tts_mp3(text=text, out_mp3=tts_mp3, **tts_kwargs)
+            run(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    str(tts_mp3),
+                    "-acodec",
+                    "pcm_s16le",
+                    "-f",
+                    "wav",
+                    str(wav_tmp),
+                ],
+                stage="tts",
             )
-        elif tts_provider == "command":
-            tts_command(cmd_template=tts_cmd, text=text, out_mp3=tts_mp3, voice_sample=voice_sample)
-        else:
-            die(f"Unsupported TTS provider: {tts_provider}")
+        os.replace(wav_tmp, out_wav)
+    finally:
+        wav_tmp.unlink(missing_ok=True)
 
-        run(
-            [
-                "ffmpeg",
-                "-y",
-                "-i",
-                str(tts_mp3),
-                "-acodec",
-                "pcm_s16le",
-                str(wav_tmp),
-            ]
-        )
-        shutil.move(str(wav_tmp), str(out_wav))
 
-    return out_wav
+def tts_concurrency(tts_provider: str, requested: int, cpu_budget: int) -> int:
+    # requested <= 0 picks the provider default; anything above the provider
+    # limit is clamped. A --tts-cmd engine is CPU-bound, so it gets one job
+    # per core of the run's CPU budget.
+    if tts_provider == "command":
+        default = limit = max(1, cpu_budget or os.cpu_count() or 1)
+    else:
+        default, limit = TTS_PROVIDER_CONCURRENCY.get(tts_provider, (1, 1))
+    if requested <= 0:
+        return default
+    return max(1, min(requested, limit))
+
+
+def ensure_name_clips_parallel(*, names: list[str], workers: int, **tts_kwargs) -> dict[str, Path]:
+    # Per-name fallback for names batch TTS didn't produce. Threads serve every
+    # provider: a --tts-cmd engine and the mp3->wav step run as child
+    # processes, so threads already spread them across cores. Names that fail
+    # are left out; their render retries synthesis under the retry policy.
+    out: dict[str, Path] = {}
+    if not names:
+        return out
+    workers = max(1, min(workers, len(names)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="name-tts") as pool:
+        futures = {pool.submit(ensure_name_clip_wav, name=n, **tts_kwargs): n for n in names}
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try:
+                out[name] = fut.result()
+            except Exception as exc:
+                TIMINGS.incr("name_tts_failures")
+                print(f"Name TTS failed for {name}, deferring to render: {exc}")
+    return out
 
 
 def detect_nonsilent_segments(
@@ -460,7 +1003,7 @@ def detect_nonsilent_segments(
         "null",
         "-",
     ]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    result = run_capture(cmd, stage="detect")
     if result.returncode != 0:
         raise RuntimeError(f"silencedetect failed for {audio_wav}: {result.stderr}")
 
@@ -492,48 +1035,73 @@ def detect_nonsilent_segments(
     return segments
 
 
-def ensure_name_clips_batch_tts(
+def expected_speech_weights(texts: list[str]) -> list[float]:
+    # Rough relative speaking time: letters and combining marks (Devanagari
+    # matras are marks), plus a constant for onset/offset.
+    return [
+        sum(1 for ch in text if ch.isalnum() or unicodedata.category(ch).startswith("M")) + 2.0
+        for text in texts
+    ]
+
+
+def align_segments_to_names(
+    segments: list[tuple[float, float]], weights: list[float]
+) -> list[tuple[float, float]] | None:
+    # Partitions the nonsilent segments, in order, into one contiguous group
+    # per name, minimizing the log-ratio between each group's duration and the
+    # name's expected share of the speech. Extra segments (a name split at an
+    # internal pause) merge into their name; too few segments, or any group
+    # far from its expected length (two names merged), reject the batch.
+    n, m = len(weights), len(segments)
+    if n == 0 or m < n or m > n * BATCH_TTS_MAX_PIECES_PER_NAME:
+        return None
+    voiced = sum(end - start for start, end in segments)
+    total_weight = sum(weights)
+    expected = [max(1e-3, voiced * w / total_weight) for w in weights]
+
+    inf = float("inf")
+    cost = [[inf] * (m + 1) for _ in range(n + 1)]
+    back = [[0] * (m + 1) for _ in range(n + 1)]
+    cost[0][0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(i, m - (n - i) + 1):
+            for k in range(1, min(BATCH_TTS_MAX_PIECES_PER_NAME, j - i + 1) + 1):
+                prev = cost[i - 1][j - k]
+                if prev == inf:
+                    continue
+                dur = max(1e-3, segments[j - 1][1] - segments[j - k][0])
+                c = prev + abs(math.log(dur / expected[i - 1]))
+                if c < cost[i][j]:
+                    cost[i][j] = c
+                    back[i][j] = k
+    if cost[n][m] == inf:
+        return None
+
+    groups: list[tuple[float, float]] = []
+    j = m
+    for i in range(n, 0, -1):
+        k = back[i][j]
+        groups.append((segments[j - k][0], segments[j - 1][1]))
+        j -= k
+    groups.reverse()
+    for (start, end), exp in zip(groups, expected):
+        if not BATCH_TTS_MIN_RATIO <= (end - start) / exp <= BATCH_TTS_MAX_RATIO:
+            return None
+    return groups
+
+
+def synthesize_name_batch(
     *,
     names: list[str],
-    text_template: str,
-    lang: str,
-    tts_provider: str,
-    tts_cmd: str,
     cache_dir: Path,
-    voice_sample: Path | None,
-    elevenlabs_api_key: str | None,
-    elevenlabs_voice_id: str | None,
-    elevenlabs_model_id: str | None,
-    elevenlabs_speed: float | None,
+    cache_key: str,
+    text_template: str,
     split_silence_db: float,
     split_silence_dur: float,
     batch_gap_hint: str,
-) -> dict[str, Path]:
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_key = name_audio_cache_key(
-        text_template=text_template,
-        lang=lang,
-        tts_provider=tts_provider,
-        tts_cmd=tts_cmd,
-        voice_sample=voice_sample,
-        elevenlabs_voice_id=elevenlabs_voice_id,
-        elevenlabs_model_id=elevenlabs_model_id,
-        elevenlabs_speed=elevenlabs_speed,
-    )
-    name_to_wav: dict[str, Path] = {}
-    missing: list[str] = []
-    for name in names:
-        out = cache_dir / name_cache_filename(name, cache_key)
-        if out.exists():
-            name_to_wav[name] = out
-        else:
-            missing.append(name)
-    if not missing:
-        return name_to_wav
-
-    if tts_provider == "none":
-        die("TTS provider is 'none'. Cannot build name audio cache.")
-
+    **tts_kwargs,
+) -> dict[str, Path] | None:
+    # One TTS request for names; None if the audio can't be matched to them.
     with tempfile.TemporaryDirectory() as tmpdir:
         tmp = Path(tmpdir)
         batch_mp3 = tmp / "batch.mp3"
@@ -541,22 +1109,8 @@ def ensure_name_clips_batch_tts(
 
         sep = (batch_gap_hint or "...").strip()
         sep_text = f". {sep}\n"
-        batch_text = sep_text.join(text_template.format(name=n) for n in missing) + "."
-        if tts_provider == "gtts":
-            tts_gtts(text=batch_text, lang=lang, out_mp3=batch_mp3)
-        elif tts_provider == "elevenlabs":
-            tts_elevenlabs(
-                text=batch_text,
-                out_mp3=batch_mp3,
-                api_key=elevenlabs_api_key,
-                voice_id=elevenlabs_voice_id,
-                model_id=elevenlabs_model_id,
-                speed=elevenlabs_speed,
-            )
-        elif tts_provider == "command":
-            tts_command(cmd_template=tts_cmd, text=batch_text, out_mp3=batch_mp3, voice_sample=voice_sample)
-        else:
-            die(f"Unsupported TTS provider: {tts_provider}")
+        texts = [text_template.format(name=n) for n in names]
+        synthesize_tts_mp3(text=sep_text.join(texts) + ".", out_mp3=batch_mp3, **tts_kwargs)
 
         run(
             [
@@ -571,7 +1125,8 @@ def ensure_name_clips_batch_tts(
                 "-ac",
                 "2",
                 str(batch_wav),
-            ]
+            ],
+            stage="tts",
         )
 
         split_trials = [
@@ -579,45 +1134,131 @@ def ensure_name_clips_batch_tts(
             (split_silence_db + 5.0, max(0.08, split_silence_dur * 0.66)),
             (split_silence_db + 10.0, max(0.05, split_silence_dur * 0.5)),
         ]
-        segments: list[tuple[float, float]] = []
+        weights = expected_speech_weights(texts)
+        groups: list[tuple[float, float]] | None = None
         for trial_db, trial_dur in split_trials:
             segments = detect_nonsilent_segments(
                 audio_wav=batch_wav,
                 noise_db=trial_db,
                 min_silence=trial_dur,
             )
-            if len(segments) >= len(missing):
+            groups = align_segments_to_names(segments, weights)
+            if groups is not None:
                 break
-        if len(segments) < len(missing):
-            raise RuntimeError(
-                f"Batch TTS split found only {len(segments)} segments for {len(missing)} names "
-                f"(try lower split silence duration / higher split silence dB)"
+        if groups is None:
+            return None
+
+        # One decode (above), then every clip is written from a memory-mapped view of it.
+        clips = {name: cache_dir / name_cache_filename(name, cache_key) for name in names}
+        with TIMINGS.stage("extract"):
+            write_wav_slices(
+                batch_wav,
+                [(start, max(end, start + 0.05), clips[name]) for name, (start, end) in zip(names, groups)],
             )
+        return clips
 
-        for idx, name in enumerate(missing):
-            out = cache_dir / name_cache_filename(name, cache_key)
-            start, end = segments[idx]
-            dur = max(0.05, end - start)
-            run(
-                [
-                    "ffmpeg",
-                    "-y",
-                    "-i",
-                    str(batch_wav),
-                    "-ss",
-                    f"{start:.3f}",
-                    "-t",
-                    f"{dur:.3f}",
-                    "-acodec",
-                    "pcm_s16le",
-                    "-ar",
-                    "48000",
-                    "-ac",
-                    "2",
-                    str(out),
-                ]
-            )
+
+def ensure_name_clips_batch_tts(
+    *,
+    names: list[str],
+    text_template: str,
+    lang: str,
+    tts_provider: str,
+    tts_cmd: str,
+    cache_dir: Path,
+    voice_sample: Path | None,
+    elevenlabs_api_key: str | None,
+    elevenlabs_voice_id: str | None,
+    elevenlabs_model_id: str | None,
+    elevenlabs_speed: float | None,
+    split_silence_db: float,
+    split_silence_dur: float,
+    batch_gap_hint: str,
+    batch_size: int = BATCH_TTS_SIZE,
+    cache_key: str | None = None,
+) -> dict[str, Path]:
+    # Returns clips for every name it could split cleanly; callers synthesize
+    # the rest one by one.
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    if cache_key is None:
+        cache_key = name_audio_cache_key(
+            text_template=text_template,
+            lang=lang,
+            tts_provider=tts_provider,
+            tts_cmd=tts_cmd,
+            voice_sample=voice_sample,
+            elevenlabs_voice_id=elevenlabs_voice_id,
+            elevenlabs_model_id=elevenlabs_model_id,
+            elevenlabs_speed=elevenlabs_speed,
+        )
+    name_to_wav: dict[str, Path] = {}
+    missing: list[str] = []
+    for name in names:
+        out = cache_dir / name_cache_filename(name, cache_key)
+        if out.exists():
             name_to_wav[name] = out
+        else:
+            missing.append(name)
+    TIMINGS.incr("name_cache_hits", len(name_to_wav))
+    TIMINGS.incr("name_cache_misses", len(missing))
+    if not missing:
+        return name_to_wav
+
+    if tts_provider == "none":
+        die("TTS provider is 'none'. Cannot build name audio cache.")
+
+    batch_size = max(1, batch_size)
+    pending = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+    while pending:
+        with ExitStack() as held:
+            chunk: list[str] = []
+            for name in pending.pop(0):
+                out = cache_dir / name_cache_filename(name, cache_key)
+                if not held.enter_context(cache_lock(out, blocking=False)):
+                    # Another job is synthesizing it; the per-name path waits for that.
+                    TIMINGS.incr("name_cache_busy")
+                    continue
+                if out.exists():
+                    name_to_wav[name] = out
+                else:
+                    chunk.append(name)
+            if not chunk:
+                continue
+            TIMINGS.incr("batch_tts_chunks")
+            try:
+                clips = synthesize_name_batch(
+                    names=chunk,
+                    cache_dir=cache_dir,
+                    cache_key=cache_key,
+                    text_template=text_template,
+                    split_silence_db=split_silence_db,
+                    split_silence_dur=split_silence_dur,
+                    batch_gap_hint=batch_gap_hint,
+                    lang=lang,
+                    tts_provider=tts_provider,
+                    tts_cmd=tts_cmd,
+                    voice_sample=voice_sample,
+                    elevenlabs_api_key=elevenlabs_api_key,
+                    elevenlabs_voice_id=elevenlabs_voice_id,
+                    elevenlabs_model_id=elevenlabs_model_id,
+                    elevenlabs_speed=elevenlabs_speed,
+                )
+            except Exception as exc:
+                # TTS itself failed; splitting wouldn't help, leave these to per-name synthesis.
+                TIMINGS.incr("batch_tts_chunk_failures")
+                print(f"Batch TTS failed for {len(chunk)} names: {exc}")
+                continue
+            if clips is None:
+                TIMINGS.incr("batch_tts_chunk_failures")
+                if len(chunk) >= BATCH_TTS_MIN_RESPLIT:
+                    # Only this chunk is re-synthesized, as two halves.
+                    half = len(chunk) // 2
+                    pending[:0] = [chunk[:half], chunk[half:]]
+                    print(f"Batch TTS split did not match {len(chunk)} names; retrying as {half} + {len(chunk) - half}")
+                else:
+                    print(f"Batch TTS split did not match {len(chunk)} names; synthesizing them one by one")
+                continue
+            name_to_wav.update(clips)
 
     return name_to_wav
 
@@ -629,22 +1270,33 @@ def ensure_silence_wav(*, silence_seconds: float, cache_dir: Path) -> Path:
     if out_wav.exists():
         return out_wav
 
-    # Generate a silence WAV with ffmpeg's anullsrc.
-    run(
-        [
-            "ffmpeg",
-            "-y",
-            "-f",
-            "lavfi",
-            "-i",
-            "anullsrc=r=48000:cl=stereo",
-            "-t",
-            f"{silence_seconds:.3f}",
-            "-acodec",
-            "pcm_s16le",
-            str(out_wav),
-        ]
-    )
+    with cache_lock(out_wav):
+        if out_wav.exists():
+            return out_wav
+        wav_tmp = temp_path(out_wav)
+        try:
+            # Generate a silence WAV with ffmpeg's anullsrc.
+            run(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    "anullsrc=r=48000:cl=stereo",
+                    "-t",
+                    f"{silence_seconds:.3f}",
+                    "-acodec",
+                    "pcm_s16le",
+                    "-f",
+                    "wav",
+                    str(wav_tmp),
+                ],
+                stage="concat",
+            )
+            os.replace(wav_tmp, out_wav)
+        finally:
+            wav_tmp.unlink(missing_ok=True)
     return out_wav
 
 
@@ -679,7 +1331,8 @@ def build_names_master_wav(
                 "-acodec",
                 "pcm_s16le",
                 str(out_master),
-            ]
+            ],
+            stage="concat",
         )
 
     return out_master
@@ -722,7 +1375,14 @@ def build_personalized_video(
     gold_max_name_seconds: float = 0.50,
     gold_detect_silence_dur: float = 0.05,
     gold_end_guard_seconds: float = 0.08,
+    encoding_profile: EncodingProfile | None = None,
+    lip_sync_key: str = "",
+    face_box_cache_dir: Path | None = None,
 ) -> Path:
+    profile = encoding_profile or get_profile(None)
+    lip_sync_enabled = lip_sync_provider != "none"
+    if lip_sync_enabled and not lip_sync_key:
+        lip_sync_key = lip_sync_base_key(base_video)
     out_dir.mkdir(parents=True, exist_ok=True)
     slug = safe_slug(person_name)
     output_ext = "mp3" if insert_mode == "silver" else "mp4"
@@ -788,7 +1448,8 @@ def build_personalized_video(
                 "-ac",
                 "2",
                 str(base_full_wav),
-            ]
+            ],
+            stage="extract",
         )
 
         if insert_mode == "silver":
@@ -821,7 +1482,8 @@ def build_personalized_video(
                         "-ac",
                         "2",
                         str(tts_wav),
-                    ]
+                    ],
+                    stage="extract",
                 )
             else:
                 run(
@@ -837,7 +1499,8 @@ def build_personalized_video(
                         "-ac",
                         "2",
                         str(tts_wav),
-                    ]
+                    ],
+                    stage="extract",
                 )
             name_for_merge = tts_wav
 
@@ -860,7 +1523,8 @@ def build_personalized_video(
                         "-ac",
                         "2",
                         str(base_name_slot_wav),
-                    ]
+                    ],
+                    stage="extract",
                 )
                 name_for_merge = match_audio_loudness(
                     source_wav=tts_wav,
@@ -884,7 +1548,8 @@ def build_personalized_video(
                     "-ac",
                     "2",
                     str(base_suffix_wav),
-                ]
+                ],
+                stage="extract",
             )
 
             concat_inputs = [str(name_for_merge)]
@@ -905,7 +1570,8 @@ def build_personalized_video(
                     "-map",
                     "[a]",
                     str(merged_wav),
-                ]
+                ],
+                stage="concat",
             )
 
             run(
@@ -916,12 +1582,10 @@ def build_personalized_video(
                     str(merged_wav),
                     "-af",
                     "loudnorm=I=-18:TP=-1.5:LRA=11",
-                    "-codec:a",
-                    "libmp3lame",
-                    "-q:a",
-                    "2",
+                    *mp3_encode_args(profile),
                     str(output),
-                ]
+                ],
+                stage="mux",
             )
             return output
 
@@ -963,7 +1627,8 @@ def build_personalized_video(
                             "-ac",
                             "2",
                             str(tts_wav),
-                        ]
+                        ],
+                        stage="extract",
                     )
                     name_src = tts_wav
                 else:
@@ -980,7 +1645,8 @@ def build_personalized_video(
                             "-ac",
                             "2",
                             str(tts_wav),
-                        ]
+                        ],
+                        stage="extract",
                     )
                     name_src = tts_wav
 
@@ -1005,7 +1671,8 @@ def build_personalized_video(
                             "-ac",
                             "2",
                             str(base_name_slot_wav),
-                        ]
+                        ],
+                        stage="extract",
                     )
                     name_for_merge = match_audio_loudness(
                         source_wav=name_src,
@@ -1015,9 +1682,13 @@ def build_personalized_video(
                     )
 
                 concat_inputs: list[str] = []
+                lip_windows: list[tuple[float, float]] = []
+                name_dur = ffprobe_duration(Path(name_for_merge)) if lip_sync_enabled else 0.0
+                out_cursor = 0.0
                 cursor = 0.0
                 for seg_start, seg_end in marker_segments:
                     if seg_start > cursor:
+                        out_cursor += max(0.01, seg_start - cursor)
                         part = tmp / f"pre_{len(concat_inputs)}.wav"
                         run(
                             [
@@ -1036,13 +1707,17 @@ def build_personalized_video(
                                 "-ac",
                                 "2",
                                 str(part),
-                            ]
+                            ],
+                            stage="extract",
                         )
                         concat_inputs.append(str(part))
                     concat_inputs.append(str(name_for_merge))
+                    lip_windows.append((out_cursor, out_cursor + name_dur))
+                    out_cursor += name_dur
                     if diamond_gap_seconds > 0:
                         gap_wav = ensure_silence_wav(silence_seconds=diamond_gap_seconds, cache_dir=tmp)
                         concat_inputs.append(str(gap_wav))
+                        out_cursor += diamond_gap_seconds
                     cursor = seg_end
 
                 if base_duration > cursor:
@@ -1062,7 +1737,8 @@ def build_personalized_video(
                             "-ac",
                             "2",
                             str(tail),
-                        ]
+                        ],
+                        stage="extract",
                     )
                     concat_inputs.append(str(tail))
 
@@ -1078,7 +1754,8 @@ def build_personalized_video(
                         "-map",
                         "[a]",
                         str(merged_wav),
-                    ]
+                    ],
+                    stage="concat",
                 )
 
                 run(
@@ -1097,8 +1774,10 @@ def build_personalized_video(
                         "copy",
                         "-af",
                         "loudnorm=I=-18:TP=-1.5:LRA=11",
+                        *audio_encode_args(profile),
                         str(output),
-                    ]
+                    ],
+                    stage="mux",
                 )
                 return apply_lip_sync(
                     video_path=output,
@@ -1107,6 +1786,10 @@ def build_personalized_video(
                     wav2lip_checkpoint=wav2lip_checkpoint,
                     wav2lip_pads=wav2lip_pads,
                     wav2lip_python=wav2lip_python,
+                    windows=lip_windows,
+                    base_key=lip_sync_key,
+                    face_box_cache_dir=face_box_cache_dir,
+                    encoding_profile=profile,
                 )
 
             if diamond_natural_name:
@@ -1137,7 +1820,8 @@ def build_personalized_video(
                             "-ac",
                             "2",
                             str(tts_wav),
-                        ]
+                        ],
+                        stage="extract",
                     )
                     name_src = tts_wav
                 else:
@@ -1154,7 +1838,8 @@ def build_personalized_video(
                             "-ac",
                             "2",
                             str(tts_wav),
-                        ]
+                        ],
+                        stage="extract",
                     )
                     name_src = tts_wav
 
@@ -1178,7 +1863,8 @@ def build_personalized_video(
                             "-ac",
                             "2",
                             str(base_name_slot_wav),
-                        ]
+                        ],
+                        stage="extract",
                     )
                     name_for_merge = match_audio_loudness(
                         source_wav=name_src,
@@ -1202,7 +1888,8 @@ def build_personalized_video(
                         "-ac",
                         "2",
                         str(base_prefix_wav),
-                    ]
+                    ],
+                    stage="extract",
                 )
                 run(
                     [
@@ -1219,9 +1906,11 @@ def build_personalized_video(
                         "-ac",
                         "2",
                         str(base_suffix_wav),
-                    ]
+                    ],
+                    stage="extract",
                 )
 
+                name_dur = ffprobe_duration(Path(name_for_merge)) if lip_sync_enabled else 0.0
                 concat_inputs = [str(base_prefix_wav), str(name_for_merge)]
                 if diamond_gap_seconds > 0:
                     gap_wav = ensure_silence_wav(silence_seconds=diamond_gap_seconds, cache_dir=tmp)
@@ -1240,7 +1929,8 @@ def build_personalized_video(
                         "-map",
                         "[a]",
                         str(merged_wav),
-                    ]
+                    ],
+                    stage="concat",
                 )
 
                 run(
@@ -1259,8 +1949,10 @@ def build_personalized_video(
                         "copy",
                         "-af",
                         "loudnorm=I=-18:TP=-1.5:LRA=11",
+                        *audio_encode_args(profile),
                         str(output),
-                    ]
+                    ],
+                    stage="mux",
                 )
                 return apply_lip_sync(
                     video_path=output,
@@ -1269,6 +1961,10 @@ def build_personalized_video(
                     wav2lip_checkpoint=wav2lip_checkpoint,
                     wav2lip_pads=wav2lip_pads,
                     wav2lip_python=wav2lip_python,
+                    windows=[(speech_start, speech_start + name_dur)],
+                    base_key=lip_sync_key,
+                    face_box_cache_dir=face_box_cache_dir,
+                    encoding_profile=profile,
                 )
             detect_min_silence = min(silence_dur, gold_detect_silence_dur)
             seg = detect_first_speech_segment(
@@ -1316,7 +2012,8 @@ def build_personalized_video(
                         "-ac",
                         "2",
                         str(tts_wav),
-                    ]
+                    ],
+                    stage="extract",
                 )
                 name_src = tts_wav
             else:
@@ -1343,7 +2040,8 @@ def build_personalized_video(
                     "-ac",
                     "2",
                     str(name_fit_wav),
-                ]
+                ],
+                stage="fit",
             )
             name_for_merge = name_fit_wav
             if match_name_loudness:
@@ -1364,7 +2062,8 @@ def build_personalized_video(
                         "-ac",
                         "2",
                         str(base_name_slot_wav),
-                    ]
+                    ],
+                    stage="extract",
                 )
                 name_for_merge = match_audio_loudness(
                     source_wav=name_fit_wav,
@@ -1385,7 +2084,8 @@ def build_personalized_video(
                     "-acodec",
                     "pcm_s16le",
                     str(base_prefix_wav),
-                ]
+                ],
+                stage="extract",
             )
             # Suffix: base audio after speech_end
             run(
@@ -1399,7 +2099,8 @@ def build_personalized_video(
                     "-acodec",
                     "pcm_s16le",
                     str(base_suffix_wav),
-                ]
+                ],
+                stage="extract",
             )
 
             # Concatenate prefix + fitted name + suffix
@@ -1418,7 +2119,8 @@ def build_personalized_video(
                     "-map",
                     "[a]",
                     str(merged_wav),
-                ]
+                ],
+                stage="concat",
             )
 
             # Mux back with video; keep timing aligned (we preserved original duration).
@@ -1432,6 +2134,7 @@ def build_personalized_video(
                     str(merged_wav),
                     "-c:v",
                     "copy",
+                    *audio_encode_args(profile),
                     "-map",
                     "0:v:0",
                     "-map",
@@ -1439,7 +2142,8 @@ def build_personalized_video(
                     "-t",
                     f"{base_duration:.3f}",
                     str(output),
-                ]
+                ],
+                stage="mux",
             )
 
             return apply_lip_sync(
@@ -1449,6 +2153,10 @@ def build_personalized_video(
                 wav2lip_checkpoint=wav2lip_checkpoint,
                 wav2lip_pads=wav2lip_pads,
                 wav2lip_python=wav2lip_python,
+                windows=[(speech_start, speech_end)],
+                base_key=lip_sync_key,
+                face_box_cache_dir=face_box_cache_dir,
+                encoding_profile=profile,
             )
 
         if insert_mode not in ("silver", "gold"):
@@ -1460,6 +2168,7 @@ def build_personalized_video(
                 keep_duration = max(0.0, base_duration - tts_duration)
             else:
                 keep_duration = max(0.0, min(base_duration, speech_end))
+            lip_windows = [(keep_duration, min(base_duration, keep_duration + tts_duration))]
             # Extract base audio up to keep_duration
             run([
                 "ffmpeg",
@@ -1472,10 +2181,12 @@ def build_personalized_video(
                 "-acodec",
                 "pcm_s16le",
                 str(base_trim_wav),
-            ])
+            ], stage="extract")
         elif name_position == "start":
             # Extract full base audio (to be concatenated after the name)
             shutil.copyfile(base_full_wav, base_trim_wav)
+            # The padded video no longer matches the base frames; sync the whole clip.
+            lip_windows = None
         else:
             die(f"Unsupported name position: {name_position}")
 
@@ -1490,7 +2201,8 @@ def build_personalized_video(
                     "-acodec",
                     "pcm_s16le",
                     str(tts_wav),
-                ]
+                ],
+                stage="extract",
             )
             tts_input_path = tts_wav
         else:
@@ -1525,7 +2237,7 @@ def build_personalized_video(
             "-map",
             "[a]",
             str(merged_wav),
-        ])
+        ], stage="concat")
 
         if insert_mode == "silver":
             run(
@@ -1534,12 +2246,10 @@ def build_personalized_video(
                     "-y",
                     "-i",
                     str(merged_wav),
-                    "-codec:a",
-                    "libmp3lame",
-                    "-q:a",
-                    "2",
+                    *mp3_encode_args(profile),
                     str(output),
-                ]
+                ],
+                stage="mux",
             )
             return output
 
@@ -1547,28 +2257,24 @@ def build_personalized_video(
         mux_cmd = ["ffmpeg", "-y", "-i", str(base_video), "-i", str(merged_wav)]
         if name_position == "start":
             # Pad video with a frozen first frame so name audio plays before the speaker starts.
+            video_filter = f"[0:v]tpad=start_duration={tts_duration:.3f}:start_mode=clone"
+            if scale_filter(profile):
+                video_filter += f",{scale_filter(profile)}"
             mux_cmd += [
                 "-filter_complex",
-                f"[0:v]tpad=start_duration={tts_duration:.3f}:start_mode=clone[v]",
+                f"{video_filter}[v]",
                 "-map",
                 "[v]",
                 "-map",
                 "1:a:0",
-                "-c:v",
-                "libx264",
-                "-crf",
-                "20",
-                "-preset",
-                "medium",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "160k",
+                *video_encode_args(profile),
+                *audio_encode_args(profile),
             ]
         else:
             mux_cmd += [
                 "-c:v",
                 "copy",
+                *audio_encode_args(profile),
                 "-map",
                 "0:v:0",
                 "-map",
@@ -1577,7 +2283,7 @@ def build_personalized_video(
                 f"{base_duration:.3f}",
             ]
         mux_cmd.append(str(output))
-        run(mux_cmd)
+        run(mux_cmd, stage="mux")
 
     return apply_lip_sync(
         video_path=output,
@@ -1586,9 +2292,64 @@ def build_personalized_video(
         wav2lip_checkpoint=wav2lip_checkpoint,
         wav2lip_pads=wav2lip_pads,
         wav2lip_python=wav2lip_python,
+        windows=lip_windows,
+        base_key=lip_sync_key if name_position == "end" else None,
+        face_box_cache_dir=face_box_cache_dir,
+        encoding_profile=profile,
     )
 
 
+# Flags that don't change what a recipient's output looks like.
+NON_RENDER_OPTIONS = {
+    "recipients",
+    "outdir",
+    "dry_run",
+    "resume",
+    "manifest",
+    "chunk_size",
+    "render_workers",
+    "cpu_budget",
+    "tts_workers",
+    "tts_daemon_workers",
+    "tts_daemon_timeout",
+    "wav2lip_timeout",
+    "timing_report",
+    "work_dir",
+    "name_cache_dir",
+    "face_box_cache_dir",
+    "names_master_out",
+    "name_gap",
+    "build_name_cache",
+    "elevenlabs_api_key",
+    "max_attempts",
+    "retry_base_delay",
+    "row_range",
+}
+
+
+def parse_row_range(value: str) -> tuple[int, int | None]:
+    # "START:STOP" over 0-based data rows (header excluded), STOP exclusive
+    # and optional: "0:500", "500:".
+    if not value:
+        return 0, None
+    start_text, sep, stop_text = value.partition(":")
+    try:
+        start = int(start_text) if start_text.strip() else 0
+        stop = int(stop_text) if sep and stop_text.strip() else None
+    except ValueError:
+        die(f"Invalid --row-range {value!r}; expected START:STOP")
+    if start < 0 or (stop is not None and stop < start):
+        die(f"Invalid --row-range {value!r}")
+    return start, stop
+
+
+def render_options_hash(args: argparse.Namespace, base_video: Path) -> str:
+    options = {k: v for k, v in vars(args).items() if k not in NON_RENDER_OPTIONS}
+    st = base_video.stat()
+    options["base_video"] = [str(base_video.resolve()), st.st_size, st.st_mtime_ns]
+    return options_hash(options)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Personalized video generator")
     parser.add_argument("--video", required=True, help="Path to base video (MP4)")
@@ -1657,7 +2418,68 @@ def main() -> int:
     parser.add_argument(
         "--wav2lip-python",
         default="python3",
-        help="Python executable used to run Wav2Lip inference.py.",
+        help="Python executable used to run the Wav2Lip worker (needs Wav2Lip's dependencies).",
+    )
+    parser.add_argument(
+        "--wav2lip-timeout",
+        type=float,
+        default=900.0,
+        help="Seconds to wait for a Wav2Lip worker reply before the worker is killed and restarted.",
+    )
+    parser.add_argument(
+        "--face-box-cache-dir",
+        default="",
+        help="Directory for cached Wav2Lip face boxes per base video. Default: <work-dir>/face_boxes",
+    )
+    parser.add_argument(
+        "--encoding-profile",
+        choices=sorted(PROFILES),
+        default="default",
+        help="Named encode settings (codec, preset, CRF, resolution cap, audio bitrate, threads).",
+    )
+    parser.add_argument(
+        "--work-dir",
+        default="",
+        help="Directory for per-run intermediates (e.g. downscaled base). Default: <outdir>/_work",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=1,
+        help="Number of recipients rendered in parallel.",
+    )
+    parser.add_argument(
+        "--cpu-budget",
+        type=int,
+        default=0,
+        help="CPU threads shared by all ffmpeg processes of this run. Default: VIDX_CPU_BUDGET or all cores.",
+    )
+    parser.add_argument(
+        "--timing-report",
+        default="",
+        help="Write per-stage/per-recipient timing JSON here and print a summary.",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Attempts per recipient for transient failures (network, HTTP 429/5xx, killed ffmpeg).",
+    )
+    parser.add_argument(
+        "--retry-base-delay",
+        type=float,
+        default=2.0,
+        help="Seconds before the first retry; doubles per attempt (capped at 60s, with jitter).",
+    )
+    parser.add_argument(
+        "--manifest",
+        default="",
+        help="SQLite render manifest (status, output, size, checksum per recipient). Default: <outdir>/_manifest.sqlite3",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip recipients the manifest records as done with the same options and an intact output.",
     )
     parser.add_argument("--dry-run", action="store_true", help="Print planned outputs only")
     parser.add_argument(
@@ -1766,6 +2588,41 @@ def main() -> int:
         default=True,
         help="When building cache, synthesize all names in one TTS call and split by silence.",
     )
+    parser.add_argument(
+        "--batch-tts-size",
+        type=int,
+        default=BATCH_TTS_SIZE,
+        help="Names per batch TTS request; a batch that doesn't split cleanly is retried in halves.",
+    )
+    parser.add_argument(
+        "--tts-workers",
+        type=int,
+        default=0,
+        help=(
+            "Concurrent per-name syntheses when batch TTS is off or fails. "
+            "Default: gtts 4, elevenlabs 2, command one per CPU of --cpu-budget (gtts max 8, elevenlabs max 4)."
+        ),
+    )
+    parser.add_argument(
+        "--tts-daemon",
+        action="store_true",
+        help=(
+            "With --tts-provider command: --tts-cmd starts a long-lived engine that answers "
+            "JSON-line requests (see tts_daemon.py) instead of running once per name."
+        ),
+    )
+    parser.add_argument(
+        "--tts-daemon-workers",
+        type=int,
+        default=2,
+        help="Engine processes started for --tts-daemon; each loads its own model.",
+    )
+    parser.add_argument(
+        "--tts-daemon-timeout",
+        type=float,
+        default=120.0,
+        help="Seconds to wait for a --tts-daemon reply before the engine is killed and restarted.",
+    )
     parser.add_argument(
         "--batch-split-silence-db",
         type=float,
@@ -1783,6 +2640,20 @@ def main() -> int:
         default="ठहराव",
         help="Prompt hint inserted between names in batch TTS to encourage short pauses.",
     )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Recipients read, name-synthesized and rendered per chunk (the list is streamed).",
+    )
+    parser.add_argument(
+        "--row-range",
+        default="",
+        help=(
+            "Render only data rows START:STOP (0-based, header excluded, STOP exclusive), "
+            "e.g. one shard of a job split across machines."
+        ),
+    )
     parser.add_argument(
         "--name-cache-dir",
         default="",
@@ -1801,6 +2672,7 @@ def main() -> int:
     )
 
     args = parser.parse_args()
+    TIMINGS.reset()
 
     if not args.dry_run and (shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None):
         die("ffmpeg/ffprobe not found. Install ffmpeg first.")
@@ -1814,31 +2686,78 @@ def main() -> int:
     if not recipients.exists():
         die(f"Recipients file not found: {recipients}")
 
-    df = read_recipients(recipients, args.name_col, args.phone_col)
+    # Columns are validated by reading the first chunk, before any work starts.
+    row_start, row_stop = parse_row_range(args.row_range)
+    chunks = iter_recipient_chunks(
+        recipients, args.name_col, args.phone_col, max(1, args.chunk_size), start=row_start, stop=row_stop
+    )
+    try:
+        first_chunk = next(chunks, [])
+    except ValueError as exc:
+        die(str(exc))
+
+    render_workers = max(1, args.render_workers)
+    cpu_budget = args.cpu_budget if args.cpu_budget > 0 else default_cpu_budget()
+    THREAD_BUDGET.configure(cpu_budget=cpu_budget, concurrent_renders=render_workers)
+    tts_workers = tts_concurrency(args.tts_provider, args.tts_workers, cpu_budget)
+    if args.tts_daemon and args.tts_provider == "command" and not args.dry_run:
+        if not args.tts_cmd:
+            die("--tts-daemon needs --tts-cmd to start the engine.")
+        tts_daemon_workers = max(1, args.tts_daemon_workers)
+        start_tts_daemons(args.tts_cmd, tts_daemon_workers, max(1.0, args.tts_daemon_timeout))
+        # More threads than engines would only queue on the pool.
+        tts_workers = min(tts_workers, tts_daemon_workers)
+    encoding_profile = get_profile(args.encoding_profile)
+    work_dir = Path(args.work_dir) if args.work_dir else (out_dir / "_work")
+    face_box_cache_dir = Path(args.face_box_cache_dir) if args.face_box_cache_dir else (work_dir / "face_boxes")
+    lip_sync_key = ""
+    if not args.dry_run and args.insert_mode != "silver" and args.lip_sync_provider != "none":
+        lip_sync_key = lip_sync_base_key(base_video, encoding_profile)
+        set_wav2lip_timeout(max(1.0, args.wav2lip_timeout))
+    retry = RetryPolicy(max_attempts=max(1, args.max_attempts), base_delay=max(0.0, args.retry_base_delay))
+    manifest: RenderManifest | None = None
+    if not args.dry_run:
+        manifest = RenderManifest(
+            Path(args.manifest) if args.manifest else (out_dir / "_manifest.sqlite3"),
+            render_options_hash(args, base_video),
+        )
+    if not args.dry_run and args.insert_mode != "silver":
+        base_video = prepare_base_video(base_video, encoding_profile, work_dir)
 
     name_cache_dir = Path(args.name_cache_dir) if args.name_cache_dir else (out_dir / "_name_audio")
     voice_sample = Path(args.voice_sample) if args.voice_sample else None
     elevenlabs_api_key = args.elevenlabs_api_key or None
     elevenlabs_voice_id = args.elevenlabs_voice_id or None
     elevenlabs_model_id = args.elevenlabs_model_id or None
+    # Hashes the voice sample once for the whole run.
+    name_cache_key = name_audio_cache_key(
+        text_template=args.text,
+        lang=args.lang,
+        tts_provider=args.tts_provider,
+        tts_cmd=args.tts_cmd,
+        voice_sample=voice_sample,
+        elevenlabs_voice_id=elevenlabs_voice_id,
+        elevenlabs_model_id=elevenlabs_model_id,
+        elevenlabs_speed=args.elevenlabs_speed,
+    )
 
     name_to_wav: dict[str, Path] = {}
-    if args.build_name_cache and not args.dry_run:
-        unique_names = []
-        seen = set()
-        for n in df[args.name_col].astype(str).map(lambda s: s.strip()):
-            if not n or n in seen:
-                continue
-            seen.add(n)
-            unique_names.append(n)
-
-        print(f"Building name audio cache for {len(unique_names)} unique names...")
+    build_cache = args.build_name_cache and not args.dry_run
+    unique_names: list[str] = []
+    seen_names: set[str] = set()
+    fetched_names: set[str] = set()
+
+    def prefetch_names(names: list[str]) -> None:
+        # TTS for one chunk's new names; runs while the previous chunk renders.
+        if not names:
+            return
+        print(f"Building name audio cache for {len(names)} unique names...")
         batch_enabled = args.batch_name_tts and args.tts_provider in ("elevenlabs", "command", "gtts")
         if batch_enabled:
             try:
                 name_to_wav.update(
                     ensure_name_clips_batch_tts(
-                        names=unique_names,
+                        names=names,
                         text_template=args.text,
                         lang=args.lang,
                         tts_provider=args.tts_provider,
@@ -1849,19 +2768,21 @@ def main() -> int:
                         elevenlabs_voice_id=elevenlabs_voice_id,
                         elevenlabs_model_id=elevenlabs_model_id,
                         elevenlabs_speed=args.elevenlabs_speed,
+                        cache_key=name_cache_key,
                         split_silence_db=args.batch_split_silence_db,
                         split_silence_dur=args.batch_split_silence_dur,
                         batch_gap_hint=args.batch_gap_hint,
+                        batch_size=args.batch_tts_size,
                     )
                 )
             except Exception as exc:
                 print(f"Batch name TTS split failed, falling back to per-name synthesis: {exc}")
 
-        for n in unique_names:
-            if n in name_to_wav and name_to_wav[n].exists():
-                continue
-            name_to_wav[n] = ensure_name_clip_wav(
-                name=n,
+        missing = [n for n in names if not (n in name_to_wav and name_to_wav[n].exists())]
+        name_to_wav.update(
+            ensure_name_clips_parallel(
+                names=missing,
+                workers=tts_workers,
                 text_template=args.text,
                 lang=args.lang,
                 tts_provider=args.tts_provider,
@@ -1872,24 +2793,20 @@ def main() -> int:
                 elevenlabs_voice_id=elevenlabs_voice_id,
                 elevenlabs_model_id=elevenlabs_model_id,
                 elevenlabs_speed=args.elevenlabs_speed,
+                cache_key=name_cache_key,
             )
+        )
 
-        if args.names_master_out:
-            silence = ensure_silence_wav(silence_seconds=args.name_gap, cache_dir=name_cache_dir)
-            master_out = Path(args.names_master_out)
-            build_names_master_wav(
-                name_wavs=[name_to_wav[n] for n in unique_names],
-                silence_wav=silence,
-                out_master=master_out,
-            )
-            print(f"Created names master: {master_out}")
+    def render_one(recipient: Recipient) -> None:
+        with TIMINGS.recipient(recipient.name) as timing:
+            render_recipient(recipient, timing)
 
-    print(f"Generating {len(df)} videos...")
-    for _, row in df.iterrows():
-        name = str(row[args.name_col]).strip()
-        if not name:
-            continue
-        try:
+    def render_recipient(recipient: Recipient, timing) -> None:
+        name = recipient.name
+
+        def attempt(_attempt: int) -> Path:
+            if manifest is not None:
+                manifest.mark_running(name, recipient.index)
             name_audio_wav = None
             if args.build_name_cache and not args.dry_run:
                 name_audio_wav = name_to_wav.get(name)
@@ -1906,10 +2823,11 @@ def main() -> int:
                         elevenlabs_voice_id=elevenlabs_voice_id,
                         elevenlabs_model_id=elevenlabs_model_id,
                         elevenlabs_speed=args.elevenlabs_speed,
+                        cache_key=name_cache_key,
                     )
                     name_to_wav[name] = name_audio_wav
 
-            output = build_personalized_video(
+            return build_personalized_video(
                 base_video=base_video,
                 out_dir=out_dir,
                 person_name=name,
@@ -1946,11 +2864,122 @@ def main() -> int:
                 gold_max_name_seconds=args.gold_max_name_seconds,
                 gold_detect_silence_dur=args.gold_detect_silence_dur,
                 gold_end_guard_seconds=args.gold_end_guard_seconds,
+                encoding_profile=encoding_profile,
+                lip_sync_key=lip_sync_key,
+                face_box_cache_dir=face_box_cache_dir,
             )
+
+        def on_retry(failed_attempt: int, exc: BaseException, wait: float) -> None:
+            TIMINGS.incr("render_retries")
+            print(f"Retrying {name} in {wait:.1f}s (attempt {failed_attempt} failed: {exc})")
+
+        try:
+            output = retry.call(attempt, on_retry=on_retry)
+            if manifest is not None:
+                manifest.mark_done(name, output)
             print(f"Created: {output}")
         except Exception as exc:
-            print(f"Failed for {name}: {exc}")
+            # Out of attempts or not retryable: dead-letter the recipient.
+            timing.status = "failed"
+            kind = classify(exc)
+            TIMINGS.incr(f"dead_letter:{kind}")
+            if manifest is not None:
+                manifest.mark_failed(name, str(exc), kind)
+            print(f"Failed for {name} ({kind}): {exc}")
+
+    def render_chunk(chunk: list[Recipient], render_pool: ThreadPoolExecutor | None) -> None:
+        if render_pool is None:
+            for recipient in chunk:
+                render_one(recipient)
+            return
+        # Names that map to the same output file render sequentially in one task.
+        groups: dict[str, list[Recipient]] = {}
+        for recipient in chunk:
+            groups.setdefault(safe_slug(recipient.name), []).append(recipient)
+        list(render_pool.map(lambda group: [render_one(r) for r in group], groups.values()))
+
+    # Pipeline: TTS for chunk N+1 runs while chunk N renders.
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    render_pool = ThreadPoolExecutor(max_workers=render_workers) if render_workers > 1 else None
+    rendered = 0
+    skipped = 0
+
+    def render_pending(chunk: list[Recipient], prefetch: Future | None) -> None:
+        nonlocal rendered
+        if prefetch is not None:
+            prefetch.result()
+        print(f"Generating {len(chunk)} videos ({rendered + 1}-{rendered + len(chunk)})...")
+        render_chunk(chunk, render_pool)
+        rendered += len(chunk)
+
+    try:
+        pending: tuple[list[Recipient], Future | None] | None = None
+        for chunk in itertools.chain([first_chunk] if first_chunk else [], chunks):
+            if build_cache:
+                # The master lists every recipient's name, including those a
+                # resumed run skips as already done.
+                new_names = [n for n in dict.fromkeys(r.name for r in chunk) if n not in seen_names]
+                seen_names.update(new_names)
+                unique_names.extend(new_names)
+            if args.resume and manifest is not None:
+                todo = [r for r in chunk if not manifest.is_complete(r.name)]
+                skipped += len(chunk) - len(todo)
+                chunk = todo
+                if not chunk:
+                    continue
+            names = [r.name for r in chunk]
+            prefetch: Future | None = None
+            if build_cache:
+                to_fetch = [n for n in dict.fromkeys(names) if n not in fetched_names]
+                fetched_names.update(to_fetch)
+                prefetch = prefetcher.submit(prefetch_names, to_fetch)
+            if pending is not None:
+                render_pending(*pending)
+            pending = (chunk, prefetch)
+        if pending is not None:
+            render_pending(*pending)
+    finally:
+        prefetcher.shutdown(wait=True)
+        if render_pool is not None:
+            render_pool.shutdown(wait=True)
+
+    if build_cache and args.names_master_out:
+        for name in unique_names:
+            if name not in name_to_wav:
+                # Rendered by an earlier attempt: its clip is in the name cache.
+                cached = name_cache_dir / name_cache_filename(name, name_cache_key)
+                if cached.exists():
+                    name_to_wav[name] = cached
+        # Names whose TTS failed on every attempt have no clip; the master
+        # lists the rest instead of failing a run whose videos are done.
+        master_names = [n for n in unique_names if name_to_wav.get(n)]
+        missing_names = [n for n in unique_names if not name_to_wav.get(n)]
+        if missing_names:
+            shown = ", ".join(missing_names[:20]) + (" ..." if len(missing_names) > 20 else "")
+            print(f"Names master skips {len(missing_names)} names without audio: {shown}")
+        if master_names:
+            silence = ensure_silence_wav(silence_seconds=args.name_gap, cache_dir=name_cache_dir)
+            master_out = Path(args.names_master_out)
+            build_names_master_wav(
+                name_wavs=[name_to_wav[n] for n in master_names],
+                silence_wav=silence,
+                out_master=master_out,
+            )
+            print(f"Created names master: {master_out}")
 
+    close_wav2lip_sessions()
+    close_tts_daemons()
+    if manifest is not None:
+        counts = manifest.count_by_status()
+        resumed = f", {skipped} skipped (already done)" if args.resume else ""
+        print(f"Manifest: {counts.get('done', 0)} done, {counts.get('failed', 0)} failed{resumed}")
+        for entry in manifest.dead_letters(limit=20):
+            print(f"  dead letter: {entry.name} ({entry.error_kind}, {entry.attempts} attempts): {entry.error}")
+        manifest.close()
+    if args.timing_report and not args.dry_run:
+        TIMINGS.write_json(Path(args.timing_report))
+        print(TIMINGS.summary())
+        print(f"Timing report: {args.timing_report}")
     print("Done.")
     return 0
 
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import csv
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+# Streams recipient lists without loading them whole: CSV through the csv
+# module, XLSX through openpyxl's read-only mode. Only legacy formats
+# (.xls/.ods) still go through pandas.
+
+DEFAULT_CHUNK_SIZE = 500
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class Recipient:
+    index: int  # 0-based data row, header excluded
+    name: str
+    phone: str
+
+
+def normalize_name(value: object) -> str:
+    # NFC so the same name typed on different keyboards shares one TTS clip.
+    text = unicodedata.normalize("NFC", cell_text(value))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def cell_text(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:
+            return ""
+        if value.is_integer():
+            # Phone numbers stored as numbers in Excel come back as floats.
+            return str(int(value))
+    return str(value).strip()
+
+
+def _csv_rows(path: Path) -> Iterator[list[object]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+
+def _xlsx_rows(path: Path) -> Iterator[list[object]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ValueError("openpyxl is not installed. Run: pip install openpyxl") from exc
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        wb.close()
+
+
+def _pandas_rows(path: Path) -> Iterator[list[object]]:
+    import pandas as pd
+
+    df = pd.read_excel(path, header=None, dtype=object)
+    for row in df.itertuples(index=False):
+        yield list(row)
+
+
+def _rows(path: Path) -> Iterator[list[object]]:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return _csv_rows(path)
+    if suffix in (".xlsx", ".xlsm"):
+        return _xlsx_rows(path)
+    return _pandas_rows(path)
+
+
+def count_data_rows(path: Path) -> int:
+    # Data rows after the header, including rows iter_recipients would skip;
+    # row ranges (start/stop below) are in these units.
+    rows = _rows(path)
+    next(rows, None)
+    return sum(1 for _ in rows)
+
+
+def iter_recipients(
+    path: Path,
+    name_col: str,
+    phone_col: str,
+    start: int = 0,
+    stop: int | None = None,
+) -> Iterator[Recipient]:
+    # Raises ValueError for a missing column before yielding anything. Rows
+    # with an empty name or phone are skipped. start/stop select data rows
+    # [start, stop), e.g. one shard of a distributed job.
+    rows = _rows(path)
+    header = [cell_text(h) for h in next(rows, [])]
+    for col in (name_col, phone_col):
+        if col not in header:
+            raise ValueError(f"Missing column '{col}' in {path}")
+    name_idx = header.index(name_col)
+    phone_idx = header.index(phone_col)
+    for index, row in enumerate(rows):
+        if index < start:
+            continue
+        if stop is not None and index >= stop:
+            break
+        name = normalize_name(row[name_idx]) if name_idx < len(row) else ""
+        phone = cell_text(row[phone_idx]) if phone_idx < len(row) else ""
+        if name and phone:
+            yield Recipient(index=index, name=name, phone=phone)
+
+
+def iter_recipient_chunks(
+    path: Path,
+    name_col: str,
+    phone_col: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start: int = 0,
+    stop: int | None = None,
+) -> Iterator[list[Recipient]]:
+    chunk: list[Recipient] = []
+    for recipient in iter_recipients(path, name_col, phone_col, start, stop):
+        chunk.append(recipient)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
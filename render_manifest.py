@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+# Recipient-level record of a campaign run, kept next to the outputs so a
+# rerun with --resume skips recipients whose output is still intact.
+
+
+@dataclass
+class ManifestEntry:
+    name: str
+    row_index: int
+    status: str
+    output: Optional[str]
+    size: Optional[int]
+    sha256: Optional[str]
+    options_hash: str
+    attempts: int
+    error: Optional[str]
+    updated_at: float
+    error_kind: Optional[str] = None  # retry_policy.TRANSIENT / PERMANENT for failures
+
+
+def options_hash(options: dict[str, Any]) -> str:
+    # Stable digest of everything that changes the rendered output.
+    blob = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_COLUMNS = "name, row_index, status, output, size, sha256, options_hash, attempts, error, updated_at, error_kind"
+
+
+class RenderManifest:
+    def __init__(self, db_path: Path, options_hash: str) -> None:
+        self.db_path = db_path
+        self.options_hash = options_hash
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Render threads share one connection; writes are serialized here.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS recipients (
+                    name TEXT PRIMARY KEY,
+                    row_index INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    output TEXT,
+                    size INTEGER,
+                    sha256 TEXT,
+                    options_hash TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    error_kind TEXT
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_recipients_status ON recipients (status)")
+            self._conn.commit()
+
+    def get(self, name: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM recipients WHERE name = ?",
+                (name,),
+            ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def is_complete(self, name: str) -> bool:
+        # Done under the same options, and the output still has the recorded
+        # size and checksum.
+        entry = self.get(name)
+        if entry is None or entry.status != "done" or entry.options_hash != self.options_hash:
+            return False
+        if not entry.output:
+            return False
+        output = Path(entry.output)
+        try:
+            if output.stat().st_size != entry.size:
+                return False
+        except OSError:
+            return False
+        return sha256_file(output) == entry.sha256
+
+    def mark_running(self, name: str, row_index: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO recipients (name, row_index, status, options_hash, attempts, error, updated_at)
+                VALUES (?, ?, 'running', ?, 1, NULL, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    row_index = excluded.row_index,
+                    status = 'running',
+                    options_hash = excluded.options_hash,
+                    attempts = recipients.attempts + 1,
+                    error = NULL,
+                    error_kind = NULL,
+                    updated_at = excluded.updated_at
+                """,
+                (name, row_index, self.options_hash, now),
+            )
+            self._conn.commit()
+
+    def mark_done(self, name: str, output: Path) -> None:
+        size = output.stat().st_size
+        digest = sha256_file(output)
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE recipients SET status = 'done', output = ?, size = ?, sha256 = ?, error = NULL, updated_at = ?
+                WHERE name = ?
+                """,
+                (str(output), size, digest, time.time(), name),
+            )
+            self._conn.commit()
+
+    def mark_failed(self, name: str, error: str, error_kind: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE recipients SET status = 'failed', error = ?, error_kind = ?, updated_at = ? WHERE name = ?",
+                (error[-2000:], error_kind, time.time(), name),
+            )
+            self._conn.commit()
+
+    def dead_letters(self, limit: int = 100) -> list[ManifestEntry]:
+        # Recipients that ran out of attempts or failed permanently.
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM recipients WHERE status = 'failed' ORDER BY row_index LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [ManifestEntry(*row) for row in rows]
+
+    def count_by_status(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM recipients GROUP BY status").fetchall()
+        return {row[0]: int(row[1]) for row in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def manifest_summary(db_path: Path, limit: int = 100) -> Optional[dict[str, Any]]:
+    # Read-only view for job status endpoints; None if the run has no manifest yet.
+    if not db_path.exists():
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM recipients GROUP BY status").fetchall())
+        rows = conn.execute(
+            f"SELECT {_COLUMNS} FROM recipients WHERE status = 'failed' ORDER BY row_index LIMIT ?",
+            (limit,),
+        ).fetchall()
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    return {
+        "recipients": {status: int(n) for status, n in counts.items()},
+        "dead_letter": [
+            {
+                "name": entry.name,
+                "row_index": entry.row_index,
+                "error_kind": entry.error_kind,
+                "attempts": entry.attempts,
+                "error": entry.error,
+            }
+            for entry in (ManifestEntry(*row) for row in rows)
+        ],
+    }
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+# Shared with the backend metrics so histograms from many runs can be merged.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+@dataclass
+class StageStats:
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    spawns: int = 0
+    bytes_written: int = 0
+    errors: int = 0
+
+    def add(self, other: "StageStats") -> None:
+        self.wall_s += other.wall_s
+        self.cpu_s += other.cpu_s
+        self.spawns += other.spawns
+        self.bytes_written += other.bytes_written
+        self.errors += other.errors
+
+
+@dataclass
+class Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    sum: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        idx = len(LATENCY_BUCKETS)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                idx = i
+                break
+        self.counts[idx] += 1
+        self.sum += value
+        self.count += 1
+
+
+@dataclass
+class RecipientTiming:
+    name: str
+    status: str = "running"
+    wall_s: float = 0.0
+    stages: dict[str, StageStats] = field(default_factory=dict)
+
+
+def _spawn(cmd: list[str]) -> tuple[subprocess.CompletedProcess, float]:
+    # Reap the child with wait4 so CPU time is attributed to this process only,
+    # which stays correct when several renders spawn ffmpeg concurrently.
+    if not hasattr(os, "wait4"):
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        return result, 0.0
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    stdout_parts: list[str] = []
+    reader = threading.Thread(target=lambda: stdout_parts.append(proc.stdout.read()))
+    reader.start()
+    stderr = proc.stderr.read()
+    reader.join()
+    proc.stdout.close()
+    proc.stderr.close()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    result = subprocess.CompletedProcess(cmd, proc.returncode, "".join(stdout_parts), stderr)
+    return result, usage.ru_utime + usage.ru_stime
+
+
+class RenderTimings:
+    # Attributes wall time, child CPU time, spawn counts and bytes written to
+    # named stages, for the whole run and per recipient. Stage wall time is
+    # exclusive: a nested stage pauses its parent's clock.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self._start = time.perf_counter()
+            self.stages: dict[str, StageStats] = {}
+            self.recipients: list[RecipientTiming] = []
+            self.counters: dict[str, int] = {}
+            self.histograms: dict[str, Histogram] = {}
+
+    def _stack(self) -> list[list]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_stage(self) -> str | None:
+        stack = self._stack()
+        return stack[-1][0] if stack else None
+
+    def _record(self, stage: str, stats: StageStats) -> None:
+        recipient: RecipientTiming | None = getattr(self._local, "recipient", None)
+        with self._lock:
+            self.stages.setdefault(stage, StageStats()).add(stats)
+            if recipient is not None:
+                recipient.stages.setdefault(stage, StageStats()).add(stats)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        stack = self._stack()
+        if any(entry[0] == name for entry in stack):
+            yield
+            return
+        entry = [name, time.perf_counter(), 0.0]
+        stack.append(entry)
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter() - entry[1]
+            if stack:
+                stack[-1][2] += elapsed
+            self._record(name, StageStats(wall_s=max(0.0, elapsed - entry[2]), errors=int(failed)))
+
+    @contextmanager
+    def recipient(self, name: str) -> Iterator[RecipientTiming]:
+        rec = RecipientTiming(name=name)
+        with self._lock:
+            self.recipients.append(rec)
+        self._local.recipient = rec
+        start = time.perf_counter()
+        try:
+            yield rec
+            if rec.status == "running":
+                rec.status = "ok"
+        except BaseException:
+            rec.status = "failed"
+            raise
+        finally:
+            rec.wall_s = time.perf_counter() - start
+            self._local.recipient = None
+
+    def incr(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def observe(self, metric: str, value: float) -> None:
+        with self._lock:
+            self.histograms.setdefault(metric, Histogram()).observe(value)
+
+    def run(self, cmd: list[str], stage: str | None = None) -> subprocess.CompletedProcess:
+        target = stage or self.current_stage() or "other"
+        with self.stage(target):
+            result, cpu_s = _spawn(cmd)
+            written = 0
+            if cmd and Path(cmd[0]).name == "ffmpeg" and cmd[-1] != "-":
+                out = Path(cmd[-1])
+                if out.is_file():
+                    written = out.stat().st_size
+            self._record(
+                target,
+                StageStats(cpu_s=cpu_s, spawns=1, bytes_written=written, errors=int(result.returncode != 0)),
+            )
+        if cmd:
+            self.incr(f"spawn:{Path(cmd[0]).name}")
+        return result
+
+    def report(self) -> dict:
+        with self._lock:
+            total = StageStats()
+            for stats in self.stages.values():
+                total.add(stats)
+            return {
+                "started_at": self.started_at,
+                "wall_s": round(time.perf_counter() - self._start, 3),
+                "totals": _rounded(total),
+                "stages": {name: _rounded(stats) for name, stats in _by_wall(self.stages)},
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: {"buckets": list(LATENCY_BUCKETS), "counts": list(h.counts), "sum": h.sum, "count": h.count}
+                    for name, h in self.histograms.items()
+                },
+                "recipients": [
+                    {
+                        "name": rec.name,
+                        "status": rec.status,
+                        "wall_s": round(rec.wall_s, 3),
+                        "stages": {name: _rounded(stats) for name, stats in _by_wall(rec.stages)},
+                    }
+                    for rec in self.recipients
+                ],
+            }
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
+        tmp.replace(path)
+
+    def summary(self, top: int = 5) -> str:
+        rep = self.report()
+        lines = [
+            f"Timing: {rep['wall_s']:.2f}s wall, {rep['totals']['spawns']} processes, "
+            f"{len(rep['recipients'])} recipients",
+            f"  {'stage':<10} {'wall s':>9} {'share':>6} {'cpu s':>9} {'spawns':>7} {'MB out':>8}",
+        ]
+        stage_wall = sum(s["wall_s"] for s in rep["stages"].values()) or 1.0
+        for name, stats in rep["stages"].items():
+            lines.append(
+                f"  {name:<10} {stats['wall_s']:>9.2f} {100 * stats['wall_s'] / stage_wall:>5.1f}% "
+                f"{stats['cpu_s']:>9.2f} {stats['spawns']:>7} {stats['bytes_written'] / 1e6:>8.1f}"
+            )
+        done = [r for r in rep["recipients"] if r["status"] != "running"]
+        if done:
+            avg = sum(r["wall_s"] for r in done) / len(done)
+            lines.append(f"  per recipient: {avg:.2f}s avg")
+            for r in sorted(done, key=lambda r: r["wall_s"], reverse=True)[:top]:
+                lines.append(f"    {r['wall_s']:>7.2f}s  {r['status']:<6} {r['name']}")
+        return "\n".join(lines)
+
+
+def _by_wall(stages: dict[str, StageStats]) -> list[tuple[str, StageStats]]:
+    return sorted(stages.items(), key=lambda item: item[1].wall_s, reverse=True)
+
+
+def _rounded(stats: StageStats) -> dict:
+    data = asdict(stats)
+    data["wall_s"] = round(data["wall_s"], 4)
+    data["cpu_s"] = round(data["cpu_s"], 4)
+    return data
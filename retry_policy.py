@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import errno
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+# Per-recipient retry: transient failures (network, HTTP 429/5xx, processes
+# killed by a signal such as the OOM killer) are retried with bounded
+# exponential backoff; anything else fails on the first attempt.
+
+T = TypeVar("T")
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+_TRANSIENT_ERRNOS = {
+    errno.ECONNRESET,
+    errno.ECONNREFUSED,
+    errno.ECONNABORTED,
+    errno.ETIMEDOUT,
+    errno.EHOSTUNREACH,
+    errno.ENETUNREACH,
+    errno.EPIPE,
+    errno.EAGAIN,
+    errno.ENOMEM,
+}
+# requests/urllib3 exception names, matched by name so requests stays optional.
+_TRANSIENT_NAMES = {
+    "ConnectionError",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "Timeout",
+    "ChunkedEncodingError",
+    "ProtocolError",
+    "RemoteDisconnected",
+}
+
+
+class TransientError(RuntimeError):
+    # A failure worth retrying: rate limit, upstream 5xx, killed process.
+    pass
+
+
+class CommandError(RuntimeError):
+    def __init__(self, message: str, returncode: int) -> None:
+        super().__init__(message)
+        self.returncode = returncode
+
+
+def http_status_error(service: str, status: int, body: str) -> RuntimeError:
+    message = f"{service} failed ({status}): {body[:400]}"
+    if status == 429 or status >= 500:
+        return TransientError(message)
+    return RuntimeError(message)
+
+
+def classify(exc: BaseException) -> str:
+    if isinstance(exc, TransientError):
+        return TRANSIENT
+    if isinstance(exc, CommandError):
+        # Negative: killed by a signal (OOM killer, SIGTERM on shutdown); 137 = 128 + SIGKILL via a shell.
+        return TRANSIENT if exc.returncode < 0 or exc.returncode == 137 else PERMANENT
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return TRANSIENT
+    if isinstance(exc, OSError) and exc.errno in _TRANSIENT_ERRNOS:
+        return TRANSIENT
+    for cls in type(exc).__mro__:
+        if cls.__name__ in _TRANSIENT_NAMES and cls.__module__.split(".")[0] in ("requests", "urllib3", "http"):
+            return TRANSIENT
+    # requests.HTTPError (raise_for_status) carries the response: 429/5xx are retryable.
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int) and (status == 429 or status >= 500):
+        return TRANSIENT
+    if exc.__cause__ is not None and exc.__cause__ is not exc:
+        return classify(exc.__cause__)
+    return PERMANENT
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+    jitter: float = 0.25
+
+    def delay(self, attempt: int) -> float:
+        # attempt is the 1-based attempt that just failed.
+        base = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return base * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def call(
+        self,
+        fn: Callable[[int], T],
+        *,
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
+    ) -> T:
+        # fn receives the 1-based attempt number. The last exception is
+        # re-raised once attempts run out or the failure is permanent.
+        attempt = 1
+        while True:
+            try:
+                return fn(attempt)
+            except Exception as exc:
+                if attempt >= self.max_attempts or classify(exc) != TRANSIENT:
+                    raise
+                wait = self.delay(attempt)
+                if on_retry is not None:
+                    on_retry(attempt, exc, wait)
+                time.sleep(wait)
+                attempt += 1
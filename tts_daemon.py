@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import selectors
+import shlex
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from retry_policy import CommandError
+
+# Long-lived local TTS engines. With --tts-daemon, --tts-cmd starts a process
+# that loads its model once and then answers JSON lines on stdin/stdout:
+#
+#   engine -> {"ready": true}                       (once, after model load)
+#   client -> {"text": "...", "out": "/path/clip.mp3", "voice": "", "lang": "hi"}
+#   engine -> {"ok": true} | {"ok": false, "error": "..."}
+#
+# Anything ffmpeg can decode may be written to "out". Log output belongs on
+# stderr; stdout carries only replies. An engine that doesn't answer within
+# its deadline is killed and restarted.
+
+START_TIMEOUT = 300.0  # model load
+REQUEST_TIMEOUT = 120.0
+
+
+class TtsDaemon:
+    # One engine process. Requests are serialized; a process that dies
+    # mid-request is restarted and the request retried once.
+    def __init__(self, cmd: str, request_timeout: float = REQUEST_TIMEOUT, start_timeout: float = START_TIMEOUT) -> None:
+        self.cmd = cmd
+        self.request_timeout = request_timeout
+        self.start_timeout = start_timeout
+        self._proc: subprocess.Popen | None = None
+        self._stdout_buf = b""
+        self._timed_out = False
+        self._stderr_tail: deque[str] = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        args = shlex.split(self.cmd)
+        if not args:
+            raise ValueError("TTS daemon command is empty")
+        self._proc = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._stdout_buf = b""
+        proc = self._proc
+        threading.Thread(target=self._drain_stderr, args=(proc,), daemon=True).start()
+        ready = self._read_reply(self.start_timeout)
+        if not ready or not ready.get("ready"):
+            if self._timed_out:
+                self.close()
+                raise TimeoutError(f"TTS daemon not ready after {self.start_timeout:.0f}s:\n{self._tail()}")
+            detail = (ready or {}).get("error") or self._tail()
+            returncode = self._exit_code()
+            self.close()
+            raise CommandError(f"TTS daemon failed to start: {detail}", returncode)
+
+    def _drain_stderr(self, proc: subprocess.Popen) -> None:
+        for line in proc.stderr:
+            self._stderr_tail.append(line.decode("utf-8", "replace").rstrip())
+
+    def _tail(self) -> str:
+        return "\n".join(list(self._stderr_tail)[-20:]) or "no daemon output"
+
+    def _exit_code(self) -> int:
+        proc = self._proc
+        if proc is None:
+            return 1
+        try:
+            code = proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            return 1
+        return code if code is not None else 1
+
+    def _read_line(self, timeout: float) -> bytes:
+        # One stdout line, read with a deadline (readline() would block
+        # forever on a hung engine). b"" on EOF; sets _timed_out on expiry.
+        self._timed_out = False
+        fd = self._proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b"\n" not in self._stdout_buf:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    self._timed_out = True
+                    return b""
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    return b""
+                self._stdout_buf += chunk
+        line, _, self._stdout_buf = self._stdout_buf.partition(b"\n")
+        return line
+
+    def _read_reply(self, timeout: float) -> dict | None:
+        line = self._read_line(timeout) if self._proc else b""
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return {"ok": False, "error": f"invalid reply: {line.decode('utf-8', 'replace').strip()[:200]}"}
+
+    def _request(self, payload: dict) -> dict | None:
+        if self._proc is None or self._proc.poll() is not None:
+            self._start()
+        try:
+            self._proc.stdin.write((json.dumps(payload) + "\n").encode("utf-8"))
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return None
+        return self._read_reply(self.request_timeout)
+
+    def synthesize(self, *, text: str, out: Path, voice: Path | None, lang: str) -> None:
+        payload = {"text": text, "out": str(out), "voice": str(voice or ""), "lang": lang}
+        with self._lock:
+            reply = self._request(payload)
+            if reply is None:
+                # Engine died (OOM, crash) or hung: restart with a fresh model and retry once.
+                self.close()
+                reply = self._request(payload)
+            if reply is None:
+                if self._timed_out:
+                    self.close()
+                    raise TimeoutError(f"TTS daemon did not answer within {self.request_timeout:.0f}s for {text!r}")
+                returncode = self._exit_code()
+                self.close()
+                # A signal exit (negative code) is classified as transient by retry_policy.
+                raise CommandError(f"TTS daemon exited unexpectedly:\n{self._tail()}", returncode)
+        if not reply.get("ok"):
+            raise RuntimeError(f"TTS daemon failed for {text!r}: {reply.get('error')}")
+        if not out.exists():
+            raise RuntimeError(f"TTS daemon reported success but wrote no file: {out}")
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        if self._timed_out:
+            # A hung engine won't notice stdin closing.
+            proc.kill()
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+class TtsDaemonPool:
+    # N engines behind a free list. Engines start on first use, so a run whose
+    # names are all cached never loads a model.
+    def __init__(self, cmd: str, workers: int, request_timeout: float = REQUEST_TIMEOUT) -> None:
+        self.cmd = cmd
+        self.workers = max(1, workers)
+        self.request_timeout = request_timeout
+        self._daemons = [TtsDaemon(cmd, request_timeout) for _ in range(self.workers)]
+        self._free: queue.SimpleQueue[TtsDaemon] = queue.SimpleQueue()
+        for daemon in self._daemons:
+            self._free.put(daemon)
+
+    def synthesize(self, *, text: str, out: Path, voice: Path | None, lang: str) -> None:
+        daemon = self._free.get()
+        try:
+            daemon.synthesize(text=text, out=out, voice=voice, lang=lang)
+        finally:
+            self._free.put(daemon)
+
+    def close(self) -> None:
+        for daemon in self._daemons:
+            daemon.close()
+
+
+_POOLS: dict[str, TtsDaemonPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def start_tts_daemons(cmd: str, workers: int, request_timeout: float = REQUEST_TIMEOUT) -> TtsDaemonPool:
+    # Registers the pool for cmd; tts_daemon_pool(cmd) finds it from the TTS path.
+    with _POOLS_LOCK:
+        pool = _POOLS.get(cmd)
+        if pool is None or pool.workers != max(1, workers) or pool.request_timeout != request_timeout:
+            if pool is not None:
+                pool.close()
+            pool = TtsDaemonPool(cmd, workers, request_timeout)
+            _POOLS[cmd] = pool
+        return pool
+
+
+def tts_daemon_pool(cmd: str) -> TtsDaemonPool | None:
+    with _POOLS_LOCK:
+        return _POOLS.get(cmd)
+
+
+def close_tts_daemons() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_tts_daemons)
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# Long-lived Wav2Lip worker. Run it with the interpreter that has Wav2Lip's
+# dependencies (torch, cv2, librosa):
+#
+#   python wav2lip_worker.py --repo /path/to/Wav2Lip --checkpoint wav2lip_gan.pth
+#
+# The model is loaded once. Each stdin line is a JSON request; each reply is
+# one JSON line on stdout. Face boxes are cached per base video key, and only
+# frames inside the requested windows are re-synthesized; the rest of the
+# video is passed through unchanged. With box_cache_dir the boxes are also
+# kept on disk as <key>_<pads>.npy (float32, frames x 4) for later jobs.
+#
+# Request:
+#   {"face": "in.mp4", "audio": "in.mp4", "outfile": "out.mp4",
+#    "pads": [0, 10, 0, 0], "key": "<base video id>", "frame_offset": 0,
+#    "windows": [[start_s, end_s], ...] | null, "video_args": ["-c:v", ...],
+#    "box_cache_dir": "/path" | "", "mux_audio": true,
+#    "frame_rate": "30000/1001" | "", "timescale": 30000 | 0}
+# frame_rate and timescale are the source stream's exact rate and time base;
+# the output is encoded with them so it joins stream-copied pieces without
+# timestamp drift. Without them the decoder's (rounded) fps is used.
+# frame_offset is the index of the first frame of "face" within the base
+# video, so a piece cut from a render shares the base's cached boxes.
+# mux_audio false writes video only (for pieces stitched back by the caller).
+# Reply: {"ok": true, "frames": N, "synced": M, "detected": D} or {"ok": false, "error": "..."}
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import traceback
+from fractions import Fraction
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+MEL_STEP_SIZE = 16
+IMG_SIZE = 96
+SMOOTH_FRAMES = 5
+NO_FACE = -1.0
+
+
+class Wav2LipWorker:
+    def __init__(self, repo: Path, checkpoint: Path, *, batch_size: int, face_det_batch_size: int) -> None:
+        sys.path.insert(0, str(repo))
+        import audio as w2l_audio
+        import face_detection
+        from models import Wav2Lip
+
+        self.audio = w2l_audio
+        self.face_detection = face_detection
+        self.batch_size = batch_size
+        self.face_det_batch_size = face_det_batch_size
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.detector = None
+        # (key, pads) -> float32 array (frames, 4) of padded x1, y1, x2, y2;
+        # NaN = not detected yet, NO_FACE = no face in that frame.
+        self.boxes: dict[tuple[str, tuple[int, ...]], np.ndarray] = {}
+
+        if self.device == "cuda":
+            ckpt = torch.load(str(checkpoint))
+        else:
+            ckpt = torch.load(str(checkpoint), map_location=lambda storage, loc: storage)
+        state = {k.replace("module.", ""): v for k, v in ckpt["state_dict"].items()}
+        model = Wav2Lip()
+        model.load_state_dict(state)
+        self.model = model.to(self.device).eval()
+
+    def _detector(self):
+        if self.detector is None:
+            self.detector = self.face_detection.FaceAlignment(
+                self.face_detection.LandmarksType._2D, flip_input=False, device=self.device
+            )
+        return self.detector
+
+    @staticmethod
+    def _box_file(cache_dir: Path, key: str, pads: tuple[int, ...]) -> Path:
+        return cache_dir / f"{key}_{'_'.join(str(p) for p in pads)}.npy"
+
+    def _load_boxes(self, cache_dir: Path, key: str, pads: tuple[int, ...]) -> None:
+        if (key, pads) in self.boxes:
+            return
+        path = self._box_file(cache_dir, key, pads)
+        try:
+            self.boxes[(key, pads)] = np.load(path).astype(np.float32)
+        except (OSError, ValueError):
+            return
+
+    def _save_boxes(self, cache_dir: Path, key: str, pads: tuple[int, ...]) -> None:
+        cache = self.boxes[(key, pads)]
+        path = self._box_file(cache_dir, key, pads)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Another job may have detected other frames of the same base meanwhile.
+        try:
+            on_disk = np.load(path)
+        except (OSError, ValueError):
+            on_disk = None
+        if on_disk is not None:
+            n = min(len(on_disk), len(cache))
+            fill = np.isnan(cache[:n, 0]) & ~np.isnan(on_disk[:n, 0])
+            cache[:n][fill] = on_disk[:n][fill]
+            if len(on_disk) > len(cache):
+                cache = np.concatenate([cache, on_disk[len(cache) :].astype(np.float32)])
+                self.boxes[(key, pads)] = cache
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, cache)
+        os.replace(tmp, path)
+
+    def _box_cache(self, key: str, pads: tuple[int, ...], size: int) -> np.ndarray:
+        cache = self.boxes.get((key, pads))
+        if cache is None or len(cache) < size:
+            grown = np.full((size, 4), np.nan, dtype=np.float32)
+            if cache is not None:
+                grown[: len(cache)] = cache
+            cache = grown
+            self.boxes[(key, pads)] = cache
+        return cache
+
+    def _detect(self, frames: list[np.ndarray], indices: list[int], cache: np.ndarray, pads: tuple[int, ...]) -> int:
+        missing = [(i, f) for i, f in zip(indices, frames) if np.isnan(cache[i, 0])]
+        pady1, pady2, padx1, padx2 = pads
+        for start in range(0, len(missing), self.face_det_batch_size):
+            chunk = missing[start : start + self.face_det_batch_size]
+            rects = self._detector().get_detections_for_batch(np.array([f for _, f in chunk]))
+            for (idx, frame), rect in zip(chunk, rects):
+                if rect is None:
+                    cache[idx] = NO_FACE
+                    continue
+                cache[idx] = [
+                    max(0, rect[0] - padx1),
+                    max(0, rect[1] - pady1),
+                    min(frame.shape[1], rect[2] + padx2),
+                    min(frame.shape[0], rect[3] + pady2),
+                ]
+        return len(missing)
+
+    @staticmethod
+    def _smoothed(boxes: np.ndarray) -> np.ndarray:
+        # Same forward moving average as Wav2Lip inference.py, within one window.
+        out = boxes.copy()
+        n = len(boxes)
+        for i in range(n):
+            window = boxes[max(0, n - SMOOTH_FRAMES) :] if i + SMOOTH_FRAMES > n else boxes[i : i + SMOOTH_FRAMES]
+            valid = window[window[:, 0] != NO_FACE]
+            if len(valid) and boxes[i, 0] != NO_FACE:
+                out[i] = valid.mean(axis=0)
+        return out
+
+    def _mel_chunks(self, audio_src: Path, fps: float, tmp: Path) -> list[np.ndarray]:
+        wav_path = tmp / "audio16k.wav"
+        subprocess.run(
+            ["ffmpeg", "-y", "-i", str(audio_src), "-vn", "-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le", str(wav_path)],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        mel = self.audio.melspectrogram(self.audio.load_wav(str(wav_path), 16000))
+        if np.isnan(mel.reshape(-1)).sum() > 0:
+            raise ValueError("Mel contains nan; use a louder audio track.")
+        chunks: list[np.ndarray] = []
+        step = 80.0 / fps
+        i = 0
+        while True:
+            start = int(i * step)
+            if start + MEL_STEP_SIZE > len(mel[0]):
+                chunks.append(mel[:, len(mel[0]) - MEL_STEP_SIZE :])
+                break
+            chunks.append(mel[:, start : start + MEL_STEP_SIZE])
+            i += 1
+        return chunks
+
+    def _synthesize(self, frames: list[np.ndarray], boxes: np.ndarray, mels: list[np.ndarray]) -> list[np.ndarray]:
+        out = [f.copy() for f in frames]
+        todo = [i for i in range(len(frames)) if boxes[i, 0] != NO_FACE]
+        for start in range(0, len(todo), self.batch_size):
+            batch = todo[start : start + self.batch_size]
+            faces, coords = [], []
+            for i in batch:
+                x1, y1, x2, y2 = (int(v) for v in boxes[i])
+                faces.append(cv2.resize(frames[i][y1:y2, x1:x2], (IMG_SIZE, IMG_SIZE)))
+                coords.append((x1, y1, x2, y2))
+            img_batch = np.asarray(faces)
+            masked = img_batch.copy()
+            masked[:, IMG_SIZE // 2 :] = 0
+            img_batch = np.concatenate((masked, img_batch), axis=3) / 255.0
+            mel_batch = np.asarray([mels[i] for i in batch])
+            mel_batch = np.reshape(mel_batch, [len(mel_batch), mel_batch.shape[1], mel_batch.shape[2], 1])
+            img_t = torch.FloatTensor(np.transpose(img_batch, (0, 3, 1, 2))).to(self.device)
+            mel_t = torch.FloatTensor(np.transpose(mel_batch, (0, 3, 1, 2))).to(self.device)
+            with torch.no_grad():
+                pred = self.model(mel_t, img_t)
+            pred = pred.cpu().numpy().transpose(0, 2, 3, 1) * 255.0
+            for p, i, (x1, y1, x2, y2) in zip(pred, batch, coords):
+                out[i][y1:y2, x1:x2] = cv2.resize(p.astype(np.uint8), (x2 - x1, y2 - y1))
+        return out
+
+    def handle(self, req: dict) -> dict:
+        face = Path(req["face"])
+        audio_src = Path(req.get("audio") or req["face"])
+        outfile = Path(req["outfile"])
+        pads = tuple(int(p) for p in req.get("pads", [0, 10, 0, 0]))
+        # Without a key the frames are unique to this request: detect, use, forget.
+        key = str(req.get("key") or f"tmp:{face.resolve()}")
+        offset = int(req.get("frame_offset", 0))
+        windows = req.get("windows")
+        video_args = req.get("video_args") or ["-c:v", "libx264", "-preset", "medium", "-crf", "20"]
+        box_cache_dir = Path(req["box_cache_dir"]) if req.get("key") and req.get("box_cache_dir") else None
+        mux_audio = bool(req.get("mux_audio", True))
+        frame_rate = str(req.get("frame_rate") or "")
+        timescale = int(req.get("timescale") or 0)
+        if box_cache_dir is not None:
+            self._load_boxes(box_cache_dir, key, pads)
+
+        cap = cv2.VideoCapture(str(face))
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open video: {face}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        try:
+            exact = Fraction(frame_rate) if frame_rate else None
+        except (ValueError, ZeroDivisionError):
+            exact = None
+        if exact:
+            fps = float(exact)
+        rate_arg = f"{exact.numerator}/{exact.denominator}" if exact else f"{fps:.6f}"
+        # Only the mp4/mov muxers take a track timescale.
+        timescale_args = (
+            ["-video_track_timescale", str(timescale)]
+            if timescale and outfile.suffix.lower() in (".mp4", ".mov", ".m4v")
+            else []
+        )
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cache = self._box_cache(key, pads, offset + max(frame_count, 1) + 1)
+
+        def in_window(idx: int) -> bool:
+            if windows is None:
+                return True
+            t = idx / fps
+            return any(float(s) <= t < float(e) for s, e in windows)
+
+        synced = 0
+        detected = 0
+        total = 0
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            mels = self._mel_chunks(audio_src, fps, tmp)
+            with open(tmp / "ffmpeg.log", "w+") as err_log:
+                encoder = subprocess.Popen(
+                    [
+                        "ffmpeg",
+                        "-y",
+                        "-f",
+                        "rawvideo",
+                        "-pix_fmt",
+                        "bgr24",
+                        "-s",
+                        f"{width}x{height}",
+                        "-r",
+                        rate_arg,
+                        "-i",
+                        "-",
+                        *(
+                            ["-i", str(audio_src), "-map", "0:v:0", "-map", "1:a:0?"]
+                            if mux_audio
+                            else ["-map", "0:v:0"]
+                        ),
+                        *video_args,
+                        "-pix_fmt",
+                        "yuv420p",
+                        *(["-c:a", "copy"] if mux_audio else ["-an"]),
+                        *timescale_args,
+                        str(outfile),
+                    ],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=err_log,
+                )
+                run_frames: list[np.ndarray] = []
+                run_start = 0
+
+                def flush_run() -> None:
+                    nonlocal synced, detected
+                    if not run_frames:
+                        return
+                    indices = [offset + run_start + k for k in range(len(run_frames))]
+                    cache = self._box_cache(key, pads, indices[-1] + 1)
+                    detected += self._detect(run_frames, indices, cache, pads)
+                    boxes = self._smoothed(cache[indices[0] : indices[-1] + 1])
+                    run_mels = [mels[min(run_start + k, len(mels) - 1)] for k in range(len(run_frames))]
+                    for frame in self._synthesize(run_frames, boxes, run_mels):
+                        encoder.stdin.write(frame.tobytes())
+                    synced += int((boxes[:, 0] != NO_FACE).sum())
+                    run_frames.clear()
+
+                try:
+                    while True:
+                        ok, frame = cap.read()
+                        if not ok:
+                            break
+                        if in_window(total):
+                            if not run_frames:
+                                run_start = total
+                            run_frames.append(frame)
+                        else:
+                            flush_run()
+                            encoder.stdin.write(frame.tobytes())
+                        total += 1
+                    flush_run()
+                finally:
+                    cap.release()
+                    encoder.stdin.close()
+                    code = encoder.wait()
+                if code != 0:
+                    err_log.seek(0)
+                    raise RuntimeError(f"ffmpeg encode failed: {err_log.read()[-2000:]}")
+        if not req.get("key"):
+            self.boxes.pop((key, pads), None)
+        elif box_cache_dir is not None and detected:
+            self._save_boxes(box_cache_dir, key, pads)
+        return {"ok": True, "frames": total, "synced": synced, "detected": detected}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Persistent Wav2Lip inference worker (JSON lines on stdin/stdout)")
+    parser.add_argument("--repo", required=True, help="Path to Wav2Lip repo")
+    parser.add_argument("--checkpoint", required=True, help="Path to Wav2Lip checkpoint (.pth)")
+    parser.add_argument("--batch-size", type=int, default=128, help="Wav2Lip generator batch size")
+    parser.add_argument("--face-det-batch-size", type=int, default=16, help="Face detector batch size")
+    args = parser.parse_args()
+
+    # Keep stdout for the protocol; anything Wav2Lip or its libraries print goes to stderr.
+    proto = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1, encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    try:
+        worker = Wav2LipWorker(
+            Path(args.repo).expanduser(),
+            Path(args.checkpoint).expanduser(),
+            batch_size=args.batch_size,
+            face_det_batch_size=args.face_det_batch_size,
+        )
+    except Exception as exc:
+        proto.write(json.dumps({"ready": False, "error": f"{type(exc).__name__}: {exc}"}) + "\n")
+        return 1
+    proto.write(json.dumps({"ready": True, "device": worker.device}) + "\n")
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            reply = worker.handle(json.loads(line))
+        except Exception as exc:
+            traceback.print_exc(file=sys.stderr)
+            reply = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        proto.write(json.dumps(reply) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())